@@ -0,0 +1,57 @@
+"""transactions archive
+
+Revision ID: 0c9e5f3a7b46
+Revises: f4b8d2a6e137
+Create Date: 2026-10-18 17:58:21.306447
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c9e5f3a7b46'
+down_revision: Union[str, Sequence[str], None] = 'f4b8d2a6e137'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('transactions_archive',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('from_card_id', sa.UUID(), nullable=True),
+    sa.Column('to_card_id', sa.UUID(), nullable=False),
+    sa.Column('amount', sa.BigInteger(), nullable=False),
+    sa.Column('commission', sa.BigInteger(), nullable=False),
+    sa.Column('type', postgresql.ENUM('TRANSFER', 'DEPOSIT', name='typetransaction', create_type=False), nullable=False),
+    sa.Column('status', postgresql.ENUM('PENDING', 'SUCCESS', 'FAILED', name='statustransaction', create_type=False), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(), nullable=False),
+    sa.Column('completed_at', sa.TIMESTAMP(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_transactions_archive_created_at', 'transactions_archive', ['created_at'], unique=False)
+    op.create_index('ix_transactions_archive_from_card_id_created_at', 'transactions_archive', ['from_card_id', 'created_at'], unique=False)
+    op.create_index('ix_transactions_archive_to_card_id_created_at', 'transactions_archive', ['to_card_id', 'created_at'], unique=False)
+    # archive faqat o'qiladi: sahifalar to'liq to'ldiriladi, jadval kichikroq bo'ladi
+    op.execute("ALTER TABLE transactions_archive SET (fillfactor = 100)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # archive'dagi qatorlar hot jadvalga qaytariladi (partition'lar mavjud bo'lishi kerak)
+    op.execute("""
+        INSERT INTO transactions (id, from_card_id, to_card_id, amount, commission, type, status,
+                                  description, created_at, completed_at)
+        SELECT id, from_card_id, to_card_id, amount, commission, type, status,
+               description, created_at, completed_at
+        FROM transactions_archive
+    """)
+    op.drop_index('ix_transactions_archive_to_card_id_created_at', table_name='transactions_archive')
+    op.drop_index('ix_transactions_archive_from_card_id_created_at', table_name='transactions_archive')
+    op.drop_index('ix_transactions_archive_created_at', table_name='transactions_archive')
+    op.drop_table('transactions_archive')
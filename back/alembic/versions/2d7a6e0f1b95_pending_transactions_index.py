@@ -0,0 +1,30 @@
+"""pending transactions index
+
+Revision ID: 2d7a6e0f1b95
+Revises: 9f3c51d8e2a4
+Create Date: 2026-10-18 11:47:09.663201
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2d7a6e0f1b95'
+down_revision: Union[str, Sequence[str], None] = '9f3c51d8e2a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # settlement worker faqat PENDING qatorlarni created_at tartibida oladi
+    op.create_index('ix_transactions_pending', 'transactions', ['created_at'], unique=False,
+                    postgresql_where=sa.text("status = 'PENDING'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transactions_pending', table_name='transactions')
@@ -0,0 +1,39 @@
+"""card balance snapshots
+
+Revision ID: 3a6f0d8c2e95
+Revises: 0c9e5f3a7b46
+Create Date: 2026-10-18 18:34:50.172093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a6f0d8c2e95'
+down_revision: Union[str, Sequence[str], None] = '0c9e5f3a7b46'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('card_balance_snapshots',
+    sa.Column('card_id', sa.UUID(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('balance', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['card_id'], ['cards.id'], ),
+    sa.PrimaryKeyConstraint('card_id', 'day')
+    )
+    op.create_index('ix_ledger_entries_card_id_created_at', 'ledger_entries', ['card_id', 'created_at'], unique=False)
+    op.create_index('ix_ledger_entries_created_at', 'ledger_entries', ['created_at'], unique=False,
+                    postgresql_using='brin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_ledger_entries_created_at', table_name='ledger_entries', postgresql_using='brin')
+    op.drop_index('ix_ledger_entries_card_id_created_at', table_name='ledger_entries')
+    op.drop_table('card_balance_snapshots')
@@ -0,0 +1,40 @@
+"""platform shards
+
+Revision ID: 4b1e9d2a7c30
+Revises: c78a22556112
+Create Date: 2026-10-18 10:12:31.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b1e9d2a7c30'
+down_revision: Union[str, Sequence[str], None] = 'c78a22556112'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('platform_shards',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('balance', sa.DECIMAL(precision=15, scale=2), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+    sa.CheckConstraint('balance >= 0', name='Check_shard_balance_non_negative'),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # sweep qilinmagan pul yo'qolmasligi uchun avval platform kartaga qaytariladi
+    op.execute(sa.text("""
+        UPDATE cards SET balance = balance + (SELECT COALESCE(SUM(balance), 0) FROM platform_shards)
+        WHERE card_number = :platform_card
+    """).bindparams(platform_card=settings.PLATFORM_CARD))
+    op.drop_table('platform_shards')
@@ -0,0 +1,67 @@
+"""ledger entries and balance checkpoints
+
+Revision ID: 5d2e8a4b9c61
+Revises: a3f6d9e1c254
+Create Date: 2026-10-18 15:27:09.731840
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2e8a4b9c61'
+down_revision: Union[str, Sequence[str], None] = 'a3f6d9e1c254'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('ledger_entries',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('card_id', sa.UUID(), nullable=False),
+    sa.Column('transaction_id', sa.UUID(), nullable=False),
+    sa.Column('amount', sa.BigInteger(), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['card_id'], ['cards.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_ledger_entries_card_id_id', 'ledger_entries', ['card_id', 'id'], unique=False)
+    op.create_table('balance_checkpoints',
+    sa.Column('card_id', sa.UUID(), nullable=False),
+    sa.Column('balance', sa.BigInteger(), nullable=False),
+    sa.Column('last_entry_id', sa.BigInteger(), nullable=False),
+    sa.Column('as_of', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['card_id'], ['cards.id'], ),
+    sa.PrimaryKeyConstraint('card_id')
+    )
+
+    # mavjud SUCCESS tranzaksiyalar tarixi ledger'ga ko'chiriladi (checkpoint'lar keyin job tomonidan quriladi).
+    # eski deposit'larda from_card yo'q, shuning uchun ular faqat credit tomoni bilan yoziladi
+    op.execute(sa.text("""
+        INSERT INTO ledger_entries (card_id, transaction_id, amount, created_at)
+        SELECT e.card_id, e.transaction_id, e.amount, e.created_at FROM (
+            SELECT t.to_card_id AS card_id, t.id AS transaction_id, t.amount,
+                   coalesce(t.completed_at, t.created_at) AS created_at
+            FROM transactions t WHERE t.status = 'SUCCESS'
+            UNION ALL
+            SELECT t.from_card_id, t.id, -(t.amount + t.commission), coalesce(t.completed_at, t.created_at)
+            FROM transactions t WHERE t.status = 'SUCCESS' AND t.from_card_id IS NOT NULL
+            UNION ALL
+            SELECT p.id, t.id, t.commission, coalesce(t.completed_at, t.created_at)
+            FROM transactions t JOIN cards p ON p.card_number = :platform_card
+            WHERE t.status = 'SUCCESS' AND t.commission > 0
+        ) e
+        ORDER BY e.created_at, e.transaction_id
+    """).bindparams(platform_card=settings.PLATFORM_CARD))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('balance_checkpoints')
+    op.drop_index('ix_ledger_entries_card_id_id', table_name='ledger_entries')
+    op.drop_table('ledger_entries')
@@ -0,0 +1,57 @@
+"""card holds
+
+Revision ID: 6c08b4f7a9d1
+Revises: 2d7a6e0f1b95
+Create Date: 2026-10-18 12:31:44.580372
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c08b4f7a9d1'
+down_revision: Union[str, Sequence[str], None] = '2d7a6e0f1b95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('cards', sa.Column('reserved_balance', sa.DECIMAL(precision=15, scale=2), server_default='0', nullable=False))
+    op.create_check_constraint('Check_reserved_balance_non_negative', 'cards', 'reserved_balance >= 0')
+    op.create_check_constraint('Check_reserved_balance_covered', 'cards', 'balance >= reserved_balance')
+    op.create_table('holds',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('card_id', sa.UUID(), nullable=False),
+    sa.Column('to_card_id', sa.UUID(), nullable=False),
+    sa.Column('amount', sa.DECIMAL(precision=15, scale=2), nullable=False),
+    sa.Column('commission', sa.DECIMAL(precision=15, scale=2), nullable=False),
+    sa.Column('status', sa.Enum('ACTIVE', 'CAPTURED', 'RELEASED', 'EXPIRED', name='statushold'), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('transaction_id', sa.String(), nullable=True),
+    sa.Column('expires_at', sa.TIMESTAMP(), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('completed_at', sa.TIMESTAMP(), nullable=True),
+    sa.CheckConstraint('amount > 0', name='Check_hold_amount_positive'),
+    sa.CheckConstraint('commission >= 0', name='Check_hold_commission_non_negative'),
+    sa.ForeignKeyConstraint(['card_id'], ['cards.id'], ),
+    sa.ForeignKeyConstraint(['to_card_id'], ['cards.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_holds_card_id'), 'holds', ['card_id'], unique=False)
+    op.create_index('ix_holds_active_expires_at', 'holds', ['expires_at'], unique=False,
+                    postgresql_where=sa.text("status = 'ACTIVE'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_holds_active_expires_at', table_name='holds')
+    op.drop_index(op.f('ix_holds_card_id'), table_name='holds')
+    op.drop_table('holds')
+    sa.Enum(name='statushold').drop(op.get_bind(), checkfirst=True)
+    op.drop_constraint('Check_reserved_balance_covered', 'cards', type_='check')
+    op.drop_constraint('Check_reserved_balance_non_negative', 'cards', type_='check')
+    op.drop_column('cards', 'reserved_balance')
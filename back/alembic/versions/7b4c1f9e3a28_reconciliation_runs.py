@@ -0,0 +1,52 @@
+"""reconciliation runs
+
+Revision ID: 7b4c1f9e3a28
+Revises: 5d2e8a4b9c61
+Create Date: 2026-10-18 16:05:44.219305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b4c1f9e3a28'
+down_revision: Union[str, Sequence[str], None] = '5d2e8a4b9c61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('reconciliation_runs',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('status', sa.Enum('RUNNING', 'FINISHED', 'FAILED', name='statusrun'), nullable=False),
+    sa.Column('chunks', sa.Integer(), nullable=False),
+    sa.Column('total_cards', sa.Integer(), nullable=False),
+    sa.Column('invalid_cards', sa.Integer(), nullable=False),
+    sa.Column('started_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('finished_at', sa.TIMESTAMP(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('reconciliation_findings',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('run_id', sa.UUID(), nullable=False),
+    sa.Column('card_id', sa.UUID(), nullable=False),
+    sa.Column('card_number', sa.String(), nullable=False),
+    sa.Column('stored_balance', sa.BigInteger(), nullable=False),
+    sa.Column('calculated_balance', sa.BigInteger(), nullable=False),
+    sa.Column('difference', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['run_id'], ['reconciliation_runs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_reconciliation_findings_run_id'), 'reconciliation_findings', ['run_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_reconciliation_findings_run_id'), table_name='reconciliation_findings')
+    op.drop_table('reconciliation_findings')
+    op.drop_table('reconciliation_runs')
+    sa.Enum(name='statusrun').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,51 @@
+"""money minor units
+
+Revision ID: 8e5b2c7d4f10
+Revises: 6c08b4f7a9d1
+Create Date: 2026-10-18 14:02:17.118604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e5b2c7d4f10'
+down_revision: Union[str, Sequence[str], None] = '6c08b4f7a9d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# jadval -> (ustun, eski precision)
+MONEY_COLUMNS = {
+    'cards': [('balance', 15), ('reserved_balance', 15)],
+    'transactions': [('amount', 15), ('commission', 15)],
+    'subscriptions': [('price', 10)],
+    'platform_shards': [('balance', 15)],
+    'hot_credits': [('amount', 15)],
+    'holds': [('amount', 15), ('commission', 15)],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # so'm (DECIMAL) -> tiyin (BIGINT), mavjud qiymatlar shu ALTER ichida qayta yoziladi
+    for table, columns in MONEY_COLUMNS.items():
+        for column, precision in columns:
+            op.alter_column(table, column,
+                            existing_type=sa.DECIMAL(precision=precision, scale=2),
+                            type_=sa.BigInteger(),
+                            existing_nullable=False,
+                            postgresql_using=f'round({column} * 100)::bigint')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, columns in MONEY_COLUMNS.items():
+        for column, precision in columns:
+            op.alter_column(table, column,
+                            existing_type=sa.BigInteger(),
+                            type_=sa.DECIMAL(precision=precision, scale=2),
+                            existing_nullable=False,
+                            postgresql_using=f'{column} / 100.0')
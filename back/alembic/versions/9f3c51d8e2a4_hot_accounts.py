@@ -0,0 +1,46 @@
+"""hot accounts
+
+Revision ID: 9f3c51d8e2a4
+Revises: 4b1e9d2a7c30
+Create Date: 2026-10-18 11:04:52.118930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9f3c51d8e2a4'
+down_revision: Union[str, Sequence[str], None] = '4b1e9d2a7c30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('cards', sa.Column('is_hot', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.create_table('hot_credits',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('card_id', sa.UUID(), nullable=False),
+    sa.Column('amount', sa.DECIMAL(precision=15, scale=2), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+    sa.CheckConstraint('amount > 0', name='Check_hot_credit_amount_positive'),
+    sa.ForeignKeyConstraint(['card_id'], ['cards.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_hot_credits_card_id'), 'hot_credits', ['card_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # navbatda qolgan credit'lar yo'qolmasligi uchun avval balansga qo'shiladi
+    op.execute("""
+        UPDATE cards SET balance = cards.balance + totals.amount
+        FROM (SELECT card_id, SUM(amount) AS amount FROM hot_credits GROUP BY card_id) totals
+        WHERE cards.id = totals.card_id
+    """)
+    op.drop_index(op.f('ix_hot_credits_card_id'), table_name='hot_credits')
+    op.drop_table('hot_credits')
+    op.drop_column('cards', 'is_hot')
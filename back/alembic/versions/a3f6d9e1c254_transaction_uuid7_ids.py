@@ -0,0 +1,56 @@
+"""transaction uuid7 ids
+
+Revision ID: a3f6d9e1c254
+Revises: 8e5b2c7d4f10
+Create Date: 2026-10-18 14:40:52.603117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f6d9e1c254'
+down_revision: Union[str, Sequence[str], None] = '8e5b2c7d4f10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # PK bilan bir xil ikkinchi index kerak emas
+    op.drop_index(op.f('ix_transactions_id'), table_name='transactions')
+
+    # eski "PBC-" + 22 hex -> 10 ta nol bilan to'ldirilgan UUID (ref ko'rinishi o'zgarmaydi)
+    op.alter_column('transactions', 'id',
+                    existing_type=sa.String(),
+                    type_=sa.UUID(),
+                    existing_nullable=False,
+                    postgresql_using="rpad(substr(id, 5), 32, '0')::uuid")
+    op.alter_column('holds', 'transaction_id',
+                    existing_type=sa.String(),
+                    type_=sa.UUID(),
+                    existing_nullable=True,
+                    postgresql_using="rpad(substr(transaction_id, 5), 32, '0')::uuid")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # uuid7 id'lar to'liq 32 hex bilan qaytadi
+    op.alter_column('holds', 'transaction_id',
+                    existing_type=sa.UUID(),
+                    type_=sa.String(),
+                    existing_nullable=True,
+                    postgresql_using="""'PBC-' || upper(CASE WHEN substr(replace(transaction_id::text, '-', ''), 13, 1) = '7'
+                                                       THEN replace(transaction_id::text, '-', '')
+                                                       ELSE left(replace(transaction_id::text, '-', ''), 22) END)""")
+    op.alter_column('transactions', 'id',
+                    existing_type=sa.UUID(),
+                    type_=sa.String(),
+                    existing_nullable=False,
+                    postgresql_using="""'PBC-' || upper(CASE WHEN substr(replace(id::text, '-', ''), 13, 1) = '7'
+                                                   THEN replace(id::text, '-', '')
+                                                   ELSE left(replace(id::text, '-', ''), 22) END)""")
+    op.create_index(op.f('ix_transactions_id'), 'transactions', ['id'], unique=False)
@@ -0,0 +1,60 @@
+"""trigram search indexes
+
+Revision ID: a4f2c8e6d019
+Revises: c7e3a9f5b214
+Create Date: 2026-10-18 22:03:47.610254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.services.partitions import create_partitioned_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4f2c8e6d019'
+down_revision: Union[str, Sequence[str], None] = 'c7e3a9f5b214'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index, jadval, ustun)
+TRGM_INDEXES = [
+    ('ix_users_full_name_trgm', 'users', 'full_name'),
+    ('ix_users_phone_number_trgm', 'users', 'phone_number'),
+    ('ix_cards_card_number_trgm', 'cards', 'card_number'),
+    ('ix_transactions_archive_from_card_number_trgm', 'transactions_archive', 'from_card_number'),
+    ('ix_transactions_archive_to_card_number_trgm', 'transactions_archive', 'to_card_number'),
+]
+PATTERN_INDEXES = [
+    ('ix_users_phone_number_pattern', 'users', 'phone_number'),
+    ('ix_cards_card_number_pattern', 'cards', 'card_number'),
+]
+# partitioned jadvalda CONCURRENTLY mumkin emas -> ON ONLY + har partition CONCURRENTLY + ATTACH
+PARTITIONED_TRGM_INDEXES = [
+    ('ix_transactions_from_card_number_trgm', 'transactions', 'from_card_number'),
+    ('ix_transactions_to_card_number_trgm', 'transactions', 'to_card_number'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # katta jadvallar: yozuvlar bloklanmasligi uchun CONCURRENTLY (tranzaksiyadan tashqarida)
+    with op.get_context().autocommit_block():
+        for name, _, column in PARTITIONED_TRGM_INDEXES:
+            create_partitioned_index(op.get_bind(), name, f'USING gin ({column} gin_trgm_ops)')
+        for name, table, column in TRGM_INDEXES:
+            op.create_index(name, table, [column], unique=False, postgresql_concurrently=True,
+                            postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'})
+        for name, table, column in PATTERN_INDEXES:
+            op.create_index(name, table, [column], unique=False, postgresql_concurrently=True,
+                            postgresql_ops={column: 'varchar_pattern_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # pg_trgm extension qoldiriladi (boshqa obyektlar ishlatishi mumkin)
+    for name, table, _ in reversed(PATTERN_INDEXES + TRGM_INDEXES + PARTITIONED_TRGM_INDEXES):
+        op.drop_index(name, table_name=table)
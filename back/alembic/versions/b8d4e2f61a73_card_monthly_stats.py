@@ -0,0 +1,54 @@
+"""card monthly stats
+
+Revision ID: b8d4e2f61a73
+Revises: 3a6f0d8c2e95
+Create Date: 2026-10-18 19:12:08.406215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d4e2f61a73'
+down_revision: Union[str, Sequence[str], None] = '3a6f0d8c2e95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('card_monthly_stats',
+    sa.Column('card_id', sa.UUID(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('spent', sa.BigInteger(), nullable=False),
+    sa.Column('income', sa.BigInteger(), nullable=False),
+    sa.Column('commission', sa.BigInteger(), nullable=False),
+    sa.Column('sent_count', sa.Integer(), nullable=False),
+    sa.Column('received_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['card_id'], ['cards.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('card_id', 'month')
+    )
+    op.create_index('ix_card_monthly_stats_user_id_month', 'card_monthly_stats', ['user_id', 'month'], unique=False)
+    op.create_table('card_monthly_recipients',
+    sa.Column('card_id', sa.UUID(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('to_card_id', sa.UUID(), nullable=False),
+    sa.Column('amount', sa.BigInteger(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['card_id'], ['cards.id'], ),
+    sa.ForeignKeyConstraint(['to_card_id'], ['cards.id'], ),
+    sa.PrimaryKeyConstraint('card_id', 'month', 'to_card_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('card_monthly_recipients')
+    op.drop_index('ix_card_monthly_stats_user_id_month', table_name='card_monthly_stats')
+    op.drop_table('card_monthly_stats')
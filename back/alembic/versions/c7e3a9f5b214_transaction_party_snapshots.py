@@ -0,0 +1,98 @@
+"""transaction party snapshots
+
+Revision ID: c7e3a9f5b214
+Revises: d5a9c1e7f384
+Create Date: 2026-10-18 21:14:05.337902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.services.partitions import create_partitioned_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e3a9f5b214'
+down_revision: Union[str, Sequence[str], None] = 'd5a9c1e7f384'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('transactions', 'transactions_archive')
+BATCH = 10000
+
+# bitta chunk: (created_at, id) keyset bo'yicha keyingi BATCH qator, oxirgi kalit qaytariladi
+BACKFILL_SQL = """
+WITH batch AS (
+    SELECT t.id, t.created_at,
+           fc.user_id AS from_user_id, fc.card_number AS from_card_number, fu.full_name AS from_owner_name,
+           tc.user_id AS to_user_id, tc.card_number AS to_card_number, tu.full_name AS to_owner_name
+    FROM {table} t
+    JOIN cards tc ON tc.id = t.to_card_id
+    JOIN users tu ON tu.id = tc.user_id
+    LEFT JOIN cards fc ON fc.id = t.from_card_id
+    LEFT JOIN users fu ON fu.id = fc.user_id
+    WHERE (t.created_at, t.id) > (CAST(:created_at AS TIMESTAMP), CAST(:id AS UUID))
+    ORDER BY t.created_at, t.id
+    LIMIT :batch
+),
+filled AS (
+    UPDATE {table} t
+    SET from_user_id = b.from_user_id, from_card_number = b.from_card_number, from_owner_name = b.from_owner_name,
+        to_user_id = b.to_user_id, to_card_number = b.to_card_number, to_owner_name = b.to_owner_name
+    FROM batch b
+    WHERE t.id = b.id AND t.created_at = b.created_at
+    RETURNING t.id
+)
+SELECT created_at, id FROM batch ORDER BY created_at DESC, id DESC LIMIT 1
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in TABLES:
+        op.add_column(table, sa.Column('from_user_id', sa.UUID(), nullable=True))
+        op.add_column(table, sa.Column('to_user_id', sa.UUID(), nullable=True))
+        op.add_column(table, sa.Column('from_card_number', sa.String(length=16), nullable=True))
+        op.add_column(table, sa.Column('to_card_number', sa.String(length=16), nullable=True))
+        op.add_column(table, sa.Column('from_owner_name', sa.String(), nullable=True))
+        op.add_column(table, sa.Column('to_owner_name', sa.String(), nullable=True))
+
+    # backfill chunk'lab, har chunk alohida commit: uzun lock va bitta katta WAL yo'q
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        for table in TABLES:
+            created_at, last_id = '-infinity', '00000000-0000-0000-0000-000000000000'
+            while True:
+                last = bind.execute(sa.text(BACKFILL_SQL.format(table=table)),
+                                    {'created_at': created_at, 'id': last_id, 'batch': BATCH}).first()
+                if not last:
+                    break
+                created_at, last_id = last.created_at, last.id
+
+    for table in TABLES:
+        op.alter_column(table, 'to_user_id', nullable=False)
+        op.alter_column(table, 'to_card_number', nullable=False)
+        op.alter_column(table, 'to_owner_name', nullable=False)
+
+    # tarix: from_user_id OR to_user_id -> ikki index (BitmapOr); id keyset pagination uchun
+    with op.get_context().autocommit_block():
+        create_partitioned_index(op.get_bind(), 'ix_transactions_from_user_id_created_at', '(from_user_id, created_at, id)')
+        create_partitioned_index(op.get_bind(), 'ix_transactions_to_user_id_created_at', '(to_user_id, created_at, id)')
+    op.create_index('ix_transactions_archive_from_user_id_created_at', 'transactions_archive', ['from_user_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_transactions_archive_to_user_id_created_at', 'transactions_archive', ['to_user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transactions_archive_to_user_id_created_at', table_name='transactions_archive')
+    op.drop_index('ix_transactions_archive_from_user_id_created_at', table_name='transactions_archive')
+    op.drop_index('ix_transactions_to_user_id_created_at', table_name='transactions')
+    op.drop_index('ix_transactions_from_user_id_created_at', table_name='transactions')
+    for table in TABLES:
+        op.drop_column(table, 'to_owner_name')
+        op.drop_column(table, 'from_owner_name')
+        op.drop_column(table, 'to_card_number')
+        op.drop_column(table, 'from_card_number')
+        op.drop_column(table, 'to_user_id')
+        op.drop_column(table, 'from_user_id')
@@ -0,0 +1,46 @@
+"""keyset pagination indexes
+
+Revision ID: d5a9c1e7f384
+Revises: b8d4e2f61a73
+Create Date: 2026-10-18 20:02:41.518730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.services.partitions import create_partitioned_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a9c1e7f384'
+down_revision: Union[str, Sequence[str], None] = 'b8d4e2f61a73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # yozuvlar (transfer insert'lari ham) bloklanmasligi uchun CONCURRENTLY (tranzaksiyadan tashqarida);
+    # partitioned jadvalda: ON ONLY + har partition CONCURRENTLY + ATTACH
+    with op.get_context().autocommit_block():
+        create_partitioned_index(op.get_bind(), 'ix_transactions_created_at_id', '(created_at, id)')
+        op.create_index('ix_transactions_archive_created_at_id', 'transactions_archive', ['created_at', 'id'],
+                        unique=False, postgresql_concurrently=True)
+        op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index('ix_cards_created_at_id', 'cards', ['created_at', 'id'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index('ix_savedcards_owner_user_id_alias_id', 'savedcards', ['owner_user_id', 'alias', 'id'],
+                        unique=False, postgresql_concurrently=True)
+    op.drop_index('ix_transactions_archive_created_at', table_name='transactions_archive')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_savedcards_owner_user_id_alias_id', table_name='savedcards')
+    op.drop_index('ix_cards_created_at_id', table_name='cards')
+    op.drop_index('ix_users_created_at_id', table_name='users')
+    op.create_index('ix_transactions_archive_created_at', 'transactions_archive', ['created_at'], unique=False)
+    op.drop_index('ix_transactions_archive_created_at_id', table_name='transactions_archive')
+    op.drop_index('ix_transactions_created_at_id', table_name='transactions')
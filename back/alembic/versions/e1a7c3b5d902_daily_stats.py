@@ -0,0 +1,53 @@
+"""daily stats
+
+Revision ID: e1a7c3b5d902
+Revises: 7b4c1f9e3a28
+Create Date: 2026-10-18 16:48:13.540271
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1a7c3b5d902'
+down_revision: Union[str, Sequence[str], None] = '7b4c1f9e3a28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('daily_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('sent_amount', sa.BigInteger(), nullable=False),
+    sa.Column('received_amount', sa.BigInteger(), nullable=False),
+    sa.Column('commission', sa.BigInteger(), nullable=False),
+    sa.Column('success_count', sa.Integer(), nullable=False),
+    sa.Column('failed_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+    op.create_index('ix_transactions_completed_at', 'transactions', ['completed_at'], unique=False)
+
+    # o'tgan kunlar bir marta yig'iladi, keyin job faqat yangi kunlarni qo'shadi
+    op.execute("""
+        INSERT INTO daily_stats (day, sent_amount, received_amount, commission, success_count, failed_count)
+        SELECT completed_at::date,
+               coalesce(sum(amount) FILTER (WHERE from_card_id IS NOT NULL), 0),
+               coalesce(sum(amount) FILTER (WHERE to_card_id IS NOT NULL), 0),
+               coalesce(sum(commission) FILTER (WHERE status = 'SUCCESS'), 0),
+               count(*) FILTER (WHERE status = 'SUCCESS'),
+               count(*) FILTER (WHERE status = 'FAILED')
+        FROM transactions
+        WHERE completed_at < current_date
+        GROUP BY completed_at::date
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transactions_completed_at', table_name='transactions')
+    op.drop_table('daily_stats')
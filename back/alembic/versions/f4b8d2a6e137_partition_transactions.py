@@ -0,0 +1,105 @@
+"""partition transactions by month
+
+Revision ID: f4b8d2a6e137
+Revises: e1a7c3b5d902
+Create Date: 2026-10-18 17:20:36.884012
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from datetime import date
+from app.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4b8d2a6e137'
+down_revision: Union[str, Sequence[str], None] = 'e1a7c3b5d902'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = "id, from_card_id, to_card_id, amount, commission, type, status, description, created_at, completed_at"
+
+
+def month_start(day: date, shift: int = 0) -> date:
+    month = day.year * 12 + day.month - 1 + shift
+    return date(month // 12, month % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # eski jadval nomi va index'lari bo'shatiladi (index nomlari schema bo'yicha yagona)
+    op.execute("ALTER TABLE transactions RENAME TO transactions_unpartitioned")
+    op.execute("ALTER TABLE transactions_unpartitioned RENAME CONSTRAINT transactions_pkey TO transactions_unpartitioned_pkey")
+    op.drop_index('ix_transactions_pending', table_name='transactions_unpartitioned')
+    op.drop_index('ix_transactions_completed_at', table_name='transactions_unpartitioned')
+
+    # partition key (created_at) PK tarkibida bo'lishi shart
+    op.execute("""
+        CREATE TABLE transactions (
+            id UUID NOT NULL,
+            from_card_id UUID REFERENCES cards (id),
+            to_card_id UUID NOT NULL REFERENCES cards (id),
+            amount BIGINT NOT NULL,
+            commission BIGINT NOT NULL,
+            type typetransaction NOT NULL,
+            status statustransaction NOT NULL,
+            description TEXT,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+            completed_at TIMESTAMP WITHOUT TIME ZONE,
+            CONSTRAINT transactions_pkey PRIMARY KEY (id, created_at),
+            CONSTRAINT "Check_amount_non_negative" CHECK (amount > 0),
+            CONSTRAINT "Check_comission_non_negative" CHECK (commission >= 0)
+        ) PARTITION BY RANGE (created_at)
+    """)
+
+    # eng eski oydan boshlab, joriy oydan keyin TRANSACTION_PARTITIONS_AHEAD oygacha
+    first = op.get_bind().scalar(sa.text("SELECT min(created_at) FROM transactions_unpartitioned"))
+    current = month_start(date.today())
+    month = month_start(first.date()) if first else current
+    last = month_start(current, settings.TRANSACTION_PARTITIONS_AHEAD)
+    while month <= last:
+        op.execute(f"CREATE TABLE transactions_{month:%Y_%m} PARTITION OF transactions "
+                   f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{month_start(month, 1):%Y-%m-%d}')")
+        month = month_start(month, 1)
+
+    # parent'dagi index'lar har bir partition'da avtomatik yaratiladi
+    op.create_index('ix_transactions_pending', 'transactions', ['created_at'], unique=False,
+                    postgresql_where=sa.text("status = 'PENDING'"))
+    op.create_index('ix_transactions_completed_at', 'transactions', ['completed_at'], unique=False)
+
+    op.execute(f"INSERT INTO transactions ({COLUMNS}) SELECT {COLUMNS} FROM transactions_unpartitioned")
+    op.drop_table('transactions_unpartitioned')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE transactions RENAME TO transactions_partitioned")
+    op.execute("ALTER TABLE transactions_partitioned RENAME CONSTRAINT transactions_pkey TO transactions_partitioned_pkey")
+    op.drop_index('ix_transactions_pending', table_name='transactions_partitioned')
+    op.drop_index('ix_transactions_completed_at', table_name='transactions_partitioned')
+
+    op.execute("""
+        CREATE TABLE transactions (
+            id UUID NOT NULL,
+            from_card_id UUID REFERENCES cards (id),
+            to_card_id UUID NOT NULL REFERENCES cards (id),
+            amount BIGINT NOT NULL,
+            commission BIGINT NOT NULL,
+            type typetransaction NOT NULL,
+            status statustransaction NOT NULL,
+            description TEXT,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+            completed_at TIMESTAMP WITHOUT TIME ZONE,
+            CONSTRAINT transactions_pkey PRIMARY KEY (id),
+            CONSTRAINT "Check_amount_non_negative" CHECK (amount > 0),
+            CONSTRAINT "Check_comission_non_negative" CHECK (commission >= 0)
+        )
+    """)
+    op.create_index('ix_transactions_pending', 'transactions', ['created_at'], unique=False,
+                    postgresql_where=sa.text("status = 'PENDING'"))
+    op.create_index('ix_transactions_completed_at', 'transactions', ['completed_at'], unique=False)
+
+    op.execute(f"INSERT INTO transactions ({COLUMNS}) SELECT {COLUMNS} FROM transactions_partitioned")
+    op.drop_table('transactions_partitioned')  # partition'lar ham birga o'chadi
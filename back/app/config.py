@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from decimal import Decimal
+from typing import Literal
 
 class Settings(BaseSettings):
     DATABASE_URL: str
@@ -10,6 +11,30 @@ class Settings(BaseSettings):
     PLATFORM_CARD: str
     REDIS_URL: str = "redis://redis:6379"
     SUBSCRIPTION_PRICE: Decimal
+    PLATFORM_SHARDS: int = 16
+    PLATFORM_SWEEP_SECONDS: int = 60
+    TRANSACTION_RETRIES: int = 3
+    TRANSACTION_RETRY_DELAY: float = 0.05
+    TRANSFER_ENGINE: Literal["orm", "sql"] = "orm"
+    HOT_ACCOUNT_MODE: bool = False
+    HOT_FLUSH_WINDOW_MS: int = 20
+    HOT_FLUSH_MAX_ITEMS: int = 100
+    SETTLEMENT_BATCH_SIZE: int = 200
+    SETTLEMENT_INTERVAL_SECONDS: int = 1
+    CHECKPOINT_INTERVAL_SECONDS: int = 300
+    RECONCILIATION_CHUNKS: int = 16
+    RECONCILIATION_CONCURRENCY: int = 4
+    RECONCILIATION_INTERVAL_MINUTES: int = 60
+    TRANSACTION_PARTITIONS_AHEAD: int = 3
+    ARCHIVE_AFTER_DAYS: int = 365
+    ARCHIVE_BATCH_SIZE: int = 5000
+    ACTIVITY_RETENTION_DAYS: int = 400
+    LEADERBOARD_RETENTION_DAYS: int = 30
+    LEADERBOARD_KEEP: int = 1000
+    EXPORT_DIR: str = "/data/export"
+    EXPORT_BATCH_SIZE: int = 10000
+    EXPORT_LAG_SECONDS: int = 300
+    COUNT_CACHE_SECONDS: int = 30
 
     class Config:
         env_file = ".env"
@@ -1,6 +1,11 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.exc import DBAPIError
+from fastapi import HTTPException, status
 from .config import settings
+import functools
+import asyncio
+import random
 import uuid
 
 # --- sqlalchemy engine
@@ -12,6 +17,9 @@ AsyncSessionLocal = sessionmaker(bind=engine, class_=AsyncSession, expire_on_com
 # --- class for sqlalchemy models
 Base = declarative_base()
 
+# --- serialization_failure, deadlock_detected
+RETRYABLE_SQLSTATES = {"40001", "40P01"}
+
 # --- get db session
 async def get_db():
     async with AsyncSessionLocal() as db:
@@ -23,5 +31,39 @@ async def get_db():
 # --- get transaction db session
 async def get_transaction_db():
     async with AsyncSessionLocal() as session:
-        async with session.begin():
+        try:
             yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+# --- deadlock/serialization xatosimi
+def is_retryable_error(exc: DBAPIError) -> bool:
+    return getattr(exc.orig, "sqlstate", None) in RETRYABLE_SQLSTATES
+
+# --- get_transaction_db endpoint'lari uchun: deadlock/serialization bo'lsa butun tranzaksiya qayta bajariladi
+def retry_transaction(endpoint):
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        db: AsyncSession = kwargs["db"]
+
+        for attempt in range(1, settings.TRANSACTION_RETRIES + 1):
+            try:
+                result = await endpoint(*args, **kwargs)
+                await db.commit()  # commit ham retry ichida (serialization xatosi commit'da chiqishi mumkin)
+                return result
+
+            except DBAPIError as exc:
+                await db.rollback()
+                if not is_retryable_error(exc):
+                    raise
+                if attempt == settings.TRANSACTION_RETRIES:
+                    raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                        detail="Tranzaksiya band, birozdan so'ng qayta urinib ko'ring")
+
+                # bounded exponential backoff + jitter
+                delay = settings.TRANSACTION_RETRY_DELAY * (2 ** (attempt - 1))
+                await asyncio.sleep(delay + random.uniform(0, delay))
+
+    return wrapper
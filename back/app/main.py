@@ -2,7 +2,7 @@ import os
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from app.tasks.subscription_renewal import scheduler
+from app.tasks.scheduler import scheduler
 from app.routers import *
 
 app = FastAPI(title="Chontak", 
@@ -46,6 +46,7 @@ app.include_router(card.router, prefix="/api/card", tags=["card"])
 app.include_router(saved_card.router, prefix="/api/saved-card", tags=["saved-card"])
 app.include_router(transactions.router, prefix="/api/transactions", tags=["transactions"])
 app.include_router(subscription.router, prefix="/api/subscription", tags=["subscription"])
+app.include_router(hold.router, prefix="/api/hold", tags=["hold"])
 
 # ----------------------
 @app.get("/", tags=["health"])
@@ -5,7 +5,19 @@ from .transaction import Transaction, TypeTransaction, StatusTransaction
 from .avatar import Avatar
 from .saved_card import SavedCard
 from .subscription import Subscription
+from .platform_shard import PlatformShard
+from .hot_credit import HotCredit
+from .hold import Hold, StatusHold
+from .ledger import LedgerEntry, BalanceCheckpoint
+from .reconciliation import ReconciliationRun, ReconciliationFinding, StatusRun
+from .daily_stat import DailyStat
+from .transaction_archive import TransactionArchive
+from .card_balance_snapshot import CardBalanceSnapshot
+from .card_monthly_stat import CardMonthlyStat, CardMonthlyRecipient
 
 __all__ = ["Base", "User", "Card", "SavedCard", "Transaction", "StatusCard",
-            "UserRole", "TypeTransaction", "StatusTransaction", "Avatar"]
+            "UserRole", "TypeTransaction", "StatusTransaction", "Avatar", "PlatformShard", "HotCredit",
+            "Hold", "StatusHold", "LedgerEntry", "BalanceCheckpoint",
+            "ReconciliationRun", "ReconciliationFinding", "StatusRun", "DailyStat",
+            "TransactionArchive", "CardBalanceSnapshot", "CardMonthlyStat", "CardMonthlyRecipient"]
 
@@ -1,10 +1,11 @@
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from sqlalchemy import (Column, DECIMAL, Integer, String, DateTime, Date, ForeignKey, TIMESTAMP, Enum, CheckConstraint)
+from sqlalchemy import (Column, Integer, String, Boolean, DateTime, Date, ForeignKey, TIMESTAMP, Enum, CheckConstraint, false, Index)
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 import enum
 from app.database import Base
+from .money import Money
 
 class StatusCard(str, enum.Enum):
     ACTIVE = "active"
@@ -15,23 +16,40 @@ class StatusCard(str, enum.Enum):
 # - - - - - Modul Card
 class Card(Base):
     __tablename__ = "cards"
-    __table_args__ = (CheckConstraint("balance >= 0", name="Check_balance_non_negative"),)
+    __table_args__ = (
+        CheckConstraint("balance >= 0", name="Check_balance_non_negative"),
+        CheckConstraint("reserved_balance >= 0", name="Check_reserved_balance_non_negative"),
+        CheckConstraint("balance >= reserved_balance", name="Check_reserved_balance_covered"),
+        Index("ix_cards_created_at_id", "created_at", "id"), # keyset pagination
+        # admin qidiruvi: '%...%' -> pg_trgm GIN, prefiks -> pattern B-tree
+        Index("ix_cards_card_number_trgm", "card_number", postgresql_using="gin",
+              postgresql_ops={"card_number": "gin_trgm_ops"}),
+        Index("ix_cards_card_number_pattern", "card_number", postgresql_ops={"card_number": "varchar_pattern_ops"}),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False) #FK
-    balance = Column(DECIMAL(15, 2), nullable=False, default=0.00)
+    balance = Column(Money, nullable=False, default=0.00)
+    reserved_balance = Column(Money, nullable=False, default=0.00, server_default="0") # hold'dagi pul
     card_number = Column(String, unique=True, nullable=False, index=True)
     status = Column(Enum(StatusCard), nullable=False, default=StatusCard.FROZEN)
     expiry_date = Column(Date, nullable=False)
+    is_hot = Column(Boolean, nullable=False, default=False, server_default=false()) # credit'lar guruhlab qo'shiladi
     created_at = Column(TIMESTAMP, server_default=func.now())
-    # relationship
-    user = relationship("User", back_populates="cards", uselist=False, lazy="selectin")
-    sent_money = relationship("Transaction", foreign_keys="[Transaction.from_card_id]", back_populates="from_card")
-    received_money = relationship("Transaction", foreign_keys="[Transaction.to_card_id]", back_populates="to_card")
-    subscriptions = relationship("Subscription", back_populates="card")
+    # relationship: user session'da bo'lsa (current_user) identity map'dan olinadi, aks holda options bilan
+    user = relationship("User", back_populates="cards", uselist=False, lazy="raise_on_sql")
+    sent_money = relationship("Transaction", foreign_keys="[Transaction.from_card_id]", back_populates="from_card",
+                              lazy="raise")
+    received_money = relationship("Transaction", foreign_keys="[Transaction.to_card_id]", back_populates="to_card",
+                                  lazy="raise")
+    subscriptions = relationship("Subscription", back_populates="card", lazy="raise")
 
     @property
     def owner_name(self) -> str:
         return self.user.full_name if self.user else "Noma'lum"
+
+    @property
+    def available_balance(self):
+        return self.balance - (self.reserved_balance or 0)
     
     
\ No newline at end of file
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Date, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+from .money import Money
+
+# - - - - - Modul CardBalanceSnapshot
+# kun oxiridagi balans, faqat harakat bo'lgan kunlar uchun (orasidagi kunlar oldingi qiymatni oladi)
+class CardBalanceSnapshot(Base):
+    __tablename__ = "card_balance_snapshots"
+
+    card_id = Column(UUID(as_uuid=True), ForeignKey("cards.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    balance = Column(Money, nullable=False)
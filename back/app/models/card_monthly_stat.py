@@ -0,0 +1,32 @@
+from sqlalchemy.sql import func
+from sqlalchemy import Column, Integer, Date, ForeignKey, TIMESTAMP, Index
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+from .money import Money
+
+# - - - - - Modul CardMonthlyStat
+# karta bo'yicha oylik yig'indi, o'tkazma commit bo'lgan tranzaksiyada yangilanadi (insights uchun)
+class CardMonthlyStat(Base):
+    __tablename__ = "card_monthly_stats"
+    __table_args__ = (Index("ix_card_monthly_stats_user_id_month", "user_id", "month"),)
+
+    card_id = Column(UUID(as_uuid=True), ForeignKey("cards.id"), primary_key=True)
+    month = Column(Date, primary_key=True) # oyning 1-kuni
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    spent = Column(Money, nullable=False, default=0)
+    income = Column(Money, nullable=False, default=0)
+    commission = Column(Money, nullable=False, default=0)
+    sent_count = Column(Integer, nullable=False, default=0)
+    received_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(TIMESTAMP, nullable=False, server_default=func.now(), onupdate=func.now())
+
+# - - - - - Modul CardMonthlyRecipient
+# karta -> qabul qiluvchi karta oylik yig'indisi (top recipients)
+class CardMonthlyRecipient(Base):
+    __tablename__ = "card_monthly_recipients"
+
+    card_id = Column(UUID(as_uuid=True), ForeignKey("cards.id"), primary_key=True)
+    month = Column(Date, primary_key=True)
+    to_card_id = Column(UUID(as_uuid=True), ForeignKey("cards.id"), primary_key=True)
+    amount = Column(Money, nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
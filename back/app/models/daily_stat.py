@@ -0,0 +1,17 @@
+from sqlalchemy.sql import func
+from sqlalchemy import Column, Integer, Date, TIMESTAMP
+from app.database import Base
+from .money import Money
+
+# - - - - - Modul DailyStat
+# o'tgan kunlar uchun dashboard rollup'i (bugun har doim live hisoblanadi)
+class DailyStat(Base):
+    __tablename__ = "daily_stats"
+
+    day = Column(Date, primary_key=True)
+    sent_amount = Column(Money, nullable=False, default=0)
+    received_amount = Column(Money, nullable=False, default=0)
+    commission = Column(Money, nullable=False, default=0)
+    success_count = Column(Integer, nullable=False, default=0)
+    failed_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(TIMESTAMP, nullable=False, server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,36 @@
+from sqlalchemy.sql import func
+from sqlalchemy import (Column, Text, ForeignKey, TIMESTAMP, Enum, CheckConstraint, Index, text)
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+import enum
+from app.database import Base
+from .money import Money
+from .transaction_ref import TransactionRef
+
+class StatusHold(str, enum.Enum):
+    ACTIVE = "active"
+    CAPTURED = "captured"
+    RELEASED = "released"
+    EXPIRED = "expired"
+
+# - - - - - Modul Hold
+# authorize -> capture/release: pul karta balansida qoladi, lekin reserved_balance'ga o'tadi
+class Hold(Base):
+    __tablename__ = "holds"
+    __table_args__ = (
+        CheckConstraint("amount > 0", name="Check_hold_amount_positive"),
+        CheckConstraint("commission >= 0", name="Check_hold_commission_non_negative"),
+        Index("ix_holds_active_expires_at", "expires_at", postgresql_where=text("status = 'ACTIVE'")),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    card_id = Column(UUID(as_uuid=True), ForeignKey("cards.id"), nullable=False, index=True)
+    to_card_id = Column(UUID(as_uuid=True), ForeignKey("cards.id"), nullable=False)
+    amount = Column(Money, nullable=False)
+    commission = Column(Money, nullable=False)
+    status = Column(Enum(StatusHold), nullable=False, default=StatusHold.ACTIVE)
+    description = Column(Text, nullable=True, default=None)
+    transaction_id = Column(TransactionRef, nullable=True) # capture bo'lgandan keyin
+    expires_at = Column(TIMESTAMP, nullable=False)
+    created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
+    completed_at = Column(TIMESTAMP, nullable=True)
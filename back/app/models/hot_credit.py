@@ -0,0 +1,16 @@
+from sqlalchemy.sql import func
+from sqlalchemy import Column, BigInteger, ForeignKey, TIMESTAMP, CheckConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+from .money import Money
+
+# - - - - - Modul HotCredit
+# hot kartaga tushgan, hali balansga qo'shilmagan credit'lar navbati (flusher guruhlab qo'shadi)
+class HotCredit(Base):
+    __tablename__ = "hot_credits"
+    __table_args__ = (CheckConstraint("amount > 0", name="Check_hot_credit_amount_positive"),)
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    card_id = Column(UUID(as_uuid=True), ForeignKey("cards.id"), nullable=False, index=True)
+    amount = Column(Money, nullable=False)
+    created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
@@ -0,0 +1,33 @@
+from sqlalchemy.sql import func
+from sqlalchemy import Column, BigInteger, ForeignKey, TIMESTAMP, Index
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+from .money import Money
+from .transaction_ref import TransactionRef
+
+# - - - - - Modul LedgerEntry
+# append-only: har bir pul harakati = kartalar bo'yicha +/- qatorlar, yig'indisi doim 0.
+# transactions'ga FK yo'q (keyinchalik partition qilinadi)
+class LedgerEntry(Base):
+    __tablename__ = "ledger_entries"
+    __table_args__ = (
+        Index("ix_ledger_entries_card_id_id", "card_id", "id"),
+        Index("ix_ledger_entries_card_id_created_at", "card_id", "created_at"),
+        Index("ix_ledger_entries_created_at", "created_at", postgresql_using="brin"), # append-only -> BRIN
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    card_id = Column(UUID(as_uuid=True), ForeignKey("cards.id"), nullable=False)
+    transaction_id = Column(TransactionRef, nullable=False)
+    amount = Column(Money, nullable=False) # credit > 0, debit < 0
+    created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
+
+# - - - - - Modul BalanceCheckpoint
+# karta balansi last_entry_id'gacha bo'lgan entry'lar bo'yicha (audit faqat undan keyingilarni yig'adi)
+class BalanceCheckpoint(Base):
+    __tablename__ = "balance_checkpoints"
+
+    card_id = Column(UUID(as_uuid=True), ForeignKey("cards.id"), primary_key=True)
+    balance = Column(Money, nullable=False)
+    last_entry_id = Column(BigInteger, nullable=False)
+    as_of = Column(TIMESTAMP, nullable=False, server_default=func.now())
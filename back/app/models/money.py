@@ -0,0 +1,31 @@
+from sqlalchemy import TypeDecorator, BigInteger
+from sqlalchemy.sql import operators
+from decimal import Decimal, ROUND_HALF_UP
+
+# ------------------
+def to_minor(value) -> int:
+    # so'm -> tiyin (1 so'm = 100 tiyin)
+    return int((Decimal(str(value)) * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+# ------------------
+def from_minor(value) -> Decimal:
+    return Decimal(value).scaleb(-2)
+
+# - - - - - Money type
+# bazada BIGINT (tiyin), Python va API tomonda esa Decimal (so'm)
+class Money(TypeDecorator):
+    impl = BigInteger
+    cache_ok = True
+
+    class comparator_factory(TypeDecorator.Comparator):
+        # balance - reserved_balance, amount + commission ham Money bo'lib qoladi (natija tiyin'dan qaytariladi)
+        def _adapt_expression(self, op, other_comparator):
+            if op in (operators.add, operators.sub):
+                return op, self.type
+            return super()._adapt_expression(op, other_comparator)
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else to_minor(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else from_minor(value)
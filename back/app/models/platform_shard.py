@@ -0,0 +1,15 @@
+from sqlalchemy.sql import func
+from sqlalchemy import Column, Integer, TIMESTAMP, CheckConstraint
+from app.database import Base
+from .money import Money
+
+# - - - - - Modul PlatformShard
+# platform kartaga tushadigan komissiya/obuna pullari avval shu shard'larga yig'iladi,
+# keyin sweep job ularni bitta UPDATE bilan platform kartaga o'tkazadi (hot row lock yo'q)
+class PlatformShard(Base):
+    __tablename__ = "platform_shards"
+    __table_args__ = (CheckConstraint("balance >= 0", name="Check_shard_balance_non_negative"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    balance = Column(Money, nullable=False, default=0.00)
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
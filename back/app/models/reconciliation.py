@@ -0,0 +1,42 @@
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey, TIMESTAMP, Enum
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+import enum
+from app.database import Base
+from .money import Money
+
+class StatusRun(str, enum.Enum):
+    RUNNING = "running"
+    FINISHED = "finished"
+    FAILED = "failed"
+
+# - - - - - Modul ReconciliationRun
+class ReconciliationRun(Base):
+    __tablename__ = "reconciliation_runs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    status = Column(Enum(StatusRun), nullable=False, default=StatusRun.RUNNING)
+    chunks = Column(Integer, nullable=False)
+    total_cards = Column(Integer, nullable=False, default=0)
+    invalid_cards = Column(Integer, nullable=False, default=0)
+    started_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
+    finished_at = Column(TIMESTAMP, nullable=True)
+    # relationship
+    findings = relationship("ReconciliationFinding", back_populates="run", cascade="all, delete-orphan", lazy="raise")
+
+# - - - - - Modul ReconciliationFinding
+# faqat farq topilgan kartalar yoziladi
+class ReconciliationFinding(Base):
+    __tablename__ = "reconciliation_findings"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    run_id = Column(UUID(as_uuid=True), ForeignKey("reconciliation_runs.id", ondelete="CASCADE"), nullable=False, index=True)
+    card_id = Column(UUID(as_uuid=True), nullable=False)
+    card_number = Column(String, nullable=False)
+    stored_balance = Column(Money, nullable=False)
+    calculated_balance = Column(Money, nullable=False)
+    difference = Column(Money, nullable=False)
+    # relationship
+    run = relationship("ReconciliationRun", back_populates="findings", lazy="raise_on_sql")
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import relationship
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from app.database import Base
 import uuid
@@ -7,6 +7,7 @@ import uuid
 # - - - - - Saved Card
 class SavedCard(Base):
     __tablename__ = "savedcards"
+    __table_args__ = (Index("ix_savedcards_owner_user_id_alias_id", "owner_user_id", "alias", "id"),) # keyset pagination
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     owner_user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
@@ -14,5 +15,5 @@ class SavedCard(Base):
     card_holder_name = Column(String(60), nullable=False)
     alias = Column(String(50), nullable=False)
 
-    owner_user = relationship("User", back_populates="saved_cards")
+    owner_user = relationship("User", back_populates="saved_cards", lazy="raise_on_sql")
 
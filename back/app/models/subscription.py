@@ -1,9 +1,10 @@
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from sqlalchemy import (Column, DECIMAL, DateTime, Boolean, ForeignKey, TIMESTAMP, DATE)
+from sqlalchemy import (Column, DateTime, Boolean, ForeignKey, TIMESTAMP, DATE)
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 from app.database import Base
+from .money import Money
 
 class Subscription(Base):
     __tablename__ = "subscriptions"
@@ -11,11 +12,11 @@ class Subscription(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     card_id = Column(UUID(as_uuid=True), ForeignKey("cards.id"), nullable=False)
-    price = Column(DECIMAL(10, 2), nullable=False, default=85000.00)
+    price = Column(Money, nullable=False, default=85000.00)
     created_at = Column(TIMESTAMP, server_default=func.now())
     next_payment_at = Column(DATE, nullable=False)
     is_active = Column(Boolean, default=True)
 
-    user = relationship("User", back_populates="subscriptions")
-    card = relationship("Card", back_populates="subscriptions")
+    user = relationship("User", back_populates="subscriptions", lazy="raise_on_sql")
+    card = relationship("Card", back_populates="subscriptions", lazy="raise_on_sql")
 
@@ -1,10 +1,13 @@
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from sqlalchemy import (Column, Integer, String, Text, DECIMAL, DateTime, ForeignKey, TIMESTAMP, Enum, CheckConstraint)
+from sqlalchemy import (Column, Integer, String, Text, DateTime, ForeignKey, TIMESTAMP, Enum, CheckConstraint,
+                        Index, text)
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 import enum
 from app.database import Base
+from .money import Money
+from .transaction_ref import TransactionRef
 from app.services.transaction import id_for_transaction
 
 class TypeTransaction(str, enum.Enum):
@@ -16,29 +19,60 @@ class StatusTransaction(str, enum.Enum):
     SUCCESS = "success"
     FAILED = "failed"
 
+# - - - - - Snapshot columns
+# insert paytidagi karta/egasi: tarix cards/users join'larisiz o'qiladi (transactions va archive'da bir xil)
+class TransactionPartiesMixin:
+    from_user_id = Column(UUID(as_uuid=True), nullable=True)
+    to_user_id = Column(UUID(as_uuid=True), nullable=False)
+    from_card_number = Column(String(16), nullable=True)
+    to_card_number = Column(String(16), nullable=False)
+    from_owner_name = Column(String, nullable=True)
+    to_owner_name = Column(String, nullable=False)
+
+    @property
+    def from_party(self) -> dict | None:
+        if self.from_card_number is None: # admin deposit
+            return None
+        return {"owner_name": self.from_owner_name, "card_number": self.from_card_number}
+
+    @property
+    def to_party(self) -> dict:
+        return {"owner_name": self.to_owner_name, "card_number": self.to_card_number}
+
 # - - - - - Modul Transaction
-class Transaction(Base):
+class Transaction(TransactionPartiesMixin, Base):
     __tablename__ = "transactions"
     __table_args__ = (
         CheckConstraint("amount > 0", name="Check_amount_non_negative"),
         CheckConstraint("commission >= 0", name="Check_comission_non_negative"),
+        Index("ix_transactions_pending", "created_at", postgresql_where=text("status = 'PENDING'")),
+        Index("ix_transactions_completed_at", "completed_at"),
+        Index("ix_transactions_created_at_id", "created_at", "id"), # keyset pagination
+        Index("ix_transactions_from_user_id_created_at", "from_user_id", "created_at", "id"), # tarix
+        Index("ix_transactions_to_user_id_created_at", "to_user_id", "created_at", "id"),
+        # admin karta raqami qidiruvi (pg_trgm)
+        Index("ix_transactions_from_card_number_trgm", "from_card_number", postgresql_using="gin",
+              postgresql_ops={"from_card_number": "gin_trgm_ops"}),
+        Index("ix_transactions_to_card_number_trgm", "to_card_number", postgresql_using="gin",
+              postgresql_ops={"to_card_number": "gin_trgm_ops"}),
+        {"postgresql_partition_by": "RANGE (created_at)"}, # oylik partition'lar (services/partitions.py)
     )
 
-    id = Column(String, primary_key=True, default=id_for_transaction, index=True)
+    id = Column(TransactionRef, primary_key=True, default=id_for_transaction) # UUIDv7
     from_card_id = Column(UUID(as_uuid=True), ForeignKey("cards.id"), nullable=True) # null --> admin deposit
     to_card_id = Column(UUID(as_uuid=True), ForeignKey('cards.id'), nullable=False)
-    amount = Column(DECIMAL(15, 2), nullable=False)
-    commission = Column(DECIMAL(15, 2), nullable=False)
+    amount = Column(Money, nullable=False)
+    commission = Column(Money, nullable=False)
     type = Column(Enum(TypeTransaction), nullable=False, default=TypeTransaction.TRANSFER)
     status = Column(Enum(StatusTransaction), nullable=False, default=StatusTransaction.PENDING)
     description = Column(Text, nullable=True, default=None)
-    created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
+    created_at = Column(TIMESTAMP, primary_key=True, nullable=False, server_default=func.now()) # partition key PK'da bo'lishi shart
     completed_at = Column(TIMESTAMP, nullable=True)
     # relationship
     from_card = relationship("Card", foreign_keys="[Transaction.from_card_id]", 
-                                back_populates="sent_money", uselist=False, lazy="selectin")
+                                back_populates="sent_money", uselist=False, lazy="raise")
     to_card = relationship("Card", foreign_keys="[Transaction.to_card_id]", 
-                              back_populates="received_money", uselist=False, lazy="selectin")
+                              back_populates="received_money", uselist=False, lazy="raise")
 
 
 
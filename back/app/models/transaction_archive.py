@@ -0,0 +1,40 @@
+from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Text, TIMESTAMP, Enum, Index
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+from .money import Money
+from .transaction_ref import TransactionRef
+from .transaction import TypeTransaction, StatusTransaction, TransactionPartiesMixin
+
+# - - - - - Modul TransactionArchive
+# ARCHIVE_AFTER_DAYS'dan eski yakunlangan tranzaksiyalar (transactions bilan bir xil ustunlar).
+# FK yo'q: kartalar bilan faqat o'qish uchun bog'lanadi, response Transaction bilan bir xil
+class TransactionArchive(TransactionPartiesMixin, Base):
+    __tablename__ = "transactions_archive"
+    __table_args__ = (
+        Index("ix_transactions_archive_from_card_id_created_at", "from_card_id", "created_at"),
+        Index("ix_transactions_archive_to_card_id_created_at", "to_card_id", "created_at"),
+        Index("ix_transactions_archive_created_at_id", "created_at", "id"), # keyset pagination
+        Index("ix_transactions_archive_from_user_id_created_at", "from_user_id", "created_at", "id"),
+        Index("ix_transactions_archive_to_user_id_created_at", "to_user_id", "created_at", "id"),
+        Index("ix_transactions_archive_from_card_number_trgm", "from_card_number", postgresql_using="gin",
+              postgresql_ops={"from_card_number": "gin_trgm_ops"}),
+        Index("ix_transactions_archive_to_card_number_trgm", "to_card_number", postgresql_using="gin",
+              postgresql_ops={"to_card_number": "gin_trgm_ops"}),
+    )
+
+    id = Column(TransactionRef, primary_key=True)
+    from_card_id = Column(UUID(as_uuid=True), nullable=True)
+    to_card_id = Column(UUID(as_uuid=True), nullable=False)
+    amount = Column(Money, nullable=False)
+    commission = Column(Money, nullable=False)
+    type = Column(Enum(TypeTransaction), nullable=False)
+    status = Column(Enum(StatusTransaction), nullable=False)
+    description = Column(Text, nullable=True)
+    created_at = Column(TIMESTAMP, nullable=False)
+    completed_at = Column(TIMESTAMP, nullable=True)
+    # relationship
+    from_card = relationship("Card", primaryjoin="foreign(TransactionArchive.from_card_id) == Card.id",
+                             viewonly=True, uselist=False, lazy="raise")
+    to_card = relationship("Card", primaryjoin="foreign(TransactionArchive.to_card_id) == Card.id",
+                           viewonly=True, uselist=False, lazy="raise")
@@ -0,0 +1,16 @@
+from sqlalchemy import TypeDecorator
+from sqlalchemy.dialects.postgresql import UUID
+from app.services.transaction import transaction_ref, parse_transaction_ref
+
+# - - - - - TransactionRef type
+# bazada native UUID (v7, vaqt bo'yicha tartiblangan), Python va API tomonda "PBC-..." ko'rinishi
+class TransactionRef(TypeDecorator):
+    impl = UUID(as_uuid=True)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        # noto'g'ri ref NULL bo'lib ketadi -> so'rov hech narsa topmaydi (404)
+        return None if value is None else parse_transaction_ref(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else transaction_ref(value)
@@ -1,6 +1,6 @@
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from sqlalchemy import Column, Integer, String, DateTime, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Enum, Index
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 import enum
@@ -14,6 +14,15 @@ class UserRole(str, enum.Enum):
 # - - - - - Modul User
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_created_at_id", "created_at", "id"), # keyset pagination
+        # admin qidiruvi: '%...%' va similarity -> pg_trgm GIN, telefon prefiksi -> pattern B-tree
+        Index("ix_users_full_name_trgm", "full_name", postgresql_using="gin",
+              postgresql_ops={"full_name": "gin_trgm_ops"}),
+        Index("ix_users_phone_number_trgm", "phone_number", postgresql_using="gin",
+              postgresql_ops={"phone_number": "gin_trgm_ops"}),
+        Index("ix_users_phone_number_pattern", "phone_number", postgresql_ops={"phone_number": "varchar_pattern_ops"}),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     full_name = Column(String, nullable=False)
@@ -21,11 +30,11 @@ class User(Base):
     hashed_password = Column(String, nullable=False)
     role = Column(Enum(UserRole), nullable=False, default=UserRole.USER)
     created_at = Column(DateTime(timezone=True), server_default=func.now()) # utc mitaqa vaqti bilan, psql vaqtni oladi
-    # relationship
-    cards = relationship("Card", back_populates="user", lazy='selectin')
+    # relationship: hech biri avtomatik yuklanmaydi, endpoint o'ziga keraklisini options bilan so'raydi
+    cards = relationship("Card", back_populates="user", lazy='raise')
     avatar = relationship("Avatar", back_populates="user", uselist=False, 
-                          lazy='selectin', cascade="all, delete-orphan")
-    saved_cards = relationship("SavedCard", back_populates="owner_user")
-    subscriptions = relationship("Subscription", back_populates="user")
+                          lazy='raise', cascade="all, delete-orphan")
+    saved_cards = relationship("SavedCard", back_populates="owner_user", lazy='raise')
+    subscriptions = relationship("Subscription", back_populates="user", lazy='raise')
 
 
@@ -1,13 +1,14 @@
 
-from .admin import router as admin_router   # 13
+from .admin import router as admin_router   # 18
 from .auth import router as auth_router     # 7
 from .avatar import router as avatar_router # 2
-from .card import router as card_router     # 5
+from .card import router as card_router     # 6
 from .saved_card import router as saved_card_router    # 5
-from .transactions import router as transaction_router # 3
+from .transactions import router as transaction_router # 5
 from .subscription import router as subscription_router # 2
+from .hold import router as hold_router # 4
 
-# all endpoints = 37
+# all endpoints = 49
 
 all_routers = [
     admin_router,  
@@ -16,5 +17,6 @@ all_routers = [
     card_router,
     saved_card_router,
     transaction_router,
-    subscription_router
+    subscription_router,
+    hold_router
 ]
\ No newline at end of file
@@ -1,15 +1,27 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi import APIRouter, HTTPException, status, Depends, Query, BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_, Date
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, func, or_, case, Date
+from sqlalchemy.orm import selectinload, joinedload
 from app.database import *
 from app.config import settings
 from app.services.auth import get_current_user
 from app.services.transaction import *
 from app.services.admin import *
+from app.services.platform import get_platform_pending
+from app.services.hot_account import get_hot_pending
+from app.services.ledger import post_transfer, ledger_balance_of
+from app.services.insights import record_transfer
+from app.services.analytics import get_activity, get_top_transfers, get_top_cards, Leaderboard
+from app.services.reconciliation import create_run, run_reconciliation
+from app.services.daily_stats import get_day_stats
+from app.services.archive import transactions_source
+from app.services.pagination import paginate, total_pages
+from app.services.search import admin_search
+from app.schemas.pagination import CountMode
 from app.schemas.transaction import *
 from app.schemas.card import *
 from app.schemas.user import *
+from app.schemas.search import *
 from app.models import *
 from uuid import UUID
 from datetime import date, timedelta
@@ -20,14 +32,14 @@ router = APIRouter()
 
 # ------------------------------ 1.endpoint
 @router.post("/deposit", response_model=TransactionResponse, status_code=status.HTTP_201_CREATED)
+@retry_transaction
 async def deposit(tc: TransactionCreate,
                   current_user: User = Depends(get_current_user),
                   db: AsyncSession = Depends(get_transaction_db)):
     
     check_admin(current_user)
 
-    depositer = await get_sender_card_with_lock(db, tc.from_card_id, current_user)
-    receiver = await get_receiver_card_with_lock(db, tc.to_card_number)
+    depositer, receiver = await lock_transfer_cards(db, tc.from_card_id, tc.to_card_number, current_user)
 
     total_amount, commission = validator_transaction(
         from_card=depositer,
@@ -46,12 +58,17 @@ async def deposit(tc: TransactionCreate,
         type = TypeTransaction.DEPOSIT,
         status = StatusTransaction.SUCCESS,
         description = tc.description,
-        completed_at = func.now()
+        completed_at = func.now(),
+        **snapshot_columns(None, receiver)
     )
 
     db.add(new_deposit)
 
     await db.flush()
+    # transactions'da from_card yo'q (deposit), ledger'da esa admin karta debit qilinadi
+    await post_transfer(db, new_deposit.id, depositer.id, receiver.id, tc.amount, commission)
+    # deposit admin kartaning xarajati emas: rebuild (from_card_id IS NOT NULL) bilan bir xil, faqat income
+    await record_transfer(db, None, receiver.id, tc.amount, commission)
     await db.refresh(new_deposit)
 
     return new_deposit
@@ -65,13 +82,18 @@ async def get_platform_card(current_user: User = Depends(get_current_user),
     check_admin(current_user)
     
     result = await db.execute(select(Card)
-                     .where(Card.card_number == settings.PLATFORM_CARD).with_for_update(of=Card))
+                     .options(joinedload(Card.user, innerjoin=True))
+                     .where(Card.card_number == settings.PLATFORM_CARD))
                             
     card = result.unique().scalar_one_or_none()
     if not card:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Platform card mavjud emas")
     
-    return card
+    # shard'larda hali sweep qilinmagan summa ham platform balansiga kiradi
+    platform_card = CardResponse.model_validate(card)
+    platform_card.balance = card.balance + await get_platform_pending(db)
+
+    return platform_card
 
 
 # ------------------------------ 3.endpoint
@@ -81,8 +103,10 @@ async def get_all_users(current_user: User = Depends(get_current_user),
                         search_role: UserRole = Query(None),
                         search_name: str = Query(None, min_length=3, max_length=60),
                         search_number: str = Query(None, min_length=3, max_length=16),
-                        page: int = Query(1, ge=1),
-                        limit: int = Query(10, le=30)
+                        limit: int = Query(10, le=30),
+                        cursor: str = Query(None),
+                        count: CountMode = Query(CountMode.ESTIMATE),
+                        page: int = Query(None, ge=1, deprecated=True)
                         ):
     
     # Basic validation
@@ -100,24 +124,19 @@ async def get_all_users(current_user: User = Depends(get_current_user),
     if search_role:
         query = query.where(User.role == search_role)
 
-    # .count(users)
-    count_users = await db.execute(select(func.count()).select_from(query.subquery()))
-    total_users = count_users.unique().scalar() or 0
-
-    # pagination
-    offset = (page - 1) * limit
-    query = query.order_by(User.created_at.desc()).offset(offset).limit(limit)
-
-    # result
-    result = await db.execute(query)
-    users = result.unique().scalars().all()
+    # keyset pagination (created_at, id)
+    users = await paginate(db, query.options(selectinload(User.avatar)), [User.created_at, User.id],
+                           limit, cursor, count, ["users"], page,
+                           filtered=any((search_name, search_number, search_role)))
 
     return UserListResponse(
-        total_users = total_users,
+        total_users = users.total,
         page = page,
         limit = limit,
-        total_pages = (total_users + limit - 1) // limit,
-        data = users
+        total_pages = total_pages(users.total, limit),
+        next_cursor = users.next_cursor,
+        prev_cursor = users.prev_cursor,
+        data = users.items
     )
 
 
@@ -144,8 +163,10 @@ async def get_all_cards(current_user: User = Depends(get_current_user),
                         db: AsyncSession = Depends(get_db),
                         search_owner: str = Query(None, min_length=3, max_length=50),
                         search_card_number: str = Query(None, min_length=2, max_length=16),
-                        page: int = Query(1, ge=1),
-                        limit: int = Query(8, le=50)
+                        limit: int = Query(8, le=50),
+                        cursor: str = Query(None),
+                        count: CountMode = Query(CountMode.ESTIMATE),
+                        page: int = Query(None, ge=1, deprecated=True)
                         ):
     
     # validation basics
@@ -159,24 +180,19 @@ async def get_all_cards(current_user: User = Depends(get_current_user),
     if search_card_number:
         query = query.where(Card.card_number.ilike(f"%{search_card_number}%"))
 
-    # .count(Cards)
-    count_cards = await db.execute(select(func.count()).select_from(query.subquery()))
-    total_cards = count_cards.scalar() or 0
-
-    # pagination
-    offset = (page - 1) * limit
-    query = query.order_by(Card.created_at.desc()).offset(offset).limit(limit)
-
-    # result
-    result = await db.execute(query.options(selectinload(Card.user)))
-    cards = result.scalars().all()
+    # keyset pagination (created_at, id)
+    cards = await paginate(db, query.options(selectinload(Card.user)), [Card.created_at, Card.id],
+                           limit, cursor, count, ["cards"], page,
+                           filtered=any((search_owner, search_card_number)))
 
     return CardListResponse(
-        total_cards = total_cards,
+        total_cards = cards.total,
         page = page,
         limit = limit,
-        total_pages = (total_cards + limit - 1) // limit,
-        data = cards
+        total_pages = total_pages(cards.total, limit),
+        next_cursor = cards.next_cursor,
+        prev_cursor = cards.prev_cursor,
+        data = cards.items
     )
 
 
@@ -208,50 +224,47 @@ async def get_all_transaction(current_user: User = Depends(get_current_user),
                               start_date: date = Query(None),
                               end_date: date = Query(None),
                               card_number: str = Query(None, min_length=16, max_length=16),
-                              page: int = Query(1, ge=1),
-                              limit: int = Query(10, le=30)
+                              limit: int = Query(10, le=30),
+                              cursor: str = Query(None),
+                              count: CountMode = Query(CountMode.ESTIMATE),
+                              page: int = Query(None, ge=1, deprecated=True)
                              ):
     
     # validation basics
     check_admin(current_user)
     
-    query = select(Transaction)
+    # start_date horizon'dan eski yoki yo'q bo'lsa archive ham o'qiladi
+    T = transactions_source(start_date)
+    query = select(T)
 
     # searching/filtering
     if min_amount:
-        query = query.where(Transaction.amount >= min_amount)
+        query = query.where(T.amount >= min_amount)
     if max_amount:
-        query = query.where(Transaction.amount <= max_amount)
+        query = query.where(T.amount <= max_amount)
     if start_date:
-        query = query.where(Transaction.created_at >= start_date)
+        query = query.where(T.created_at >= start_date)
     if end_date:
-        query = query.where(Transaction.created_at <= end_date)
+        query = query.where(T.created_at < end_date + timedelta(days=1)) # end_date kuni ham kiradi
     if card_number: 
-        query = query.where(or_(Transaction.from_card.has((Card.card_number.ilike(f"%{card_number}%"))),
-                                 Transaction.to_card.has(Card.card_number.ilike(f"%{card_number}%"))
+        query = query.where(or_(T.from_card_number.ilike(f"%{card_number}%"),
+                                T.to_card_number.ilike(f"%{card_number}%")
                               )
                           )
                            
     
-    # .count(transaction)
-    count = await db.execute(select(func.count()).select_from(query.subquery()))
-    total_transaction = count.scalar() or 0
-
-    # pagination
-    offset = (page - 1) * limit
-    query = query.order_by(Transaction.created_at.desc()).offset(offset).limit(limit)
-
-    # result
-    result = await db.execute(query.options(selectinload(Transaction.from_card),
-                                            selectinload(Transaction.to_card)))
-    transactions = result.scalars().all()
+    # keyset pagination (created_at, id)
+    transactions = await paginate(db, query, [T.created_at, T.id], limit, cursor, count, ["transactions"], page,
+                                  filtered=any((min_amount, max_amount, start_date, end_date, card_number)))
 
     return TransactionListResponse(
-        total = total_transaction,
+        total = transactions.total,
         page = page,
         limit = limit,
-        total_pages = (total_transaction + limit - 1) // limit,
-        data = transactions
+        total_pages = total_pages(transactions.total, limit),
+        next_cursor = transactions.next_cursor,
+        prev_cursor = transactions.prev_cursor,
+        data = transactions.items
         )
     
 
@@ -264,12 +277,14 @@ async def get_one_transaction(transaction_id: str,
     
     check_admin(current_user)
 
-    result = await db.execute(select(Transaction)
-                     .options(selectinload(Transaction.from_card).selectinload(Card.user), 
-                              selectinload(Transaction.to_card).selectinload(Card.user))
-                     .where(Transaction.id == transaction_id))
-    
-    transaction = result.scalar_one_or_none()
+    # avval hot jadval, topilmasa archive
+    for T in (Transaction, TransactionArchive):
+        result = await db.execute(select(T).where(T.id == transaction_id))
+        
+        transaction = result.scalar_one_or_none()
+        if transaction:
+            break
+
     if not transaction:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bu transaction topilmadi !")
 
@@ -285,7 +300,7 @@ async def update_satatus_card(card_id: UUID,
     
     check_admin(current_user)
     
-    result = await db.execute(select(Card).where(Card.id == card_id))
+    result = await db.execute(select(Card).options(joinedload(Card.user, innerjoin=True)).where(Card.id == card_id))
     card = result.unique().scalar_one_or_none()
     if not card:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Bunday card mavjud emas")
@@ -325,7 +340,7 @@ async def update_user_role(user_id: UUID,
         to_user(user)
 
     await db.commit()
-    await db.refresh(user)
+    await db.refresh(user, ["avatar"])
 
     return user
 
@@ -340,71 +355,58 @@ async def get_verify_balances(current_user: User = Depends(get_current_user),
     # Filter
     check_admin(current_user)
 
-    query = select(
-        Card.id, Card.card_number, Card.balance.label("stored_balance"),
-
-        func.coalesce(select(func.sum(Transaction.amount))
-                      .where(Transaction.to_card_id == Card.id,
-                      Transaction.status == StatusTransaction.SUCCESS)
-                      .scalar_subquery(), 0
-        ).label("total_incoming"),
-                   
-        func.coalesce(select(func.sum(Transaction.amount + Transaction.commission))
-                      .where(Transaction.from_card_id == Card.id,
-                      Transaction.status == StatusTransaction.SUCCESS)
-                      .scalar_subquery(), 0
-        ).label("total_outgoing")
-    )
+    # hisob background job'da, bu yerda faqat oxirgi yakunlangan hisobot o'qiladi
+    # (RUNNING/FAILED run'ning findings'lari to'liq emas)
+    run = await db.scalar(select(ReconciliationRun)
+                          .where(ReconciliationRun.status == StatusRun.FINISHED)
+                          .order_by(ReconciliationRun.started_at.desc()).limit(1))
+    if not run:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Hali reconciliation hisoboti yo'q")
+
+    # hozir ishlayotgan (yoki oxirgi yiqilgan) run alohida ko'rsatiladi
+    latest = await db.scalar(select(ReconciliationRun).order_by(ReconciliationRun.started_at.desc()).limit(1))
+
+    query = select(ReconciliationFinding).where(ReconciliationFinding.run_id == run.id)
 
     # Search
     if search_number:
-        query = query.where(Card.card_number.ilike(f"%{search_number}%"))
-
-    # Calcualtion in db
-    subq = query.subquery()
-    total_cards = await db.scalar(select(func.count()).select_from(subq))
-   
-    total_invalid = select(func.count()).select_from(subq).where(
-        func.abs(subq.c.stored_balance - (subq.c.total_incoming - subq.c.total_outgoing)) > 0.01
-    )
-    
-    total_invalid_cards = await db.scalar(total_invalid)
-   
-    total_valid_cards = total_cards - total_invalid_cards
-   
-    # Pagination
-    offset = (page - 1) * limit
-    query = query.order_by(Card.created_at.desc()).offset(offset).limit(limit)
+        query = query.where(ReconciliationFinding.card_number.ilike(f"%{search_number}%"))
 
-    # result
-    result = await db.execute(query)
-    rows = result.unique().all()
+    total_findings = await db.scalar(select(func.count()).select_from(query.subquery()))
 
-    invalid_cards = []
-    valid_card_count = 0
-
-    for row in rows:
-        calculated_balance = row.total_incoming - row.total_outgoing 
-        difference = row.stored_balance - calculated_balance
+    # Pagination
+    offset = (page - 1) * limit
+    result = await db.execute(query.order_by(ReconciliationFinding.id).offset(offset).limit(limit))
+    findings = result.scalars().all()
 
-        if abs(difference) > 0.01:
-            invalid_cards.append({
-                "card_number": row.card_number,
-                "stored_balance": row.stored_balance,
-                "calculated_balance": calculated_balance,
-                "difference": difference
-            })
-        else:
-            valid_card_count += 1
+    duration = (run.finished_at - run.started_at).total_seconds() if run.finished_at else None
 
     return {
-        "total_page": (total_cards + limit -1) // limit,
-        "total_cards": total_cards,
-        "total_valid_cards": total_valid_cards,
-        "total_invalid_cards": total_invalid_cards,
+        "run": {
+            "id": run.id,
+            "status": run.status.value,
+            "started_at": run.started_at,
+            "finished_at": run.finished_at,
+            "duration_seconds": duration,
+            "cards_per_second": round(run.total_cards / duration, 2) if duration else None
+        },
+        "latest_run": None if latest.id == run.id else {
+            "id": latest.id,
+            "status": latest.status.value,
+            "started_at": latest.started_at
+        },
+        "total_page": (total_findings + limit -1) // limit,
+        "total_cards": run.total_cards,
+        "total_valid_cards": run.total_cards - run.invalid_cards,
+        "total_invalid_cards": run.invalid_cards,
         "page": page,
         "limit": limit,
-        "bug_details": invalid_cards
+        "bug_details": [{
+            "card_number": finding.card_number,
+            "stored_balance": finding.stored_balance,
+            "calculated_balance": finding.calculated_balance,
+            "difference": finding.difference
+        } for finding in findings]
     }
 
 
@@ -421,16 +423,14 @@ async def get_verify_balance(card_id: UUID,
     if not card:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bunday karta topilmadi !")
 
-    incoming = await db.scalar(
-        select(func.coalesce(func.sum(Transaction.amount), 0))
-        .where(Transaction.to_card_id == card_id, Transaction.status == StatusTransaction.SUCCESS))
-    
-    outgoing = await db.scalar(
-        select(func.coalesce(func.sum(Transaction.amount + Transaction.commission), 0))
-        .where(Transaction.from_card_id == card_id, Transaction.status == StatusTransaction.SUCCESS))
+    # checkpoint + undan keyingi ledger entry'lar (butun tarix emas)
+    calculated_balance = await db.scalar(select(ledger_balance_of(card_id)))
     
-    calculated_balance = incoming - outgoing
-    difference = card.balance - calculated_balance
+    stored_balance = card.balance + await get_hot_pending(db, card.id)
+    if card.card_number == settings.PLATFORM_CARD:
+        stored_balance += await get_platform_pending(db)
+
+    difference = stored_balance - calculated_balance
 
     return {
         "card_info": {
@@ -439,10 +439,10 @@ async def get_verify_balance(card_id: UUID,
             "owner_id": card.user_id
         },
         "audit": {
-            "stored_balance": card.balance,
+            "stored_balance": stored_balance,
             "calculated_balance": calculated_balance,
             "difference": difference,
-            "status": "OK" if abs(difference) < 0.01 else "Error"
+            "status": "OK" if difference == 0 else "Error"
         }
     }
 
@@ -459,28 +459,18 @@ async def get_dashboard(current_user: User = Depends(get_current_user),
         calendar = date.today()
 
     total_balance = await db.scalar(select(func.coalesce(func.sum(Card.balance), 0)))
+    total_balance += await get_platform_pending(db) + await get_hot_pending(db)
     
-    sender_transaction = await db.scalar(select(func.coalesce(func.sum(Transaction.amount), 0))
-                            .where(func.cast(Transaction.completed_at, Date) == calendar,
-                                   Transaction.from_card_id.isnot(None)))
+    # o'tgan kun daily_stats'dan, bugun bitta live so'rov bilan
+    stats = await get_day_stats(db, calendar)
+    sender_transaction = stats.sent_amount
     # bu ikkisini haqiqiy ko'rinishi withdraval type' bilan keyinchalik qoshiladi
-    receiver_transaction = await db.scalar(select(func.coalesce(func.sum(Transaction.amount), 0))
-                            .where(func.cast(Transaction.completed_at, Date) == calendar,
-                                   Transaction.to_card_id.isnot(None)))
-
-    total_commission = await db.scalar(select(func.coalesce(func.sum(Transaction.commission), 0))
-                               .where(func.cast(Transaction.completed_at, Date) == calendar,
-                                      Transaction.status == StatusTransaction.SUCCESS))
+    receiver_transaction = stats.received_amount
+    total_commission = stats.commission
 
     # math
-    count_success = await db.scalar(select(func.count(Transaction.id))
-                         .where(Transaction.status == StatusTransaction.SUCCESS,
-                                func.cast(Transaction.completed_at, Date) == calendar))
-
-
-    count_failed = await db.scalar(select(func.count(Transaction.id))
-                        .where(Transaction.status == StatusTransaction.FAILED,
-                               func.cast(Transaction.completed_at, Date) == calendar))
+    count_success = stats.success_count
+    count_failed = stats.failed_count
     
     total = count_success + count_failed
 
@@ -492,7 +482,8 @@ async def get_dashboard(current_user: User = Depends(get_current_user),
         percent_success = 0
         percent_failed = 0
 
-
+    # unique foydalanuvchilar: Redis HyperLogLog (COUNT DISTINCT scan'siz)
+    activity = await get_activity(calendar)
     
     return DashboardResponse(
         total_balance = total_balance,
@@ -503,7 +494,78 @@ async def get_dashboard(current_user: User = Depends(get_current_user),
         success_transfers_count = count_success,
         failed_transfers_count = count_failed,
         success_percent = percent_success,
-        failed_percent = percent_failed
+        failed_percent = percent_failed,
+        **activity
     )
-                            
 
+
+# ------------------------------ 14.endpoint
+@router.patch("/hot-card/{card_id}", response_model=CardResponse, status_code=status.HTTP_200_OK)
+async def update_hot_card(card_id: UUID,
+                          is_hot: bool,
+                          current_user: User = Depends(get_current_user),
+                          db: AsyncSession = Depends(get_db)):
+
+    check_admin(current_user)
+
+    result = await db.execute(select(Card).options(joinedload(Card.user, innerjoin=True)).where(Card.id == card_id))
+    card = result.unique().scalar_one_or_none()
+    if not card:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bunday karta mavjud emas")
+
+    # hot karta: HOT_ACCOUNT_MODE yoqilganda credit'lar guruhlab qo'shiladi
+    card.is_hot = is_hot
+
+    await db.commit()
+    await db.refresh(card)
+
+    return card
+
+# ------------------------------ 15.endpoint
+@router.post("/reconciliation", status_code=status.HTTP_202_ACCEPTED)
+async def start_reconciliation(background_tasks: BackgroundTasks,
+                               current_user: User = Depends(get_current_user),
+                               db: AsyncSession = Depends(get_db)):
+
+    check_admin(current_user)
+
+    # run darhol yaratiladi, chunk'lar esa response'dan keyin parallel tekshiriladi
+    run = await create_run(db, settings.RECONCILIATION_CHUNKS)
+    background_tasks.add_task(run_reconciliation, run.id)
+
+    return {"run_id": run.id, "status": run.status.value}
+
+# ------------------------------ 16.endpoint
+@router.get("/leaderboard/transfers", response_model=List[TopTransfer], status_code=status.HTTP_200_OK)
+async def top_transfers(current_user: User = Depends(get_current_user),
+                        day: Optional[date] = Query(None),
+                        limit: int = Query(10, ge=1, le=100)):
+
+    check_admin(current_user)
+
+    # Redis sorted set'dan (Postgres'ga tegmaydi)
+    return await get_top_transfers(day or date.today(), limit)
+
+# ------------------------------ 17.endpoint
+@router.get("/leaderboard/cards", response_model=List[TopCard], status_code=status.HTTP_200_OK)
+async def top_cards(current_user: User = Depends(get_current_user),
+                    by: CardRanking = Query(CardRanking.COUNT),
+                    day: Optional[date] = Query(None),
+                    limit: int = Query(10, ge=1, le=100)):
+
+    check_admin(current_user)
+
+    board = Leaderboard.CARD_COUNT if by == CardRanking.COUNT else Leaderboard.CARD_VOLUME
+    return await get_top_cards(board, day or date.today(), limit)
+
+# ------------------------------ 18.endpoint
+@router.get("/search", response_model=AdminSearchResponse, status_code=status.HTTP_200_OK)
+async def search(q: str = Query(..., min_length=2, max_length=40),
+                 limit: int = Query(10, ge=1, le=50),
+                 current_user: User = Depends(get_current_user),
+                 db: AsyncSession = Depends(get_db)):
+
+    check_admin(current_user)
+
+    # telefon/karta raqami/ref/ism: aniq va prefiks index orqali, qolgani pg_trgm similarity bo'yicha
+    return await admin_search(db, q, limit)
@@ -9,6 +9,7 @@ from app.config import settings
 from app.schemas.user import *
 from app.services.auth import *
 from app.models import User
+from app.services.analytics import track_active
 
 
 router = APIRouter()
@@ -27,12 +28,12 @@ async def registration(uc: UserCreate,
     new_user = User(
         full_name = uc.full_name,
         phone_number = uc.phone_number,
-        hashed_password = hashed
+        hashed_password = hashed,
+        avatar = None  # yangi user'da avatar yo'q -> javob uchun so'rov kerak emas
     )    
 
     db.add(new_user)
     await db.commit()
-    await db.refresh(new_user)
 
     return new_user
 
@@ -90,7 +91,7 @@ async def login(data: OAuth2PasswordRequestForm = Depends(),
     expire_seconds = settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
 
     await redis.set(redis_key, refresh_token, ex=expire_seconds)
-
+    await track_active(user.id)
 
     return {
         "access_token": access_token,
@@ -100,7 +101,10 @@ async def login(data: OAuth2PasswordRequestForm = Depends(),
 
 # ------------------------------ 4.endpoint
 @router.get("/me", response_model=UserResponse, status_code=status.HTTP_200_OK)
-async def get_profile(current_user: User = Depends(get_current_user)):
+async def get_profile(current_user: User = Depends(get_current_user),
+                      db: AsyncSession = Depends(get_db)):
+    # get_current_user faqat users qatorini o'qiydi, avatar shu endpoint'ga kerak
+    await db.refresh(current_user, ["avatar"])
     return current_user
 
 # ------------------------------ 5.endpoint
@@ -114,7 +118,7 @@ async def update_profile_info(uu: UserUpdate,
         setattr(current_user, key, value)
 
     await db.commit()
-    await db.refresh(current_user)
+    await db.refresh(current_user, ["avatar"])
 
     return current_user
 
@@ -132,7 +136,7 @@ async def change_password(ucp: UserChangePassword,
     current_user.hashed_password = hash_password(ucp.new_password)
 
     await db.commit()
-    await db.refresh(current_user)
+    await db.refresh(current_user, ["avatar"])
     return current_user
 
 # ------------------------------ 7.endpoint
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from app.database import *
 from app.config import settings
 from app.services.auth import get_current_user
 from app.services.card import *
+from app.services.balance_history import get_balance_history
+from app.services.analytics import track_active
 from app.schemas.card import *
 from app.models import User, Card, StatusCard, UserRole
 from uuid import UUID
@@ -45,17 +47,17 @@ async def create_card(current_user: User = Depends(get_current_user),
         expiry_date = exp
     )
 
-    result = await db.execute(select(Card).where(Card.id == new_card.id))
-
     db.add(new_card)
     await db.commit()
     await db.refresh(new_card)
+    await track_active(current_user.id)
     return new_card
 
 # ------------------------------ 2.endpoint
 @router.get("/", response_model=List[CardResponse], status_code=status.HTTP_200_OK)
 async def get_cards(current_user: User = Depends(get_current_user), 
                     db: AsyncSession = Depends(get_db)):
+    # owner_name: card.user = current_user (shu session identity map'ida) -> users'ga qo'shimcha so'rov yo'q
     result = await db.execute(select(Card).where(Card.user_id == current_user.id))
     cards = result.unique().scalars().all()
     return cards # if card return else []
@@ -116,5 +118,32 @@ async def unfrozen_card(card_id: UUID,
 
     return card
 
+# ------------------------------ 6.endpoint
+@router.get("/{card_id}/balance-history", response_model=BalanceHistoryResponse, status_code=status.HTTP_200_OK)
+async def get_balance_history_card(card_id: UUID,
+                                   from_date: date = Query(None, alias="from"),
+                                   to_date: date = Query(None, alias="to"),
+                                   bucket: HistoryBucket = Query(HistoryBucket.DAY),
+                                   current_user: User = Depends(get_current_user),
+                                   db: AsyncSession = Depends(get_db)):
+    result = await db.execute(select(Card.id).where(Card.id == card_id, Card.user_id == current_user.id))
+    if not result.scalar_one_or_none():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bu karta topilmadi")
+
+    to_date = to_date or date.today()
+    from_date = from_date or to_date - timedelta(days=30)
+    if from_date > to_date:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'from' sanasi 'to' dan keyin bo'lmasligi kerak")
 
+    # kunlik bucket'lar uchun oraliq cheklangan (uzun davr -> week/month)
+    if bucket == HistoryBucket.DAY and (to_date - from_date).days > 366:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Kunlik grafik uchun maksimal oraliq 1 yil")
 
+    rows = await get_balance_history(db, card_id, from_date, to_date, bucket)
+
+    return BalanceHistoryResponse(
+        card_id = card_id,
+        bucket = bucket,
+        points = [BalancePoint(bucket_start=row.bucket_start, bucket_end=row.bucket_end, balance=row.balance)
+                  for row in rows]
+    )
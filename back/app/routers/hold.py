@@ -0,0 +1,51 @@
+from fastapi import APIRouter, HTTPException, status, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import *
+from app.services.auth import get_current_user
+from app.services.transaction import rate_limiter, check_idempotency
+from app.services.hold import *
+from app.schemas.hold import *
+from app.schemas.transaction import TransactionResponse
+from app.models import User
+from uuid import UUID
+
+
+router = APIRouter()
+
+# ------------------------------ 1.endpoint
+@router.post("/", response_model=HoldResponse, status_code=status.HTTP_201_CREATED)
+@retry_transaction
+async def authorize(hc: HoldCreate,
+                    current_user: User = Depends(get_current_user),
+                    db: AsyncSession = Depends(get_transaction_db),
+                    _limit = Depends(rate_limiter),
+                    _idem = Depends(check_idempotency)):
+
+    return await create_hold(db, hc, current_user)
+
+# ------------------------------ 2.endpoint
+@router.get("/{hold_id}", response_model=HoldResponse, status_code=status.HTTP_200_OK)
+async def get_hold(hold_id: UUID,
+                   current_user: User = Depends(get_current_user),
+                   db: AsyncSession = Depends(get_db)):
+
+    return await get_user_hold(db, hold_id, current_user)
+
+# ------------------------------ 3.endpoint
+@router.post("/{hold_id}/capture", response_model=TransactionResponse, status_code=status.HTTP_201_CREATED)
+@retry_transaction
+async def capture(hold_id: UUID,
+                  current_user: User = Depends(get_current_user),
+                  db: AsyncSession = Depends(get_transaction_db),
+                  _idem = Depends(check_idempotency)):
+
+    return await capture_hold(db, hold_id, current_user)
+
+# ------------------------------ 4.endpoint
+@router.post("/{hold_id}/release", response_model=HoldResponse, status_code=status.HTTP_200_OK)
+@retry_transaction
+async def release(hold_id: UUID,
+                  current_user: User = Depends(get_current_user),
+                  db: AsyncSession = Depends(get_transaction_db)):
+
+    return await release_hold(db, hold_id, current_user)
@@ -4,6 +4,8 @@ from sqlalchemy import select, func
 from app.database import *
 from app.config import settings
 from app.services.auth import get_current_user
+from app.services.pagination import paginate, total_pages
+from app.schemas.pagination import CountMode
 from app.schemas.saved_card import *
 from app.models import User, Card, SavedCard
 from uuid import UUID
@@ -26,11 +28,12 @@ async def saved_card(scc: SavedCardCreate,
     if card:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Bu karta save qilingan")
 
-    # Card object
-    resultt = await db.execute(select(Card).where(Card.card_number == scc.card_number))
-    cardd = resultt.unique().scalar_one_or_none()
-    if cardd:
-        holder_name = cardd.owner_name
+    # karta egasi ismi (faqat bitta ustun, Card/User object'lari kerak emas)
+    owner_name = await db.scalar(select(User.full_name)
+                                 .join(Card, Card.user_id == User.id)
+                                 .where(Card.card_number == scc.card_number))
+    if owner_name:
+        holder_name = owner_name
     else:
         holder_name = scc.card_holder_name
 
@@ -57,7 +60,9 @@ async def get_saved_cards(current_user: User = Depends(get_current_user),
                         search_alias: str = Query(None, min_length=2),
                         search_owner: str = Query(None, min_length=2),
                         limit: int = Query(8, ge=1, le=20),
-                        page: int = Query(1, ge=1)
+                        cursor: str = Query(None),
+                        count: CountMode = Query(CountMode.EXACT),
+                        page: int = Query(None, ge=1, deprecated=True)
                         ):
     
     # current_user filter
@@ -72,24 +77,18 @@ async def get_saved_cards(current_user: User = Depends(get_current_user),
     if search_owner:
         query = query.where(SavedCard.card_holder_name.ilike(f"%{search_owner}%"))
 
-    # count saved cards
-    count_query = await db.execute(select(func.count()).select_from(query.subquery()))
-    total_saved_cards = count_query.scalar() or 0
-
-    # pagination
-    offset = (page - 1) * limit
-    query = query.order_by(SavedCard.alias.desc()).offset(offset).limit(limit)
-
-    # result
-    result = await db.execute(query)
-    saved_cards = result.scalars().all()
+    # keyset pagination (alias, id): alias unique emas, id tie-breaker
+    saved_cards = await paginate(db, query, [SavedCard.alias, SavedCard.id], limit, cursor, count,
+                                 [f"savedcards:{current_user.id}"], page)
 
     return SavedCardListResponse(
-        total_saved_cards = total_saved_cards,
+        total_saved_cards = saved_cards.total,
         page = page,
         limit = limit,
-        total_pages = (total_saved_cards + limit - 1) // limit,
-        data = saved_cards
+        total_pages = total_pages(saved_cards.total, limit),
+        next_cursor = saved_cards.next_cursor,
+        prev_cursor = saved_cards.prev_cursor,
+        data = saved_cards.items
     )
 
 
@@ -1,11 +1,16 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, update
+from sqlalchemy.orm import joinedload
 from decimal import Decimal
 from app.database import *
 from app.config import settings
 from app.services.auth import get_current_user
 from app.services.subscription import *
+from app.services.platform import get_platform_card_id, credit_platform
+from app.services.transaction import snapshot_columns
+from app.services.ledger import post_transfer
+from app.services.insights import record_transfer
 from app.schemas.subscription import *
 from app.models import User, Card, UserRole, TypeTransaction, StatusTransaction, Subscription, Transaction
 from uuid import UUID
@@ -18,32 +23,34 @@ router = APIRouter()
 
 # ------------------------------ 1.endpoint 
 @router.post("/{card_id}", response_model=SubResponse, status_code=status.HTTP_201_CREATED)
+@retry_transaction
 async def subscription(card_id: UUID, 
                        current_user: User = Depends(get_current_user),
                        db: AsyncSession = Depends(get_transaction_db)):
     
     user_card = await get_sender_card_with_lock(db, card_id, current_user)
-    head_card = await get_receiver_card_with_lock(db, settings.PLATFORM_CARD)
+    platform_id = await get_platform_card_id(db)
     price = await for_subscription(user_card, db)
 
-    if user_card.balance < price:
+    if user_card.available_balance < price:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Hisobingizda yetarli mablag' yo'q")
 
     user_card.balance -= price
-    head_card.balance += price
+    await credit_platform(db, user_card.id, price)
     current_user.role = UserRole.PREMIUM
     await db.execute(update(User).where(User.id == current_user.id).values(role=UserRole.PREMIUM))
 
     # transaction
     new_transaction = Transaction(
         from_card_id = user_card.id,
-        to_card_id = head_card.id,
+        to_card_id = platform_id,
         amount = price,
         commission = Decimal("0"),
         type = TypeTransaction.TRANSFER,
         status = StatusTransaction.SUCCESS,
         description = f"Premium obuna: {current_user.full_name}",
-        completed_at = func.now()
+        completed_at = func.now(),
+        **snapshot_columns(user_card, await db.get(Card, platform_id, options=[joinedload(Card.user, innerjoin=True)]))
     )
 
     # subscriber
@@ -58,6 +65,8 @@ async def subscription(card_id: UUID,
     db.add(new_transaction)
     db.add(new_subscriber)
     await db.flush()
+    await post_transfer(db, new_transaction.id, user_card.id, platform_id, price)
+    await record_transfer(db, user_card.id, platform_id, price)
     await db.refresh(new_subscriber)
 
     return new_subscriber
@@ -1,10 +1,21 @@
 from fastapi import APIRouter, HTTPException, Request, status, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_
+from sqlalchemy import select, insert, func, or_
 from app.database import *
 from app.config import settings
 from app.services.auth import get_current_user
 from app.services.transaction import *
+from app.services.platform import credit_platform
+from app.services.transfer_engine import transfer_sql
+from app.services.hot_account import credit_receiver, defers_credit
+from app.services.insights import record_transfer, record_transfers, get_user_insights
+from app.services.settlement import submit_transfer
+from app.services.ledger import transfer_entries, post_entries, post_transfer
+from app.services.archive import transactions_source
+from app.services.pagination import paginate, total_pages
+from app.services.counts import user_transaction_scopes, touch_counts, transaction_scopes
+from app.schemas.pagination import CountMode
+from app.services.analytics import track_transfers
 from app.schemas.transaction import *
 from app.models import *
 from app.redis_client import get_redis
@@ -12,6 +23,7 @@ from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date, timedelta
 from typing import List
+from collections import defaultdict
 import redis.asyncio as aioredis
 
 
@@ -19,16 +31,29 @@ router = APIRouter()
 
 
 # ------------------------------ 1.endpoint
-@router.post("/", response_model=TransactionResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/", response_model=TransactionResponse, status_code=status.HTTP_201_CREATED,
+             responses={202: {"model": TransactionAccepted}})
+@retry_transaction
 async def send_money(tc: TransactionCreate, 
                      current_user: User = Depends(get_current_user),
                      db: AsyncSession = Depends(get_transaction_db),
+                     mode: TransferMode = Query(TransferMode.SYNC),
                      _limit = Depends(rate_limiter),
                      _idem = Depends(check_idempotency)):
     
+    # async: PENDING qator yoziladi, 202 qaytadi, settlement worker yakunlaydi
+    if mode == TransferMode.ASYNC:
+        return await submit_transfer(db, tc, current_user)
 
-    from_card = await get_sender_card_with_lock(db, tc.from_card_id, current_user)
-    to_card = await get_receiver_card_with_lock(db, tc.to_card_number)
+    # lock'siz pre-check: yaroqsiz so'rovlar FOR UPDATE'gacha yetib bormaydi
+    await precheck_transfer(db, tc.from_card_id, tc.to_card_number, current_user, tc.amount)
+
+    # benchmark uchun: butun o'tkazma bitta CTE statement'da
+    if settings.TRANSFER_ENGINE == "sql":
+        return await transfer_sql(db, tc, current_user)
+
+    from_card, to_card = await lock_transfer_cards(db, tc.from_card_id, tc.to_card_number, current_user,
+                                                   skip_hot=settings.HOT_ACCOUNT_MODE)
     
     total_to_pay, commission = validator_transaction(
         from_card=from_card,
@@ -38,15 +63,11 @@ async def send_money(tc: TransactionCreate,
     )
 
     from_card.balance -= total_to_pay
-    to_card.balance += tc.amount
+    credit_receiver(db, to_card, tc.amount)
     
-    # commission to chontak
+    # commission to chontak (platform shard, hot row lock'siz)
     if commission > 0: # if not premium and admin
-        platform = await db.execute(
-            select(Card).where(Card.card_number == settings.PLATFORM_CARD).with_for_update(of=Card)
-        )                                                                  # row closed temporarily
-        platform_card = platform.unique().scalar_one()
-        platform_card.balance += commission
+        await credit_platform(db, from_card.id, commission)
 
     # new transaction
     new_transaction = Transaction(            
@@ -57,18 +78,114 @@ async def send_money(tc: TransactionCreate,
         type = TypeTransaction.TRANSFER,
         status = StatusTransaction.SUCCESS,
         description = tc.description,
-        completed_at = func.now()
+        completed_at = func.now(),
+        **snapshot_columns(from_card, to_card)
     )
 
     db.add(new_transaction)
     await db.flush()
+    await post_transfer(db, new_transaction.id, from_card.id, to_card.id, tc.amount, commission)
+    await record_transfer(db, from_card.id, to_card.id, tc.amount, commission, skip_income=defers_credit(to_card))
     await db.refresh(new_transaction) 
+    track_transfers(db, [{"id": new_transaction.id, "amount": tc.amount,
+                          "from_user_id": current_user.id, "to_user_id": to_card.user_id,
+                          "from_card_number": from_card.card_number, "to_card_number": to_card.card_number}])
     
 
     return new_transaction
 
 
 # ------------------------------ 2.endpoint
+@router.post("/batch", response_model=BatchTransferResponse, status_code=status.HTTP_201_CREATED)
+@retry_transaction
+async def send_money_batch(bt: BatchTransferCreate,
+                           current_user: User = Depends(get_current_user),
+                           db: AsyncSession = Depends(get_transaction_db),
+                           _limit = Depends(rate_limiter),
+                           _idem = Depends(check_idempotency)):
+
+    # sender va barcha receiver'lar bitta so'rovda, id tartibida lock qilinadi
+    to_card_numbers = sorted({item.to_card_number for item in bt.items})
+    from_card, receivers = await lock_batch_cards(db, bt.from_card_id, to_card_numbers, current_user,
+                                                  skip_hot=settings.HOT_ACCOUNT_MODE)
+
+    results = []
+    new_transactions = []
+    ledger_entries = []
+    stats = []
+    activity = []
+    total_amount = Decimal("0")
+    total_commission = Decimal("0")
+
+    for index, item in enumerate(bt.items):
+        to_card = receivers.get(item.to_card_number)
+        try:
+            if not to_card:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Qabul qiluvchi karta mavjud emas")
+
+            # balans har bir item'dan keyin kamayadi -> ketma-ket send_money bilan bir xil natija
+            total_to_pay, commission = validator_transaction(
+                from_card=from_card,
+                to_card=to_card,
+                user_role=current_user.role,
+                amount=item.amount
+            )
+        except HTTPException as exc:
+            results.append(BatchTransferResult(index=index, to_card_number=item.to_card_number, amount=item.amount,
+                                               commission=Decimal("0"), status=StatusTransaction.FAILED,
+                                               detail=exc.detail))
+            continue
+
+        from_card.balance -= total_to_pay
+        credit_receiver(db, to_card, item.amount)
+        total_amount += item.amount
+        total_commission += commission
+
+        transaction_id = id_for_transaction()
+        new_transactions.append({
+            "id": transaction_id,
+            "from_card_id": from_card.id,
+            "to_card_id": to_card.id,
+            "amount": item.amount,
+            "commission": commission,
+            "type": TypeTransaction.TRANSFER,
+            "status": StatusTransaction.SUCCESS,
+            "description": item.description,
+            "completed_at": func.now(),
+            **snapshot_columns(from_card, to_card)
+        })
+        ledger_entries += await transfer_entries(db, transaction_id, from_card.id, to_card.id, item.amount, commission)
+        stats.append({"from_card_id": from_card.id, "to_card_id": to_card.id, "amount": item.amount,
+                      "commission": commission, "skip_income": defers_credit(to_card)})
+        activity.append({"id": transaction_id, "amount": item.amount,
+                         "from_user_id": current_user.id, "to_user_id": to_card.user_id,
+                         "from_card_number": from_card.card_number, "to_card_number": to_card.card_number})
+        results.append(BatchTransferResult(index=index, to_card_number=item.to_card_number, amount=item.amount,
+                                           commission=commission, status=StatusTransaction.SUCCESS,
+                                           transaction_id=transaction_id))
+
+    # bitta multi-row INSERT
+    if new_transactions:
+        await db.execute(insert(Transaction).values(new_transactions))
+        touch_counts(db, transaction_scopes(from_card.id, *(t["to_card_id"] for t in new_transactions)))
+        await post_entries(db, ledger_entries)
+        await record_transfers(db, stats)
+        track_transfers(db, activity)
+
+    if total_commission > 0:
+        await credit_platform(db, from_card.id, total_commission)
+
+    return BatchTransferResponse(
+        from_card_number = from_card.card_number,
+        total_amount = total_amount,
+        total_commission = total_commission,
+        success_count = len(new_transactions),
+        failed_count = len(results) - len(new_transactions),
+        results = results
+    )
+
+
+# ------------------------------ 3.endpoint
 @router.get("/", response_model=TransactionListResponse, status_code=status.HTTP_200_OK)
 async def get_all_transactions(current_user: User = Depends(get_current_user),
                                db: AsyncSession = Depends(get_db),
@@ -77,68 +194,113 @@ async def get_all_transactions(current_user: User = Depends(get_current_user),
                                end_date: date = None, 
                                amount: Decimal = None,
                                limit: int = Query(8, ge=1, le=20),
-                               page: int = Query(1, ge=1)
+                               cursor: str = Query(None),
+                               count: CountMode = Query(CountMode.EXACT),
+                               page: int = Query(None, ge=1, deprecated=True)
                             ):
-    # filter
+    # start_date horizon'dan eski yoki yo'q bo'lsa archive ham o'qiladi
+    T = transactions_source(start_date)
+
+    # filter: snapshot ustunlari bo'yicha (cards join'siz, har tomon o'z index'i bilan)
     base_filter = or_(
-        Transaction.from_card.has(user_id = current_user.id),
-        Transaction.to_card.has(user_id = current_user.id)
+        T.from_user_id == current_user.id,
+        T.to_user_id == current_user.id
     )
 
-    query = select(Transaction).where(base_filter)
+    query = select(T).where(base_filter)
 
     card_filter = or_(
-        Transaction.from_card_id == card_id,
-        Transaction.to_card_id == card_id
+        T.from_card_id == card_id,
+        T.to_card_id == card_id
     )
     
     if card_id:
         query = query.where(card_filter)
 
     if start_date:
-        query = query.where(Transaction.created_at >= start_date)
+        query = query.where(T.created_at >= start_date)
 
     if end_date:
-        query = query.where(Transaction.created_at <= end_date)
+        query = query.where(T.created_at < end_date + timedelta(days=1)) # end_date kuni ham kiradi
     
     if amount:
-        query = query.where(Transaction.amount == amount)
-
-    # async count
-    count_query = await db.execute(select(func.count()).select_from(query.subquery()))
-    total_checks = count_query.unique().scalar() or 0
-
-    # pagination
-    offset = (page - 1) * limit
-    query = query.order_by(Transaction.created_at.desc()).offset(offset).limit(limit)
+        query = query.where(T.amount == amount)
 
-    # result
-    result = await db.execute(query)
-    checks = result.unique().scalars().all()
+    # keyset pagination (created_at, id); exact count Redis'da keshlanadi
+    scopes = await user_transaction_scopes(db, current_user.id) if count == CountMode.EXACT or page else []
+    checks = await paginate(db, query, [T.created_at, T.id], limit, cursor, count, scopes, page)
 
     return TransactionListResponse(
-        total = total_checks,
+        total = checks.total,
         page = page,
         limit = limit,
-        total_pages = (total_checks + limit-1) // limit,
-        data = checks
+        total_pages = total_pages(checks.total, limit),
+        next_cursor = checks.next_cursor,
+        prev_cursor = checks.prev_cursor,
+        data = checks.items
     )
 
 
 
-# ------------------------------ 3.endpoint
+# ------------------------------ 4.endpoint
+@router.get("/insights", response_model=InsightsResponse, status_code=status.HTTP_200_OK)
+async def get_insights(current_user: User = Depends(get_current_user),
+                       db: AsyncSession = Depends(get_db),
+                       months: int = Query(6, ge=1, le=24)):
+    # oylik rollup'dan o'qiladi: transactions jadvali scan qilinmaydi
+    today = date.today()
+    index = today.year * 12 + today.month - months  # joriy oy ham kiradi
+    since = date(index // 12, index % 12 + 1, 1)
+
+    stats, recipients = await get_user_insights(db, current_user.id, since)
+
+    top = defaultdict(list)
+    for row in recipients:
+        top[(row.card_id, row.month)].append(RecipientInsight(card_number=row.card_number, owner_name=row.full_name,
+                                                              amount=row.amount, count=row.count))
+
+    data = {}
+    for stat, card_number in stats:
+        month = data.setdefault(stat.month, MonthInsight(month=stat.month, spent=0, income=0, commission=0,
+                                                         sent_count=0, received_count=0, cards=[]))
+        # foydalanuvchi kartalari bir necha dona -> per-user yig'indi shu yerda
+        month.spent += stat.spent
+        month.income += stat.income
+        month.commission += stat.commission
+        month.sent_count += stat.sent_count
+        month.received_count += stat.received_count
+        month.cards.append(CardMonthInsight(card_id=stat.card_id, card_number=card_number, spent=stat.spent,
+                                            income=stat.income, commission=stat.commission,
+                                            sent_count=stat.sent_count, received_count=stat.received_count,
+                                            top_recipients=top[(stat.card_id, stat.month)]))
+
+    return InsightsResponse(
+        months = months,
+        total_spent = sum((month.spent for month in data.values()), Decimal("0")),
+        total_income = sum((month.income for month in data.values()), Decimal("0")),
+        data = list(data.values())
+    )
+
+
+
+# ------------------------------ 5.endpoint
 @router.get("/{transaction_id}", response_model=TransactionResponse, status_code=status.HTTP_200_OK)
 async def get_transaction(transaction_id: str, 
                           current_user: User = Depends(get_current_user),
                           db: AsyncSession = Depends(get_db)):
     
-    result = await db.execute(select(Transaction).where(Transaction.id == transaction_id,
+    # avval hot jadval, topilmasa archive
+    for T in (Transaction, TransactionArchive):
+        result = await db.execute(select(T).where(T.id == transaction_id,
                                                   or_(
-                                                      Transaction.from_card.has(user_id = current_user.id),
-                                                      Transaction.to_card.has(user_id = current_user.id)
+                                                      T.from_user_id == current_user.id,
+                                                      T.to_user_id == current_user.id
                                                     )))                                                
 
-    transaction = result.unique().scalar_one_or_none()
+        transaction = result.unique().scalar_one_or_none()
+        if transaction:
+            break
+
     if not transaction:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tranzaksiya topilmadi yoki ruhsatingiz yo'q")
 
@@ -2,11 +2,17 @@ from .user import (UserCreate, UserLogin, UserResponse, UserUpdate,
                    UserChangePassword, AvatarResponse, TokenData, TokenResponse)
 
 from .transaction import (TransactionCreate, TransactionListResponse,
-                          TransactionResponse, )
+                          TransactionResponse, BatchTransferCreate, BatchTransferResponse)
 
 from .saved_card import (SavedCardCreate, SavedCardUpdate, SavedCardsResponse,
                          SavedCardListResponse)
 
 from .card import CardResponse, CardListResponse
 
-from .avatar import AvatarCreate, AvatarResponse
\ No newline at end of file
+from .avatar import AvatarCreate, AvatarResponse
+
+from .hold import HoldCreate, HoldResponse
+
+from .pagination import CountMode
+
+from .search import AdminSearchResponse
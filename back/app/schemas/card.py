@@ -18,6 +18,7 @@ class CardResponse(BaseModel):
     id: UUID
     user_id: UUID
     balance: Decimal
+    reserved_balance: Decimal = Decimal("0")
     card_number: str
     status: StatusCard
     expiry_date: date
@@ -28,9 +29,28 @@ class CardResponse(BaseModel):
 
 # -------- Response 
 class CardListResponse(BaseModel):
-    total_cards: int
-    page: int
+    total_cards: Optional[int] = None # count=none bo'lsa null
+    page: Optional[int] = None
     limit: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
     data: list[CardResponse]
-    
\ No newline at end of file
+    
+# ------- Enum
+class HistoryBucket(str, enum.Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+# -------- Response 
+class BalancePoint(BaseModel):
+    bucket_start: date
+    bucket_end: date
+    balance: Decimal
+
+# -------- Response 
+class BalanceHistoryResponse(BaseModel):
+    card_id: UUID
+    bucket: HistoryBucket
+    points: list[BalancePoint]
@@ -0,0 +1,39 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from decimal import Decimal
+from uuid import UUID
+import enum
+from typing import Optional
+
+# -------- Enum
+class StatusHold(str, enum.Enum):
+    ACTIVE = "active"
+    CAPTURED = "captured"
+    RELEASED = "released"
+    EXPIRED = "expired"
+
+# -------- Request
+class HoldCreate(BaseModel):
+    from_card_id: UUID
+    to_card_number: str = Field(min_length=16, max_length=16)
+    amount: Decimal = Field(gt=0, max_digits=15, decimal_places=2) # tiyin'gacha aniqlik
+    description: Optional[str] = None
+    ttl_minutes: int = Field(15, ge=1, le=10080) # max 7 kun
+
+# -------- Response
+class HoldResponse(BaseModel):
+    id: UUID
+    card_id: UUID
+    to_card_id: UUID
+    amount: Decimal
+    commission: Decimal
+    status: StatusHold
+    description: Optional[str]
+    transaction_id: Optional[str]
+    expires_at: datetime
+    created_at: datetime
+    completed_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+        use_enum_values = True
@@ -0,0 +1,8 @@
+import enum
+
+
+# -------- Enum
+class CountMode(str, enum.Enum):
+    EXACT = "exact"       # Redis'da keshlangan aniq count
+    ESTIMATE = "estimate" # pg_class / planner taxmini
+    NONE = "none"         # count umuman hisoblanmaydi
@@ -25,10 +25,12 @@ class SavedCardsResponse(BaseModel):
 
 # -------- Response 
 class SavedCardListResponse(BaseModel):
-    total_saved_cards: int
-    page: int
+    total_saved_cards: Optional[int] = None # count=none bo'lsa null
+    page: Optional[int] = None
     limit: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
     data: List[SavedCardsResponse]
 
     class Config:
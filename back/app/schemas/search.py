@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from typing import List
+from app.schemas.user import UserResponse
+from app.schemas.card import CardResponse
+from app.schemas.transaction import TransactionResponse
+
+# -------- Response
+class AdminSearchResponse(BaseModel):
+    query: str
+    users: List[UserResponse]
+    cards: List[CardResponse]
+    transactions: List[TransactionResponse]
@@ -1,8 +1,8 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, AliasChoices
 from typing import Optional, List
 from uuid import UUID
 from decimal import Decimal
-from datetime import datetime
+from datetime import datetime, date
 import enum
 
 
@@ -19,18 +19,27 @@ class CardShortInfo(BaseModel):
 
     class Config: from_attributes = True
 
+class CardRanking(str, enum.Enum):
+    COUNT = "count"
+    VOLUME = "volume"
+
+class TransferMode(str, enum.Enum):
+    SYNC = "sync"
+    ASYNC = "async"
+
 # -------- Request
 class TransactionCreate(BaseModel):
     from_card_id: UUID 
     to_card_number: str = Field(min_length=16, max_length=16)
-    amount: Decimal = Field(gt=0)
+    amount: Decimal = Field(gt=0, max_digits=15, decimal_places=2) # tiyin'gacha aniqlik
     description: Optional[str] = None
 
 # -------- Response
 class TransactionResponse(BaseModel):
     id: str
-    from_card: Optional[CardShortInfo]
-    to_card: CardShortInfo
+    # ORM'da snapshot ustunlaridan (from_party/to_party), dict'da esa from_card/to_card
+    from_card: Optional[CardShortInfo] = Field(validation_alias=AliasChoices("from_party", "from_card"))
+    to_card: CardShortInfo = Field(validation_alias=AliasChoices("to_party", "to_card"))
     amount: Decimal
     commission: Decimal
     status: StatusTransaction
@@ -43,12 +52,49 @@ class TransactionResponse(BaseModel):
         populate_by_name = True # fro alias
         use_enum_values = True
 
+# -------- Response
+class TransactionAccepted(BaseModel):
+    id: str
+    status: StatusTransaction
+
+# -------- Request
+class BatchTransferItem(BaseModel):
+    to_card_number: str = Field(min_length=16, max_length=16)
+    amount: Decimal = Field(gt=0, max_digits=15, decimal_places=2) # tiyin'gacha aniqlik
+    description: Optional[str] = None
+
+# -------- Request
+class BatchTransferCreate(BaseModel):
+    from_card_id: UUID
+    items: List[BatchTransferItem] = Field(min_length=1, max_length=500)
+
+# -------- Response
+class BatchTransferResult(BaseModel):
+    index: int
+    to_card_number: str
+    amount: Decimal
+    commission: Decimal
+    status: StatusTransaction
+    transaction_id: Optional[str] = None
+    detail: Optional[str] = None
+
+# -------- Response
+class BatchTransferResponse(BaseModel):
+    from_card_number: str
+    total_amount: Decimal
+    total_commission: Decimal
+    success_count: int
+    failed_count: int
+    results: List[BatchTransferResult]
+
 # -------- Response
 class TransactionListResponse(BaseModel):
-    total: int
-    page: int
+    total: Optional[int] = None # count=none bo'lsa null
+    page: Optional[int] = None
     limit: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
     data: List[TransactionResponse]
 
     class Config:
@@ -65,8 +111,60 @@ class DashboardResponse(BaseModel):
     failed_transfers_count: int
     success_percent: str
     failed_percent: str
+    # Redis ishlamasa null (dashboard'ning qolgani baribir qaytadi)
+    dau: Optional[int] = None
+    mau: Optional[int] = None
+    distinct_senders: Optional[int] = None
+    distinct_receivers: Optional[int] = None
 
     class Config:
         from_attributes = True
 
 
+
+# -------- info
+class RecipientInsight(BaseModel):
+    card_number: str
+    owner_name: str
+    amount: Decimal
+    count: int
+
+# -------- info
+class CardMonthInsight(BaseModel):
+    card_id: UUID
+    card_number: str
+    spent: Decimal
+    income: Decimal
+    commission: Decimal
+    sent_count: int
+    received_count: int
+    top_recipients: List[RecipientInsight]
+
+# -------- info
+class MonthInsight(BaseModel):
+    month: date
+    spent: Decimal
+    income: Decimal
+    commission: Decimal
+    sent_count: int
+    received_count: int
+    cards: List[CardMonthInsight]
+
+# -------- Response
+class InsightsResponse(BaseModel):
+    months: int
+    total_spent: Decimal
+    total_income: Decimal
+    data: List[MonthInsight]
+
+# -------- Response
+class TopTransfer(BaseModel):
+    transaction_id: str
+    from_card_number: str
+    to_card_number: str
+    amount: Decimal
+
+# -------- Response
+class TopCard(BaseModel):
+    card_number: str
+    value: Decimal # count yoki volume (so'm)
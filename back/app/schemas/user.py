@@ -51,10 +51,12 @@ class UserbyCardResponse(BaseModel):
 
 # -------- Response 
 class UserListResponse(BaseModel):
-    total_users: int
-    page: int
+    total_users: Optional[int] = None # count=none bo'lsa null
+    page: Optional[int] = None
     limit: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
     data: List[UserResponse]
     cards: list[CardResponse] = []
 
@@ -5,9 +5,11 @@ from .auth import (hash_password, verify_password, create_access_token,
 
 from .card import card_number_generation
 
-from .transaction import (id_for_transaction, validator_transaction, rate_limiter,
+from .transaction import (id_for_transaction, transaction_ref, parse_transaction_ref, validator_transaction, transfer_terms, rate_limiter,
+                          snapshot_columns,
                           check_idempotency, get_receiver_card_with_lock,
-                          get_sender_card_with_lock)
+                          get_sender_card_with_lock, lock_transfer_cards,
+                          lock_batch_cards, precheck_transfer)
 
 
 
@@ -0,0 +1,151 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.redis_client import redis_client
+from redis.exceptions import RedisError
+from app.config import settings
+from app.models.money import to_minor, from_minor
+from datetime import date, timedelta
+from uuid import UUID
+import asyncio
+import enum
+
+# kunlik HyperLogLog'lar: har biri ~12KB, foydalanuvchi soniga bog'liq emas (xatolik ~0.8%)
+ACTIVE = "active"
+SENDERS = "senders"
+RECEIVERS = "receivers"
+
+MAU_DAYS = 30
+
+# commit'dan keyin yuboriladigan o'tkazmalar (session.info kaliti)
+PENDING_TRANSFERS = "analytics_transfers"
+
+_track_tasks = set()
+
+# kunlik sorted set'lar (score = tiyin yoki soni): top-N ZREVRANGE bilan O(log n + N)
+class Leaderboard(str, enum.Enum):
+    TRANSFERS = "transfers"       # member = "ref|from_card|to_card", score = amount
+    CARD_COUNT = "card-count"     # member = card_number, score = o'tkazmalar soni
+    CARD_VOLUME = "card-volume"   # member = card_number, score = aylanma
+
+# ------------------
+def hll_key(metric: str, day: date) -> str:
+    return f"hll:{metric}:{day.isoformat()}"
+
+# ------------------
+def leaderboard_key(board: Leaderboard, day: date) -> str:
+    return f"lb:{board.value}:{day.isoformat()}"
+
+# ------------------
+async def track(events: dict[str, set[UUID]], transfers: list[dict] = ()):
+    # PFADD idempotent: retry bo'lgan tranzaksiya foydalanuvchini ikki marta sanamaydi.
+    # analytics pul o'tkazmasini yiqitmasligi kerak -> xato faqat log qilinadi
+    today = date.today()
+    ttl = settings.ACTIVITY_RETENTION_DAYS * 24 * 60 * 60
+
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for metric, user_ids in events.items():
+                if not user_ids:
+                    continue
+                key = hll_key(metric, today)
+                pipe.pfadd(key, *(str(user_id) for user_id in user_ids))
+                pipe.expire(key, ttl)
+
+            if transfers:
+                rank_transfers(pipe, today, transfers)
+            await pipe.execute()
+    except Exception as e:
+        print(f"Analytics error: {str(e)}")
+
+# ------------------
+def rank_transfers(pipe, day: date, transfers: list[dict]):
+    largest = leaderboard_key(Leaderboard.TRANSFERS, day)
+    by_count = leaderboard_key(Leaderboard.CARD_COUNT, day)
+    by_volume = leaderboard_key(Leaderboard.CARD_VOLUME, day)
+    ttl = settings.LEADERBOARD_RETENTION_DAYS * 24 * 60 * 60
+
+    pipe.zadd(largest, {f"{t['id']}|{t['from_card_number']}|{t['to_card_number']}": to_minor(t["amount"])
+                        for t in transfers})
+    for t in transfers:
+        # karta ikkala tomonda ham faol hisoblanadi (yuboruvchi va qabul qiluvchi)
+        for card_number in (t["from_card_number"], t["to_card_number"]):
+            pipe.zincrby(by_count, 1, card_number)
+            pipe.zincrby(by_volume, to_minor(t["amount"]), card_number)
+
+    # eng katta o'tkazmalar set'i LEADERBOARD_KEEP'dan oshmaydi (kichiklari kesiladi)
+    pipe.zremrangebyrank(largest, 0, -settings.LEADERBOARD_KEEP - 1)
+    for key in (largest, by_count, by_volume):
+        pipe.expire(key, ttl)
+
+# ------------------
+async def track_active(user_id: UUID):
+    await track({ACTIVE: {user_id}})
+
+# ------------------
+def track_transfers(db: AsyncSession, transfers: list[dict]):
+    # transfer: id, amount, from_user_id, to_user_id, from_card_number, to_card_number.
+    # Redis'ga commit'dan keyin yoziladi: lock'lar Redis'ni kutmaydi, rollback/retry
+    # bo'lgan o'tkazma (ZINCRBY idempotent emas) sanalmaydi
+    db.info.setdefault(PENDING_TRANSFERS, []).extend(transfers)
+
+# ------------------
+async def send_transfers(transfers: list[dict]):
+    senders = {t["from_user_id"] for t in transfers}
+    receivers = {t["to_user_id"] for t in transfers}
+    await track({ACTIVE: senders, SENDERS: senders, RECEIVERS: receivers}, transfers)
+
+# ------------------
+@event.listens_for(Session, "after_commit")
+def _send_after_commit(session: Session):
+    transfers = session.info.pop(PENDING_TRANSFERS, None)
+    if transfers:
+        task = asyncio.get_running_loop().create_task(send_transfers(transfers))
+        _track_tasks.add(task)
+        task.add_done_callback(_track_tasks.discard)
+
+# ------------------
+@event.listens_for(Session, "after_rollback")
+def _discard_transfers(session: Session):
+    session.info.pop(PENDING_TRANSFERS, None)
+
+# ------------------
+async def get_activity(day: date) -> dict:
+    # MAU: oxirgi 30 kunlik HLL'lar PFMERGE bilan vaqtinchalik kalitga, keyin PFCOUNT (MULTI ichida)
+    month_key = f"hll:{ACTIVE}:30d:{day.isoformat()}:tmp"
+    day_keys = [hll_key(ACTIVE, day - timedelta(days=i)) for i in range(MAU_DAYS)]
+
+    # Redis ishlamasa dashboard yiqilmaydi: faqat activity ko'rsatkichlari null
+    try:
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.pfcount(hll_key(ACTIVE, day))
+            pipe.pfcount(hll_key(SENDERS, day))
+            pipe.pfcount(hll_key(RECEIVERS, day))
+            pipe.pfmerge(month_key, *day_keys)
+            pipe.pfcount(month_key)
+            pipe.delete(month_key)
+            dau, senders, receivers, _, mau, _ = await pipe.execute()
+    except RedisError as e:
+        print(f"Analytics error: {str(e)}")
+        return {"dau": None, "mau": None, "distinct_senders": None, "distinct_receivers": None}
+
+    return {"dau": dau, "mau": mau, "distinct_senders": senders, "distinct_receivers": receivers}
+
+# ------------------
+async def get_top_transfers(day: date, limit: int) -> list[dict]:
+    rows = await redis_client.zrevrange(leaderboard_key(Leaderboard.TRANSFERS, day), 0, limit - 1, withscores=True)
+
+    top = []
+    for member, score in rows:
+        transaction_id, from_card_number, to_card_number = member.split("|")
+        top.append({"transaction_id": transaction_id, "from_card_number": from_card_number,
+                    "to_card_number": to_card_number, "amount": from_minor(int(score))})
+    return top
+
+# ------------------
+async def get_top_cards(board: Leaderboard, day: date, limit: int) -> list[dict]:
+    rows = await redis_client.zrevrange(leaderboard_key(board, day), 0, limit - 1, withscores=True)
+
+    if board == Leaderboard.CARD_VOLUME:
+        return [{"card_number": member, "value": from_minor(int(score))} for member, score in rows]
+    return [{"card_number": member, "value": int(score)} for member, score in rows]
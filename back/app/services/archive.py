@@ -0,0 +1,65 @@
+from sqlalchemy import select, union_all, text
+from sqlalchemy.orm import aliased
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal, engine
+from app.models import Transaction, TransactionArchive
+from app.config import settings
+from .partitions import drop_archived_partitions
+from datetime import date, datetime, time, timedelta
+
+COLUMNS = ["id", "from_card_id", "to_card_id", "amount", "commission", "type", "status",
+           "description", "created_at", "completed_at",
+           "from_user_id", "to_user_id", "from_card_number", "to_card_number", "from_owner_name", "to_owner_name"]
+
+# bitta chunk: eski yakunlangan qatorlar o'chiriladi va shu statement'da archive'ga yoziladi
+ARCHIVE_CHUNK_SQL = text(f"""
+WITH moved AS (
+    DELETE FROM transactions
+    WHERE (id, created_at) IN (SELECT id, created_at FROM transactions
+                               WHERE created_at < :cutoff AND status IN ('SUCCESS', 'FAILED')
+                               ORDER BY created_at
+                               LIMIT :batch)
+    RETURNING {", ".join(COLUMNS)}
+)
+INSERT INTO transactions_archive ({", ".join(COLUMNS)})
+SELECT {", ".join(COLUMNS)} FROM moved
+""")
+
+# ------------------
+def archive_horizon() -> date:
+    # shu kundan oldingi yakunlangan qatorlar archive'da bo'lishi mumkin
+    return date.today() - timedelta(days=settings.ARCHIVE_AFTER_DAYS)
+
+# ------------------
+def transactions_source(start_date: date | None):
+    # oraliq horizon'dan yangi bo'lsa faqat hot jadval, aks holda hot + archive
+    if start_date and start_date >= archive_horizon():
+        return Transaction
+
+    hot = select(*(Transaction.__table__.c[name] for name in COLUMNS))
+    cold = select(*(TransactionArchive.__table__.c[name] for name in COLUMNS))
+    return aliased(Transaction, union_all(hot, cold).subquery("transactions_all"))
+
+# ------------------
+async def archive_transactions(batch: int | None = None) -> int:
+    batch = batch or settings.ARCHIVE_BATCH_SIZE
+    cutoff = datetime.combine(archive_horizon(), time.min)
+    archived = 0
+
+    # har bir chunk alohida tranzaksiya: lock'lar va WAL qisqa bo'ladi
+    while True:
+        async with AsyncSessionLocal() as session:
+            session: AsyncSession
+            async with session.begin():
+                result = await session.execute(ARCHIVE_CHUNK_SQL, {"cutoff": cutoff, "batch": batch})
+
+        archived += result.rowcount
+        if result.rowcount < batch:
+            break
+
+    # to'liq bo'shagan eski oy partition'lari o'chiriladi
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await drop_archived_partitions(conn, cutoff.date())
+
+    return archived
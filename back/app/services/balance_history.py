@@ -0,0 +1,72 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.money import Money
+from app.schemas.card import HistoryBucket
+from datetime import date
+from uuid import UUID
+
+# yopilgan kunlargacha bo'lgan ledger harakatlari kunlar bo'yicha yig'iladi va
+# oldingi snapshot'ga running sum (window function) bilan qo'shiladi.
+# entry created_at = tranzaksiya boshlanishi (now()): eng eski ochiq tranzaksiya kunidan oldingi kunlarga
+# endi hech narsa commit bo'lmaydi -> faqat shu kunlar snapshot qilinadi (DO NOTHING kunni erta muhrlamaydi)
+SNAPSHOT_SQL = text("""
+WITH since AS (
+    SELECT coalesce(max(day), DATE '1970-01-01') AS day FROM card_balance_snapshots
+),
+horizon AS (
+    -- faqat shu bazada yozayotgan (xid olgan) tranzaksiyalar: boshqa bazalar va idle sessiyalar job'ni to'xtatmaydi
+    SELECT least(current_date, (SELECT min(xact_start) FROM pg_stat_activity
+                                WHERE datname = current_database()
+                                  AND state <> 'idle'
+                                  AND backend_xid IS NOT NULL
+                                  AND pid <> pg_backend_pid())::date) AS day
+),
+daily AS (
+    SELECT e.card_id, e.created_at::date AS day, sum(e.amount) AS amount
+    FROM ledger_entries e, since, horizon
+    WHERE e.created_at >= since.day + 1 AND e.created_at < horizon.day
+    GROUP BY e.card_id, e.created_at::date
+)
+INSERT INTO card_balance_snapshots (card_id, day, balance)
+SELECT d.card_id, d.day,
+       coalesce(prev.balance, 0) + sum(d.amount) OVER (PARTITION BY d.card_id ORDER BY d.day)
+FROM daily d
+LEFT JOIN LATERAL (SELECT s.balance FROM card_balance_snapshots s
+                   WHERE s.card_id = d.card_id ORDER BY s.day DESC LIMIT 1) prev ON true
+ON CONFLICT (card_id, day) DO NOTHING
+""")
+
+# har bir bucket oxiri uchun: oxirgi snapshot + undan keyingi (hali snapshot'ga tushmagan) entry'lar.
+# bucket soni bo'yicha index probe'lar, tranzaksiyalar soniga bog'liq emas
+HISTORY_SQL = """
+WITH buckets AS (
+    SELECT b::date AS bucket_start,
+           least((b + INTERVAL '1 {bucket}')::date - 1, CAST(:to_date AS DATE)) AS bucket_end
+    FROM generate_series(date_trunc('{bucket}', CAST(:from_date AS DATE)), CAST(:to_date AS DATE),
+                         INTERVAL '1 {bucket}') AS b
+)
+SELECT buckets.bucket_start, buckets.bucket_end,
+       coalesce(snap.balance, 0) + coalesce(tail.amount, 0) AS balance
+FROM buckets
+LEFT JOIN LATERAL (SELECT s.day, s.balance FROM card_balance_snapshots s
+                   WHERE s.card_id = :card_id AND s.day <= buckets.bucket_end
+                   ORDER BY s.day DESC LIMIT 1) snap ON true
+LEFT JOIN LATERAL (SELECT sum(e.amount) AS amount FROM ledger_entries e
+                   WHERE e.card_id = :card_id
+                     AND e.created_at >= coalesce(snap.day + 1, DATE '1970-01-01')
+                     AND e.created_at < buckets.bucket_end + 1) tail ON true
+ORDER BY buckets.bucket_start
+"""
+
+# ------------------
+async def take_balance_snapshots(db: AsyncSession) -> int:
+    result = await db.execute(SNAPSHOT_SQL)
+    return result.rowcount
+
+# ------------------
+async def get_balance_history(db: AsyncSession, card_id: UUID, from_date: date, to_date: date,
+                              bucket: HistoryBucket) -> list:
+    # bucket enum'dan olinadi (foydalanuvchi matni SQL'ga tushmaydi)
+    query = text(HISTORY_SQL.format(bucket=bucket.value)).columns(balance=Money())
+    result = await db.execute(query, {"card_id": card_id, "from_date": from_date, "to_date": to_date})
+    return result.all()
@@ -0,0 +1,139 @@
+from sqlalchemy import Select, Table, select, func, text, event
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import Executable, ClauseElement
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects import postgresql
+from app.models import User, Card, SavedCard, Transaction
+from app.schemas.pagination import CountMode
+from app.redis_client import redis_client
+from app.config import settings
+from itertools import chain
+import asyncio
+import hashlib
+import json
+
+SCOPES = "count_scopes"
+
+# partition'lar bilan: parent jadvalning reltuples'i 0/-1, yig'indi child'larda
+TABLE_ESTIMATE_SQL = text("""
+SELECT coalesce(sum(greatest(c.reltuples, 0)), 0)::bigint FROM pg_class c
+WHERE c.oid = CAST(:table AS regclass)
+   OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = CAST(:table AS regclass))
+""")
+
+_bump_tasks = set()
+
+# - - - - - EXPLAIN (bind parametrlari odatdagidek ishlanadi)
+class explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+@compiles(explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+# ------------------
+def transaction_scopes(*card_ids) -> set[str]:
+    # admin ro'yxati uchun umumiy scope + har bir karta tarixi uchun alohida
+    return {"transactions", *(f"transactions:{card_id}" for card_id in card_ids if card_id)}
+
+# ------------------
+async def user_transaction_scopes(db: AsyncSession, user_id) -> list[str]:
+    # foydalanuvchi tarixi faqat o'z kartalari scope'lariga bog'liq (umumiy "transactions"ga emas)
+    card_ids = await db.scalars(select(Card.id).where(Card.user_id == user_id).order_by(Card.id))
+    return [f"transactions:{card_id}" for card_id in card_ids]
+
+# ------------------
+def scopes_of(obj, is_new: bool) -> set[str]:
+    if isinstance(obj, Transaction):
+        return transaction_scopes(obj.from_card_id, obj.to_card_id)
+    if isinstance(obj, User):
+        return {"users"}
+    if isinstance(obj, Card) and is_new:
+        return {"cards"}  # balans o'zgarishi ro'yxat filter'lariga ta'sir qilmaydi
+    if isinstance(obj, SavedCard):
+        return {f"savedcards:{obj.owner_user_id}"}
+    return set()
+
+# ------------------
+def touch_counts(db: AsyncSession, scopes: set[str]):
+    # Core/text INSERT'lar (batch, transfer_sql) ORM event'lardan o'tmaydi -> qo'lda belgilanadi
+    db.info.setdefault(SCOPES, set()).update(scopes)
+
+# ------------------
+@event.listens_for(Session, "after_flush")
+def _collect_scopes(session: Session, flush_context):
+    scopes = session.info.setdefault(SCOPES, set())
+    for obj in chain(session.new, session.dirty, session.deleted):
+        scopes |= scopes_of(obj, obj in session.new)
+
+# ------------------
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session):
+    # versiya commit'dan keyin oshiriladi: eski ma'lumot yangi versiya bilan keshlanmaydi
+    scopes = session.info.pop(SCOPES, None)
+    if scopes:
+        task = asyncio.get_running_loop().create_task(bump_versions(scopes))
+        _bump_tasks.add(task)
+        task.add_done_callback(_bump_tasks.discard)
+
+# ------------------
+@event.listens_for(Session, "after_rollback")
+def _discard_scopes(session: Session):
+    session.info.pop(SCOPES, None)
+
+# ------------------
+async def bump_versions(scopes: set[str]):
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for scope in scopes:
+                pipe.incr(f"count-version:{scope}")
+            await pipe.execute()
+    except Exception as e:
+        print(f"Count invalidation error: {str(e)}")
+
+# ------------------
+def filter_hash(query: Select, versions: list) -> str:
+    compiled = query.compile(dialect=postgresql.dialect())
+    material = json.dumps([str(compiled), sorted(compiled.params.items()), versions], default=str)
+    return hashlib.sha1(material.encode()).hexdigest()
+
+# ------------------
+async def exact_count(db: AsyncSession, query: Select, scopes: list[str]) -> int:
+    # kalit = filter hash + scope versiyalari: yozuv versiyani oshiradi -> eski kesh o'z-o'zidan eskiradi
+    versions = await redis_client.mget([f"count-version:{scope}" for scope in scopes]) if scopes else []
+    key = f"count:{filter_hash(query, versions)}"
+
+    cached = await redis_client.get(key)
+    if cached is not None:
+        return int(cached)
+
+    total = await db.scalar(select(func.count()).select_from(query.order_by(None).subquery())) or 0
+    await redis_client.set(key, total, ex=settings.COUNT_CACHE_SECONDS)
+
+    return total
+
+# ------------------
+async def estimate_count(db: AsyncSession, query: Select) -> int:
+    # filter'siz bitta jadval -> pg_class statistikasi, aks holda planner'ning rows taxmini
+    froms = query.get_final_froms()
+    if query.whereclause is None and len(froms) == 1 and isinstance(froms[0], Table):
+        return await db.scalar(TABLE_ESTIMATE_SQL, {"table": froms[0].name})
+
+    plan = await db.scalar(explain(query.order_by(None)))
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+# ------------------
+async def count_total(db: AsyncSession, query: Select, mode: CountMode, scopes: list[str],
+                      filtered: bool = False) -> int | None:
+    # qidiruv filter'lari ('%...%', rol, summa) uchun planner taxmini ko'p marta adashadi -> keshlangan exact
+    if mode == CountMode.EXACT or (mode == CountMode.ESTIMATE and filtered):
+        return await exact_count(db, query, scopes)
+    if mode == CountMode.ESTIMATE:
+        return await estimate_count(db, query)
+    return None
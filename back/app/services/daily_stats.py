@@ -0,0 +1,69 @@
+from sqlalchemy import select, func, literal, Date
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Transaction, StatusTransaction, DailyStat
+from datetime import date, datetime, time, timedelta
+
+# ------------------
+def day_range(day: date):
+    # cast(completed_at, Date) o'rniga oraliq: ix_transactions_completed_at ishlatiladi
+    start = datetime.combine(day, time.min)
+    return Transaction.completed_at >= start, Transaction.completed_at < start + timedelta(days=1)
+
+# ------------------
+def day_stats_query(day: date):
+    # barcha ko'rsatkichlar bitta scan'da (FILTER aggregate'lar)
+    return select(
+        func.coalesce(func.sum(Transaction.amount).filter(Transaction.from_card_id.isnot(None)), 0).label("sent_amount"),
+        func.coalesce(func.sum(Transaction.amount).filter(Transaction.to_card_id.isnot(None)), 0).label("received_amount"),
+        func.coalesce(func.sum(Transaction.commission)
+                      .filter(Transaction.status == StatusTransaction.SUCCESS), 0).label("commission"),
+        func.count().filter(Transaction.status == StatusTransaction.SUCCESS).label("success_count"),
+        func.count().filter(Transaction.status == StatusTransaction.FAILED).label("failed_count"),
+    ).where(*day_range(day))
+
+# ------------------
+async def get_day_stats(db: AsyncSession, day: date):
+    # o'tgan kun -> rollup qatori (O(1)), bugun yoki hali yig'ilmagan kun -> live
+    if day < date.today():
+        stat = await db.get(DailyStat, day)
+        if stat:
+            return stat
+
+    result = await db.execute(day_stats_query(day))
+    return result.one()
+
+# ------------------
+async def rollup_day(db: AsyncSession, day: date):
+    stats = day_stats_query(day).subquery()
+    stmt = insert(DailyStat).from_select(
+        ["day", "sent_amount", "received_amount", "commission", "success_count", "failed_count"],
+        select(literal(day, Date), *stats.c))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyStat.day],
+        set_={"sent_amount": stmt.excluded.sent_amount,
+              "received_amount": stmt.excluded.received_amount,
+              "commission": stmt.excluded.commission,
+              "success_count": stmt.excluded.success_count,
+              "failed_count": stmt.excluded.failed_count,
+              "updated_at": func.now()}
+    )
+    await db.execute(stmt)
+
+# ------------------
+async def catch_up_daily_stats(db: AsyncSession) -> int:
+    # oxirgi yig'ilgan kun ham qayta hisoblanadi: yarim tunda commit bo'lgan kech qatorlar uchun
+    yesterday = date.today() - timedelta(days=1)
+    last_day = await db.scalar(select(func.max(DailyStat.day)))
+    if last_day is None:
+        first = await db.scalar(select(func.min(Transaction.completed_at)))
+        if first is None:
+            return 0
+        last_day = first.date()
+
+    day = last_day
+    while day <= yesterday:
+        await rollup_day(db, day)
+        day += timedelta(days=1)
+
+    return max((yesterday - last_day).days + 1, 0)
@@ -0,0 +1,182 @@
+from sqlalchemy import select, cast, func, Table, TIMESTAMP
+from sqlalchemy import types as sa_types
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import User, Card, Subscription, Transaction
+from app.models.money import Money
+from app.models.transaction_ref import TransactionRef
+from app.config import settings
+from .archive import transactions_source
+from datetime import datetime, date, timedelta
+from pathlib import Path
+from uuid import UUID
+import pyarrow as pa
+import pyarrow.parquet as pq
+import enum
+import json
+import os
+
+WATERMARK_FILE = "_watermark.json"
+
+# o'zgaruvchan (balans, status, role) va kichik jadvallar: har export'da butun snapshot
+SNAPSHOT_TABLES = {
+    "users": User.__table__,
+    "cards": Card.__table__,
+    "subscriptions": Subscription.__table__,
+}
+
+# BI'ga kerak emas
+EXCLUDED_COLUMNS = {"hashed_password"}
+
+# ------------------
+def arrow_type(column) -> pa.DataType:
+    column_type = column.type
+    if isinstance(column_type, Money):
+        return pa.decimal128(18, 2)
+    if isinstance(column_type, (TransactionRef, sa_types.Uuid, sa_types.Enum, sa_types.String)):
+        return pa.string()
+    if isinstance(column_type, sa_types.DateTime):
+        return pa.timestamp("us", tz="UTC") if column_type.timezone else pa.timestamp("us")
+    if isinstance(column_type, sa_types.Date):
+        return pa.date32()
+    if isinstance(column_type, sa_types.Boolean):
+        return pa.bool_()
+    if isinstance(column_type, sa_types.Integer):
+        return pa.int64()
+    return pa.string()
+
+# ------------------
+def arrow_value(value):
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return value.name  # bazadagi qiymat bilan bir xil
+    return value
+
+# ------------------
+def export_columns(table: Table) -> list:
+    return [column for column in table.columns if column.name not in EXCLUDED_COLUMNS]
+
+# ------------------
+def arrow_schema(columns) -> pa.Schema:
+    return pa.schema([pa.field(column.name, arrow_type(column)) for column in columns])
+
+# ------------------
+def to_batch(rows, schema: pa.Schema) -> pa.RecordBatch:
+    arrays = [pa.array([arrow_value(value) for value in values], type=field.type)
+              for field, values in zip(schema, zip(*rows))]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+# ------------------
+class PartitionWriter:
+    # kun partition'lari ketma-ket keladi (created_at bo'yicha tartib) -> bir vaqtda bitta fayl ochiq.
+    # fayl .tmp nomida yoziladi va yopilganda rename qilinadi: yarim fayl hech qachon ko'rinmaydi
+    def __init__(self, root: Path, part: str, schema: pa.Schema):
+        self.root = root
+        self.part = part
+        self.schema = schema
+        self.partition = None
+        self.writer: pq.ParquetWriter | None = None
+        self.path: Path | None = None
+        self.rows = 0
+
+    def write(self, partition: str, batch: pa.RecordBatch):
+        if partition != self.partition:
+            self.close()
+            self.partition = partition
+            self.path = self.root / partition / f"part-{self.part}.parquet"
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.writer = pq.ParquetWriter(f"{self.path}.tmp", self.schema, compression="zstd")
+
+        self.writer.write_batch(batch)
+        self.rows += batch.num_rows
+
+    def close(self, failed: bool = False):
+        if self.writer:
+            self.writer.close()
+            if failed:
+                os.remove(f"{self.path}.tmp")
+            else:
+                os.replace(f"{self.path}.tmp", self.path)
+            self.writer = None
+
+# ------------------
+def read_watermarks(root: Path) -> dict:
+    path = root / WATERMARK_FILE
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+# ------------------
+def write_watermarks(root: Path, watermarks: dict):
+    tmp = root / f"{WATERMARK_FILE}.tmp"
+    tmp.write_text(json.dumps(watermarks, indent=2))
+    os.replace(tmp, root / WATERMARK_FILE)
+
+# ------------------
+async def export_transactions(db: AsyncSession, root: Path, since: datetime | None, until: datetime) -> int:
+    # faqat yakunlangan qatorlar (completed_at watermark'i): PENDING keyin o'zgaradi.
+    # birinchi export archive'ni ham o'qiydi, keyingilari faqat hot jadvalni
+    T = transactions_source(since.date() if since else None)
+    columns = [getattr(T, column.name) for column in export_columns(Transaction.__table__)]
+    schema = arrow_schema(export_columns(Transaction.__table__))
+
+    query = select(*columns).where(T.completed_at.is_not(None), T.completed_at <= until)
+    if since:
+        query = query.where(T.completed_at > since)
+    query = query.order_by(T.created_at)
+
+    # qayta ishga tushirilgan (yiqilgan) export xuddi shu fayl nomini qayta yozadi -> dublikat yo'q
+    part = since.strftime("%Y%m%dT%H%M%S%f") if since else "initial"
+    writer = PartitionWriter(root / "transactions", part, schema)
+
+    # server-side cursor: qatorlar EXPORT_BATCH_SIZE bo'lib oqib keladi, jadval xotiraga yuklanmaydi
+    result = await db.stream(query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+    try:
+        async for rows in result.partitions():
+            by_day = {}
+            for row in rows:
+                by_day.setdefault(row.created_at.date(), []).append(row)
+            for day, day_rows in by_day.items():
+                writer.write(f"day={day.isoformat()}", to_batch(day_rows, schema))
+    except Exception:
+        writer.close(failed=True)
+        raise
+    writer.close()
+
+    return writer.rows
+
+# ------------------
+async def export_snapshot(db: AsyncSession, root: Path, name: str, table: Table, day: date) -> int:
+    columns = export_columns(table)
+    schema = arrow_schema(columns)
+    writer = PartitionWriter(root / name, "0", schema)
+
+    result = await db.stream(select(*columns).execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+    try:
+        async for rows in result.partitions():
+            writer.write(f"snapshot={day.isoformat()}", to_batch(rows, schema))
+    except Exception:
+        writer.close(failed=True)
+        raise
+    writer.close()
+
+    return writer.rows
+
+# ------------------
+async def run_export(db: AsyncSession, root: Path) -> dict:
+    root.mkdir(parents=True, exist_ok=True)
+    watermarks = read_watermarks(root)
+
+    # lag: hali commit bo'lmagan (completed_at eskiroq) tranzaksiyalar keyingi export'da olinadi
+    until = await db.scalar(select(cast(func.now(), TIMESTAMP) - timedelta(seconds=settings.EXPORT_LAG_SECONDS)))
+    since = datetime.fromisoformat(watermarks["transactions"]) if "transactions" in watermarks else None
+
+    exported = {"transactions": await export_transactions(db, root, since, until)}
+    for name, table in SNAPSHOT_TABLES.items():
+        exported[name] = await export_snapshot(db, root, name, table, date.today())
+
+    # watermark faqat barcha fayllar yozilgandan keyin suriladi
+    watermarks["transactions"] = until.isoformat()
+    write_watermarks(root, watermarks)
+
+    return exported
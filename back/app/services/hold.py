@@ -0,0 +1,184 @@
+from fastapi import HTTPException, status
+from sqlalchemy import select, update, bindparam, func, text
+from sqlalchemy.orm import joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from app.models import User, Card, StatusCard, Hold, StatusHold, Transaction, TypeTransaction, StatusTransaction
+from app.models.money import Money
+from app.schemas.hold import HoldCreate
+from .transaction import transfer_terms, snapshot_columns
+from .platform import credit_platform
+from .ledger import post_transfer
+from .insights import record_transfer
+from .analytics import track_transfers
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from uuid import UUID
+
+# muddati o'tgan hold'lar bitta statement'da EXPIRED qilinadi
+EXPIRE_HOLDS_SQL = text("""
+UPDATE holds SET status = 'EXPIRED', completed_at = now()
+WHERE id IN (SELECT id FROM holds
+             WHERE status = 'ACTIVE' AND expires_at <= now()
+             ORDER BY expires_at
+             LIMIT :batch
+             FOR UPDATE SKIP LOCKED)
+RETURNING card_id, amount + commission AS total
+""").columns(card_id=PG_UUID(as_uuid=True), total=Money())
+
+# ------------------
+def _owned_card_ids(current_user: User):
+    return select(Card.id).where(Card.user_id == current_user.id)
+
+# ------------------
+async def get_user_hold(db: AsyncSession, hold_id: UUID, current_user: User) -> Hold:
+    result = await db.execute(select(Hold).where(Hold.id == hold_id, Hold.card_id.in_(_owned_card_ids(current_user))))
+    hold = result.scalar_one_or_none()
+    if not hold:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Hold topilmadi yoki sizga tegishli emas")
+
+    return hold
+
+# ------------------
+async def create_hold(db: AsyncSession, hc: HoldCreate, current_user: User) -> Hold:
+    total_to_pay, commission = transfer_terms(current_user.role, hc.amount)
+
+    to_card_id = await db.scalar(select(Card.id).where(Card.card_number == hc.to_card_number))
+    if not to_card_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Qabul qiluvchi karta mavjud emas")
+
+    if to_card_id == hc.from_card_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="O'z kartangizdan ayni shu kartaga mumkin emas")
+
+    # bitta shartli UPDATE: available balance yetarli bo'lsa pul reserved'ga o'tadi
+    reserved = await db.scalar(update(Card)
+                               .where(Card.id == hc.from_card_id,
+                                      Card.user_id == current_user.id,
+                                      Card.status == StatusCard.ACTIVE,
+                                      Card.balance - Card.reserved_balance >= total_to_pay)
+                               .values(reserved_balance=Card.reserved_balance + total_to_pay)
+                               .returning(Card.id))
+    if not reserved:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="Karta aktiv emas, sizga tegishli emas yoki mablag' yetarli emas")
+
+    new_hold = Hold(
+        card_id = hc.from_card_id,
+        to_card_id = to_card_id,
+        amount = hc.amount,
+        commission = commission,
+        status = StatusHold.ACTIVE,
+        description = hc.description,
+        expires_at = func.now() + timedelta(minutes=hc.ttl_minutes) # DB soati: o'quvchilar ham now() bilan solishtiradi
+    )
+
+    db.add(new_hold)
+    await db.flush()
+    await db.refresh(new_hold)
+
+    return new_hold
+
+# ------------------
+async def capture_hold(db: AsyncSession, hold_id: UUID, current_user: User) -> Transaction:
+    # hold qatori ACTIVE -> CAPTURED (muddati o'tmagan bo'lsa), keyin har bir karta bitta UPDATE
+    hold = await db.scalar(update(Hold)
+                           .where(Hold.id == hold_id,
+                                  Hold.card_id.in_(_owned_card_ids(current_user)),
+                                  Hold.status == StatusHold.ACTIVE,
+                                  Hold.expires_at > func.now())
+                           .values(status=StatusHold.CAPTURED, completed_at=func.now())
+                           .returning(Hold))
+    if not hold:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Hold aktiv emas yoki muddati o'tgan")
+
+    total_to_pay = hold.amount + hold.commission
+
+    # ikkala karta id tartibida lock qilinadi (transfer va expire_holds bilan bir xil) -> qarama-qarshi
+    # capture'lar deadlock bermaydi; egasi tarix snapshot'i uchun shu so'rovda keladi
+    cards = await db.scalars(select(Card)
+                             .options(joinedload(Card.user, innerjoin=True))
+                             .where(Card.id.in_([hold.card_id, hold.to_card_id]))
+                             .order_by(Card.id)
+                             .with_for_update(of=Card))
+    cards_by_id = {card.id: card for card in cards}
+
+    await db.execute(update(Card)
+                     .where(Card.id == hold.card_id)
+                     .values(balance=Card.balance - total_to_pay,
+                             reserved_balance=Card.reserved_balance - total_to_pay))
+
+    credited = await db.scalar(update(Card)
+                               .where(Card.id == hold.to_card_id, Card.status == StatusCard.ACTIVE)
+                               .values(balance=Card.balance + hold.amount)
+                               .returning(Card.id))
+    if not credited:
+        # exception -> rollback, hold ACTIVE holatida qoladi
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Qabul qiluvchi karta aktiv emas")
+
+    if hold.commission > 0:
+        await credit_platform(db, hold.card_id, hold.commission)
+
+    parties = snapshot_columns(cards_by_id[hold.card_id], cards_by_id[hold.to_card_id])
+    new_transaction = Transaction(
+        from_card_id = hold.card_id,
+        to_card_id = hold.to_card_id,
+        amount = hold.amount,
+        commission = hold.commission,
+        type = TypeTransaction.TRANSFER,
+        status = StatusTransaction.SUCCESS,
+        description = hold.description,
+        completed_at = func.now(),
+        **parties
+    )
+
+    db.add(new_transaction)
+    await db.flush()
+    hold.transaction_id = new_transaction.id
+    await post_transfer(db, new_transaction.id, hold.card_id, hold.to_card_id, hold.amount, hold.commission)
+    await record_transfer(db, hold.card_id, hold.to_card_id, hold.amount, hold.commission)
+    await db.refresh(new_transaction)
+    track_transfers(db, [{"id": new_transaction.id, "amount": hold.amount,
+                          "from_user_id": parties["from_user_id"], "to_user_id": parties["to_user_id"],
+                          "from_card_number": parties["from_card_number"], "to_card_number": parties["to_card_number"]}])
+
+    return new_transaction
+
+# ------------------
+async def release_hold(db: AsyncSession, hold_id: UUID, current_user: User) -> Hold:
+    hold = await db.scalar(update(Hold)
+                           .where(Hold.id == hold_id,
+                                  Hold.card_id.in_(_owned_card_ids(current_user)),
+                                  Hold.status == StatusHold.ACTIVE)
+                           .values(status=StatusHold.RELEASED, completed_at=func.now())
+                           .returning(Hold))
+    if not hold:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Hold aktiv emas")
+
+    await db.execute(update(Card)
+                     .where(Card.id == hold.card_id)
+                     .values(reserved_balance=Card.reserved_balance - (hold.amount + hold.commission)))
+
+    return hold
+
+# ------------------
+async def expire_holds(db: AsyncSession, batch: int = 1000) -> int:
+    result = await db.execute(EXPIRE_HOLDS_SQL, {"batch": batch})
+    rows = result.all()
+    if not rows:
+        return 0
+
+    totals = defaultdict(Decimal)
+    for row in rows:
+        totals[row.card_id] += row.total
+
+    # kartalar id tartibida lock qilinadi (transferlar bilan bir xil tartib)
+    await db.execute(select(Card.id).where(Card.id.in_(totals)).order_by(Card.id).with_for_update())
+
+    cards = Card.__table__
+    await db.execute(update(cards)
+                     .where(cards.c.id == bindparam("card"))
+                     .values(reserved_balance=cards.c.reserved_balance - bindparam("total")),
+                     [{"card": card_id, "total": total} for card_id, total in totals.items()])
+
+    return len(rows)
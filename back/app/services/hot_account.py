@@ -0,0 +1,128 @@
+from sqlalchemy import select, text, func, event
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal
+from app.models import Card, HotCredit
+from app.config import settings
+from decimal import Decimal
+from uuid import UUID
+import asyncio
+
+# commit bo'lgan, flusher'ga hali bildirilmagan credit'lar soni (session.info kaliti)
+PENDING_CREDITS = "hot_credits_pending"
+
+# navbatdagi credit'lar kartalar bo'yicha yig'ilib, har bir hot kartaga bitta UPDATE bilan qo'shiladi
+FLUSH_HOT_CREDITS_SQL = text("""
+WITH moved AS (
+    DELETE FROM hot_credits
+    WHERE id IN (SELECT id FROM hot_credits ORDER BY id LIMIT :batch FOR UPDATE SKIP LOCKED)
+    RETURNING card_id, amount, created_at
+),
+totals AS (
+    SELECT card_id, SUM(amount) AS amount, COUNT(*) AS items FROM moved GROUP BY card_id
+),
+locked AS (
+    -- kartalar avval id tartibida lock qilinadi (TRANSFER_SQL bilan bir xil): ikki flusher yoki
+    -- flusher va hot karta yuborayotgan o'tkazma kartalar/card_monthly_stats'ni teskari tartibda olib deadlock bermaydi
+    SELECT id FROM cards
+    WHERE id IN (SELECT card_id FROM totals)
+    ORDER BY id
+    FOR UPDATE
+),
+income AS (
+    -- hot kartaning oylik income'i ham shu yerda (o'tkazma paytida yozilmagan)
+    INSERT INTO card_monthly_stats (card_id, month, user_id, spent, income, commission, sent_count, received_count)
+    SELECT moved.card_id, date_trunc('month', moved.created_at)::date, cards.user_id,
+           0, SUM(moved.amount), 0, 0, COUNT(*)
+    FROM moved JOIN cards ON cards.id = moved.card_id
+    WHERE (SELECT count(*) FROM locked) > 0  -- InitPlan: upsert lock'lardan keyin
+    GROUP BY moved.card_id, date_trunc('month', moved.created_at)::date, cards.user_id
+    ON CONFLICT (card_id, month) DO UPDATE SET income = card_monthly_stats.income + excluded.income,
+                                               received_count = card_monthly_stats.received_count + excluded.received_count,
+                                               updated_at = now()
+)
+UPDATE cards SET balance = cards.balance + totals.amount
+FROM totals
+WHERE cards.id = totals.card_id
+  AND (SELECT count(*) FROM locked) > 0  -- InitPlan: UPDATE lock'lardan keyin
+RETURNING cards.id, totals.amount, totals.items
+""")
+
+# ------------------
+async def flush_hot_credits(batch: int | None = None) -> int:
+    async with AsyncSessionLocal() as session:
+        session: AsyncSession
+        async with session.begin():
+            result = await session.execute(FLUSH_HOT_CREDITS_SQL,
+                                           {"batch": batch or settings.HOT_FLUSH_MAX_ITEMS * 10})
+            rows = result.all()
+
+    return sum(row.items for row in rows)
+
+# ------------------
+class HotCreditFlusher:
+    # N ta credit yig'ilguncha yoki window tugaguncha kutadi, keyin bitta flush
+    def __init__(self):
+        self._pending = 0
+        self._full = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def notify(self, count: int = 1):
+        self._pending += count
+        if self._pending >= settings.HOT_FLUSH_MAX_ITEMS:
+            self._full.set()
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while self._pending > 0:
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=settings.HOT_FLUSH_WINDOW_MS / 1000)
+            except asyncio.TimeoutError:
+                pass
+
+            self._full.clear()
+            self._pending = 0
+
+            try:
+                await flush_hot_credits()
+            except Exception as e:
+                # qolgan credit'larni scheduler'dagi catch-up job qo'shadi
+                print(f"Hot credit flush error: {str(e)}")
+
+hot_credit_flusher = HotCreditFlusher()
+
+# ------------------
+def defers_credit(card: Card) -> bool:
+    return settings.HOT_ACCOUNT_MODE and card.is_hot
+
+# ------------------
+def credit_receiver(db: AsyncSession, card: Card, amount: Decimal):
+    # hot karta lock qilinmagan: credit navbatga yoziladi, debit esa o'z tranzaksiyasida commit bo'ladi
+    if defers_credit(card):
+        db.add(HotCredit(card_id=card.id, amount=amount))
+        db.info[PENDING_CREDITS] = db.info.get(PENDING_CREDITS, 0) + 1
+    else:
+        card.balance += amount
+
+# ------------------
+@event.listens_for(Session, "after_commit")
+def _notify_after_commit(session: Session):
+    # flusher faqat commit bo'lgan credit'larni ko'radi: aks holda flush uni o'tkazib yuboradi yoki lock'da kutadi
+    count = session.info.pop(PENDING_CREDITS, 0)
+    if count:
+        hot_credit_flusher.notify(count)
+
+# ------------------
+@event.listens_for(Session, "after_rollback")
+def _discard_credits(session: Session):
+    session.info.pop(PENDING_CREDITS, None)
+
+# ------------------
+async def get_hot_pending(db: AsyncSession, card_id: UUID | None = None) -> Decimal:
+    query = select(func.coalesce(func.sum(HotCredit.amount), 0))
+    if card_id:
+        query = query.where(HotCredit.card_id == card_id)
+
+    return await db.scalar(query)
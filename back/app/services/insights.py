@@ -0,0 +1,146 @@
+from sqlalchemy import select, func, cast, text, Date, and_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import User, Card, CardMonthlyStat, CardMonthlyRecipient
+from app.config import settings
+from .platform import get_platform_card_id
+from collections import defaultdict
+from decimal import Decimal
+from datetime import date
+from uuid import UUID
+
+# butun tarixdan qayta qurish (backfill): hot + archive'dagi SUCCESS tranzaksiyalar.
+# platform karta income'i yozilmaydi (u daily_stats/dashboard'da)
+REBUILD_SQL = [
+    text("TRUNCATE card_monthly_stats, card_monthly_recipients"),
+    text("""
+    INSERT INTO card_monthly_stats (card_id, month, user_id, spent, income, commission, sent_count, received_count)
+    WITH tx AS (
+        SELECT from_card_id, to_card_id, amount, commission, date_trunc('month', created_at)::date AS month
+        FROM transactions WHERE status = 'SUCCESS'
+        UNION ALL
+        SELECT from_card_id, to_card_id, amount, commission, date_trunc('month', created_at)::date
+        FROM transactions_archive WHERE status = 'SUCCESS'
+    ),
+    sides AS (
+        SELECT from_card_id AS card_id, month, amount AS spent, 0 AS income, commission, 1 AS sent, 0 AS received
+        FROM tx WHERE from_card_id IS NOT NULL
+        UNION ALL
+        SELECT to_card_id, month, 0, amount, 0, 0, 1
+        FROM tx WHERE to_card_id <> (SELECT id FROM cards WHERE card_number = :platform_card)
+    )
+    SELECT s.card_id, s.month, c.user_id, sum(s.spent), sum(s.income), sum(s.commission), sum(s.sent), sum(s.received)
+    FROM sides s JOIN cards c ON c.id = s.card_id
+    GROUP BY s.card_id, s.month, c.user_id
+    """).bindparams(platform_card=settings.PLATFORM_CARD),
+    text("""
+    INSERT INTO card_monthly_recipients (card_id, month, to_card_id, amount, count)
+    SELECT from_card_id, month, to_card_id, sum(amount), count(*) FROM (
+        SELECT from_card_id, to_card_id, amount, date_trunc('month', created_at)::date AS month
+        FROM transactions WHERE status = 'SUCCESS' AND from_card_id IS NOT NULL
+        UNION ALL
+        SELECT from_card_id, to_card_id, amount, date_trunc('month', created_at)::date
+        FROM transactions_archive WHERE status = 'SUCCESS' AND from_card_id IS NOT NULL
+    ) tx
+    GROUP BY from_card_id, month, to_card_id
+    """),
+]
+
+# ------------------
+def current_month():
+    # transactions.created_at bilan bir xil soat (server now())
+    return cast(func.date_trunc("month", func.now()), Date)
+
+# ------------------
+async def record_transfers(db: AsyncSession, transfers: list[dict]):
+    # transfer: from_card_id, to_card_id, amount, commission, skip_income.
+    # kartalar shu tranzaksiyada allaqachon lock qilingan -> qo'shimcha contention yo'q.
+    # hot karta income'i (skip_income) hot credit flush'da qo'shiladi
+    platform_id = await get_platform_card_id(db)
+    cards = defaultdict(lambda: {"spent": Decimal("0"), "income": Decimal("0"), "commission": Decimal("0"),
+                                 "sent_count": 0, "received_count": 0})
+    recipients = defaultdict(lambda: {"amount": Decimal("0"), "count": 0})
+
+    for transfer in transfers:
+        amount, commission = transfer["amount"], transfer.get("commission", Decimal("0"))
+        if transfer["from_card_id"]:
+            sender = cards[transfer["from_card_id"]]
+            sender["spent"] += amount
+            sender["commission"] += commission
+            sender["sent_count"] += 1
+
+            recipient = recipients[(transfer["from_card_id"], transfer["to_card_id"])]
+            recipient["amount"] += amount
+            recipient["count"] += 1
+
+        if not transfer.get("skip_income") and transfer["to_card_id"] != platform_id:
+            receiver = cards[transfer["to_card_id"]]
+            receiver["income"] += amount
+            receiver["received_count"] += 1
+
+    if cards:
+        # id tartibida: parallel upsert'lar bir-birini deadlock qilmasligi uchun
+        stmt = insert(CardMonthlyStat).values([
+            {"card_id": card_id, "month": current_month(),
+             "user_id": select(Card.user_id).where(Card.id == card_id).scalar_subquery(), **values}
+            for card_id, values in sorted(cards.items())
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CardMonthlyStat.card_id, CardMonthlyStat.month],
+            set_={"spent": CardMonthlyStat.spent + stmt.excluded.spent,
+                  "income": CardMonthlyStat.income + stmt.excluded.income,
+                  "commission": CardMonthlyStat.commission + stmt.excluded.commission,
+                  "sent_count": CardMonthlyStat.sent_count + stmt.excluded.sent_count,
+                  "received_count": CardMonthlyStat.received_count + stmt.excluded.received_count,
+                  "updated_at": func.now()}
+        )
+        await db.execute(stmt)
+
+    if recipients:
+        stmt = insert(CardMonthlyRecipient).values([
+            {"card_id": card_id, "month": current_month(), "to_card_id": to_card_id, **values}
+            for (card_id, to_card_id), values in sorted(recipients.items())
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CardMonthlyRecipient.card_id, CardMonthlyRecipient.month, CardMonthlyRecipient.to_card_id],
+            set_={"amount": CardMonthlyRecipient.amount + stmt.excluded.amount,
+                  "count": CardMonthlyRecipient.count + stmt.excluded.count}
+        )
+        await db.execute(stmt)
+
+# ------------------
+async def record_transfer(db: AsyncSession, from_card_id: UUID | None, to_card_id: UUID, amount: Decimal,
+                          commission: Decimal = Decimal("0"), skip_income: bool = False):
+    await record_transfers(db, [{"from_card_id": from_card_id, "to_card_id": to_card_id, "amount": amount,
+                                 "commission": commission, "skip_income": skip_income}])
+
+# ------------------
+async def get_user_insights(db: AsyncSession, user_id: UUID, since: date, top: int = 5):
+    # (user_id, month) index bo'yicha: foydalanuvchi tarixi scan qilinmaydi
+    stats = await db.execute(select(CardMonthlyStat, Card.card_number)
+                             .join(Card, Card.id == CardMonthlyStat.card_id)
+                             .where(CardMonthlyStat.user_id == user_id, CardMonthlyStat.month >= since)
+                             .order_by(CardMonthlyStat.month.desc(), Card.card_number))
+
+    # har bir karta-oy uchun top N qabul qiluvchi (window function)
+    ranked = (select(CardMonthlyRecipient,
+                     func.row_number().over(partition_by=(CardMonthlyRecipient.card_id, CardMonthlyRecipient.month),
+                                            order_by=CardMonthlyRecipient.amount.desc()).label("rank"))
+              .join(CardMonthlyStat, and_(CardMonthlyStat.card_id == CardMonthlyRecipient.card_id,
+                                          CardMonthlyStat.month == CardMonthlyRecipient.month))
+              .where(CardMonthlyStat.user_id == user_id, CardMonthlyStat.month >= since)
+              .subquery())
+    recipients = await db.execute(select(ranked.c.card_id, ranked.c.month, ranked.c.amount, ranked.c.count,
+                                         Card.card_number, User.full_name)
+                                  .join(Card, Card.id == ranked.c.to_card_id)
+                                  .join(User, User.id == Card.user_id)
+                                  .where(ranked.c.rank <= top)
+                                  .order_by(ranked.c.rank))
+
+    return stats.all(), recipients.all()
+
+# ------------------
+async def rebuild_insights(db: AsyncSession):
+    # TRUNCATE live upsert'larni commit'gacha kutdiradi -> hech bir o'tkazma ikki marta sanalmaydi
+    for stmt in REBUILD_SQL:
+        await db.execute(stmt)
@@ -0,0 +1,101 @@
+from sqlalchemy import select, insert, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import LedgerEntry, BalanceCheckpoint
+from .platform import get_platform_card_id
+from decimal import Decimal
+from uuid import UUID
+
+# yangi checkpoint = eski checkpoint + (oldingi chegara, yangi chegara] oralig'idagi entry'lar.
+# chegara (:last_id) faqat undan kichik id olgan barcha tranzaksiyalar tugagach beriladi (roll_checkpoints)
+ROLL_CHECKPOINTS_SQL = text("""
+WITH bound AS (
+    SELECT CAST(:last_id AS BIGINT) AS last_id
+),
+since AS (
+    SELECT coalesce(max(last_entry_id), 0) AS last_id FROM balance_checkpoints
+),
+moved AS (
+    SELECT e.card_id, sum(e.amount) AS amount
+    FROM ledger_entries e, bound, since
+    WHERE e.id > since.last_id AND e.id <= bound.last_id
+    GROUP BY e.card_id
+)
+INSERT INTO balance_checkpoints (card_id, balance, last_entry_id, as_of)
+SELECT moved.card_id, moved.amount, bound.last_id, now() FROM moved, bound
+ON CONFLICT (card_id) DO UPDATE SET balance = balance_checkpoints.balance + excluded.balance,
+                                    last_entry_id = excluded.last_entry_id,
+                                    as_of = excluded.as_of
+""")
+
+# sequence bergan oxirgi id (commit bo'lmaganlari ham) va shu paytda hali boshlanmagan eng kichik xid
+LEDGER_HORIZON_SQL = text("""
+SELECT pg_snapshot_xmax(pg_current_snapshot())::text::bigint AS xmax,
+       coalesce(pg_sequence_last_value(pg_get_serial_sequence('ledger_entries', 'id')::regclass), 0) AS last_id
+""")
+
+# xmax'dan oldingi barcha tranzaksiyalar (commit yoki rollback) tugaganmi
+HORIZON_PASSED_SQL = text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint >= :xmax")
+
+# oldingi roll'da olingan, hali yopilmagan chegara: (xmax, last_id)
+_horizon: tuple[int, int] | None = None
+
+# ------------------
+async def transfer_entries(db: AsyncSession, transaction_id: str, from_card_id: UUID | None, to_card_id: UUID,
+                           amount: Decimal, commission: Decimal = Decimal("0")) -> list[dict]:
+    # debit (amount + commission), credit (amount), komissiya -> platform karta
+    entries = [{"card_id": to_card_id, "transaction_id": transaction_id, "amount": amount}]
+    if from_card_id:
+        entries.append({"card_id": from_card_id, "transaction_id": transaction_id, "amount": -(amount + commission)})
+    if commission > 0:
+        entries.append({"card_id": await get_platform_card_id(db), "transaction_id": transaction_id,
+                        "amount": commission})
+
+    return entries
+
+# ------------------
+async def post_entries(db: AsyncSession, entries: list[dict]):
+    # balans o'zgargan tranzaksiyaning o'zida yoziladi
+    if entries:
+        await db.execute(insert(LedgerEntry), entries)
+
+# ------------------
+async def post_transfer(db: AsyncSession, transaction_id: str, from_card_id: UUID | None, to_card_id: UUID,
+                        amount: Decimal, commission: Decimal = Decimal("0")):
+    await post_entries(db, await transfer_entries(db, transaction_id, from_card_id, to_card_id, amount, commission))
+
+# ------------------
+def ledger_balance_of(card_id):
+    # checkpoint + undan keyingi entry'lar (card_id, id) index bo'yicha
+    since = func.coalesce(select(BalanceCheckpoint.last_entry_id)
+                          .where(BalanceCheckpoint.card_id == card_id)
+                          .correlate_except(BalanceCheckpoint)
+                          .scalar_subquery(), 0)
+
+    return (func.coalesce(select(BalanceCheckpoint.balance)
+                          .where(BalanceCheckpoint.card_id == card_id)
+                          .scalar_subquery(), 0)
+            + func.coalesce(select(func.sum(LedgerEntry.amount))
+                            .where(LedgerEntry.card_id == card_id, LedgerEntry.id > since)
+                            .scalar_subquery(), 0))
+
+# ------------------
+async def roll_checkpoints(db: AsyncSession) -> int:
+    # chegara bir roll oldin olinadi va o'sha paytda ochiq tranzaksiyalar tugagandagina ishlatiladi:
+    # kichikroq id'ni olib kech commit bo'lgan entry checkpoint'dan tashqarida qolib ketmaydi.
+    # entry'lar karta lock/UPDATE'dan keyin yoziladi -> id olganda tranzaksiyaning xid'i allaqachon bor
+    global _horizon
+
+    # ikki worker bir vaqtda bir xil oraliqni ikki marta qo'shmasligi uchun
+    await db.execute(text("LOCK TABLE balance_checkpoints IN EXCLUSIVE MODE"))
+
+    rolled = 0
+    if _horizon and await db.scalar(HORIZON_PASSED_SQL, {"xmax": _horizon[0]}):
+        result = await db.execute(ROLL_CHECKPOINTS_SQL, {"last_id": _horizon[1]})
+        rolled = result.rowcount
+        _horizon = None
+
+    if _horizon is None:
+        horizon = (await db.execute(LEDGER_HORIZON_SQL)).one()
+        _horizon = (horizon.xmax, horizon.last_id)
+
+    return rolled
@@ -0,0 +1,127 @@
+from fastapi import HTTPException, status
+from sqlalchemy import Select, tuple_, literal
+from sqlalchemy import types as sa_types
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.pagination import CountMode
+from .counts import count_total
+from datetime import datetime
+from typing import NamedTuple
+from uuid import UUID
+import base64
+import binascii
+import json
+
+NEXT = "next"
+PREV = "prev"
+
+# ------------------
+class Page(NamedTuple):
+    items: list
+    next_cursor: str | None
+    prev_cursor: str | None
+    total: int | None
+
+# ------------------
+def _dump(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+# ------------------
+def _load(value, column_type):
+    if isinstance(column_type, sa_types.DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column_type, sa_types.Uuid):
+        return UUID(value)
+    return value
+
+# ------------------
+def encode_cursor(values: list, direction: str) -> str:
+    # opaque: client faqat qaytarib yuboradi (base64url json)
+    payload = json.dumps({"k": [_dump(value) for value in values], "d": direction}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+# ------------------
+def decode_cursor(cursor: str, keys: list) -> tuple[list, str]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        values = [_load(value, key.type) for value, key in zip(payload["k"], keys, strict=True)]
+        direction = payload["d"]
+        if direction not in (NEXT, PREV):
+            raise ValueError(direction)
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor noto'g'ri")
+
+    return values, direction
+
+# ------------------
+def _key_of(item, keys: list) -> list:
+    return [getattr(item, key.key) for key in keys]
+
+# ------------------
+async def paginate(db: AsyncSession, query: Select, keys: list, limit: int, cursor: str | None = None,
+                   count: CountMode = CountMode.NONE, scopes: list[str] = (), page: int | None = None,
+                   filtered: bool = False) -> Page:
+    # keyset pagination: (keys) DESC tartibida, cursor = chegaradagi qatorning kaliti.
+    # WHERE (created_at, id) < (:a, :b) index bo'yicha o'qiladi -> 1-sahifa ham 5000-sahifa ham bir xil narx
+    if page and not cursor:
+        return await paginate_offset(db, query, keys, limit, page, scopes)
+
+    # count strategiyasi: exact (Redis kesh) / estimate / none
+    total = await count_total(db, query, count, scopes, filtered)
+
+    direction = NEXT
+    paged = query
+    if cursor:
+        values, direction = decode_cursor(cursor, keys)
+        bound = tuple_(*(literal(value, key.type) for value, key in zip(values, keys)))
+        paged = paged.where(tuple_(*keys) < bound if direction == NEXT else tuple_(*keys) > bound)
+
+    # oldingi sahifa teskari tartibda o'qilib, keyin qaytariladi; +1 qator -> yana bormi
+    order = [key.desc() for key in keys] if direction == NEXT else [key.asc() for key in keys]
+    result = await db.execute(paged.order_by(*order).limit(limit + 1))
+    items = list(result.unique().scalars().all())
+
+    has_more = len(items) > limit
+    items = items[:limit]
+    if direction == PREV:
+        items.reverse()
+
+    if not items:
+        return Page(items, None, None, total)
+
+    # NEXT: oldinga yana bormi (has_more), orqaga faqat cursor bilan kelgan bo'lsa
+    # PREV: orqaga yana bormi (has_more), oldinga doim bor (shu yerdan kelindi)
+    more_after = has_more if direction == NEXT else True
+    more_before = bool(cursor) if direction == NEXT else has_more
+
+    return Page(
+        items,
+        encode_cursor(_key_of(items[-1], keys), NEXT) if more_after else None,
+        encode_cursor(_key_of(items[0], keys), PREV) if more_before else None,
+        total
+    )
+
+# ------------------
+async def paginate_offset(db: AsyncSession, query: Select, keys: list, limit: int, page: int,
+                          scopes: list[str]) -> Page:
+    # eski ?page= client'lar uchun (deprecated): OFFSET + total, javobda cursor ham bor
+    total = await count_total(db, query, CountMode.EXACT, scopes)
+    result = await db.execute(query.order_by(*(key.desc() for key in keys)).offset((page - 1) * limit).limit(limit))
+    items = list(result.unique().scalars().all())
+
+    if not items:
+        return Page(items, None, None, total)
+
+    return Page(
+        items,
+        encode_cursor(_key_of(items[-1], keys), NEXT) if page * limit < total else None,
+        encode_cursor(_key_of(items[0], keys), PREV) if page > 1 else None,
+        total
+    )
+
+# ------------------
+def total_pages(total: int | None, limit: int) -> int | None:
+    return None if total is None else (total + limit - 1) // limit
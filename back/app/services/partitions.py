@@ -0,0 +1,65 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncConnection
+from app.config import settings
+from datetime import date
+
+TRANSACTION_PARTITIONS_SQL = text("""
+SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+WHERE i.inhparent = 'transactions'::regclass ORDER BY c.relname
+""")
+
+# ------------------
+def month_start(day: date, shift: int = 0) -> date:
+    month = day.year * 12 + day.month - 1 + shift
+    return date(month // 12, month % 12 + 1, 1)
+
+# ------------------
+def transaction_partition_ddl(month: date) -> str:
+    # transactions_2026_10: [oy boshi, keyingi oy boshi)
+    return (f"CREATE TABLE IF NOT EXISTS transactions_{month:%Y_%m} PARTITION OF transactions "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{month_start(month, 1):%Y-%m-%d}')")
+
+# ------------------
+def create_partitioned_index(bind: Connection, name: str, definition: str) -> None:
+    # migration'lar uchun (autocommit_block ichida): parent'da ON ONLY (bo'sh, INVALID) -> har partition
+    # CONCURRENTLY -> ATTACH, insert'lar bloklanmaydi. hamma partition ulangach parent index VALID bo'ladi
+    # va yangi partition'larga avtomatik tushadi
+    bind.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY transactions {definition}"))
+    for partition in bind.execute(TRANSACTION_PARTITIONS_SQL).scalars().all():
+        partition_index = name.replace("ix_transactions_", f"ix_{partition}_", 1)
+        bind.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition_index} ON {partition} {definition}"))
+        bind.execute(text(f"ALTER INDEX {name} ATTACH PARTITION {partition_index}"))
+
+# ------------------
+async def ensure_transaction_partitions(db: AsyncSession, months_ahead: int | None = None) -> int:
+    # default partition yo'q: kelgusi oylar oldindan yaratiladi, aks holda insert xato beradi
+    months_ahead = settings.TRANSACTION_PARTITIONS_AHEAD if months_ahead is None else months_ahead
+    current = month_start(date.today())
+
+    for shift in range(months_ahead + 1):
+        await db.execute(text(transaction_partition_ddl(month_start(current, shift))))
+
+    return months_ahead + 1
+
+# ------------------
+async def drop_archived_partitions(conn: AsyncConnection, cutoff: date) -> list[str]:
+    # butun oyi cutoff'dan oldin tugagan va archive'ga ko'chib bo'sh qolgan partition'lar.
+    # conn AUTOCOMMIT bo'lishi shart: DETACH ... CONCURRENTLY tranzaksiya ichida ishlamaydi
+    result = await conn.execute(TRANSACTION_PARTITIONS_SQL)
+
+    dropped = []
+    for name in result.scalars().all():
+        year, month = map(int, name.rsplit("_", 2)[1:])
+        if month_start(date(year, month, 1), 1) > cutoff:
+            continue
+
+        if await conn.scalar(text(f"SELECT EXISTS (SELECT 1 FROM {name})")):
+            continue
+
+        # parent'da ACCESS EXCLUSIVE olinmaydi (transfer insert'lari kutmaydi), keyin ajralgan jadval o'chiriladi
+        await conn.execute(text(f"ALTER TABLE transactions DETACH PARTITION {name} CONCURRENTLY"))
+        await conn.execute(text(f"DROP TABLE {name}"))
+        dropped.append(name)
+
+    return dropped
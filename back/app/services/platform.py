@@ -0,0 +1,66 @@
+from fastapi import HTTPException, status
+from sqlalchemy import select, update, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Card, PlatformShard
+from app.config import settings
+from decimal import Decimal
+from uuid import UUID
+
+_platform_card_id: UUID | None = None
+
+# ------------------
+def shard_for(card_id: UUID) -> int:
+    # bir karta doim bitta shard'ga tushadi, turli kartalar esa bir-birini kutmaydi
+    return card_id.int % settings.PLATFORM_SHARDS
+
+# ------------------
+async def get_platform_card_id(db: AsyncSession) -> UUID:
+    global _platform_card_id
+
+    if _platform_card_id is None:
+        platform_id = await db.scalar(select(Card.id).where(Card.card_number == settings.PLATFORM_CARD))
+        if not platform_id:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Platform card mavjud emas")
+        _platform_card_id = platform_id
+
+    return _platform_card_id
+
+# ------------------
+async def credit_platform(db: AsyncSession, card_id: UUID, amount: Decimal):
+    # platform kartani lock qilmasdan, faqat bitta shard qatoriga yoziladi
+    stmt = insert(PlatformShard).values(id=shard_for(card_id), balance=amount)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[PlatformShard.id],
+        set_={"balance": PlatformShard.balance + stmt.excluded.balance, "updated_at": func.now()}
+    )
+    await db.execute(stmt)
+
+# ------------------
+async def get_platform_pending(db: AsyncSession) -> Decimal:
+    return await db.scalar(select(func.coalesce(func.sum(PlatformShard.balance), 0)))
+
+# ------------------
+async def sweep_platform_shards(db: AsyncSession) -> Decimal:
+    # lock tartibi: avval platform karta, keyin shard'lar (transferlar ham card -> shard tartibida)
+    platform = await db.execute(select(Card)
+                                .where(Card.card_number == settings.PLATFORM_CARD).with_for_update(of=Card))
+    platform_card = platform.scalar_one_or_none()
+    if not platform_card:
+        return Decimal("0")
+
+    shards = await db.execute(select(PlatformShard.id, PlatformShard.balance)
+                              .where(PlatformShard.balance > 0)
+                              .order_by(PlatformShard.id).with_for_update())
+    rows = shards.all()
+    if not rows:
+        return Decimal("0")
+
+    total = sum((row.balance for row in rows), Decimal("0"))
+
+    await db.execute(update(PlatformShard)
+                     .where(PlatformShard.id.in_([row.id for row in rows]))
+                     .values(balance=0, updated_at=func.now()))
+    platform_card.balance += total
+
+    return total
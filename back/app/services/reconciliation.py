@@ -0,0 +1,90 @@
+from sqlalchemy import select, update, insert, func, case, and_, literal
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal
+from app.models import Card, HotCredit, PlatformShard, ReconciliationRun, ReconciliationFinding, StatusRun
+from app.config import settings
+from .ledger import ledger_balance_of
+from uuid import UUID
+import asyncio
+
+# ------------------
+def stored_balance_of():
+    # karta balansi + hali qo'shilmagan hot credit'lar (+ platform uchun sweep qilinmagan shard'lar).
+    # hammasi bitta statement ichida -> bitta snapshot
+    platform_pending = func.coalesce(select(func.sum(PlatformShard.balance)).scalar_subquery(), 0)
+    hot_pending = func.coalesce(select(func.sum(HotCredit.amount))
+                                .where(HotCredit.card_id == Card.id)
+                                .scalar_subquery(), 0)
+
+    return case((Card.card_number == settings.PLATFORM_CARD, Card.balance + platform_pending),
+                else_=Card.balance) + hot_pending
+
+# ------------------
+def card_id_chunks(chunks: int) -> list[tuple[UUID, UUID | None]]:
+    # uuid4 id'lar tekis taqsimlangan: 128 bit fazo teng bo'laklarga bo'linadi
+    bounds = [UUID(int=i * (1 << 128) // chunks) for i in range(chunks)]
+    return list(zip(bounds, bounds[1:] + [None]))
+
+# ------------------
+async def reconcile_chunk(run_id: UUID, low: UUID, high: UUID | None) -> tuple[int, int]:
+    in_chunk = and_(Card.id >= low, Card.id < high) if high else Card.id >= low
+
+    cards = (select(Card.id, Card.card_number,
+                    stored_balance_of().label("stored_balance"),
+                    ledger_balance_of(Card.id).label("calculated_balance"))
+             .where(in_chunk)
+             .subquery())
+
+    async with AsyncSessionLocal() as session:
+        session: AsyncSession
+        async with session.begin():
+            total = await session.scalar(select(func.count()).where(in_chunk).select_from(Card))
+
+            result = await session.execute(insert(ReconciliationFinding).from_select(
+                ["run_id", "card_id", "card_number", "stored_balance", "calculated_balance", "difference"],
+                select(literal(run_id, ReconciliationRun.id.type), cards.c.id, cards.c.card_number, cards.c.stored_balance, cards.c.calculated_balance,
+                       cards.c.stored_balance - cards.c.calculated_balance)
+                .where(cards.c.stored_balance != cards.c.calculated_balance)))
+
+    return total, result.rowcount
+
+# ------------------
+async def create_run(db: AsyncSession, chunks: int) -> ReconciliationRun:
+    run = ReconciliationRun(chunks=chunks, status=StatusRun.RUNNING)
+    db.add(run)
+    await db.commit()
+    await db.refresh(run)
+
+    return run
+
+# ------------------
+async def run_reconciliation(run_id: UUID | None = None) -> UUID:
+    chunks = settings.RECONCILIATION_CHUNKS
+
+    if run_id is None:
+        async with AsyncSessionLocal() as session:
+            run_id = (await create_run(session, chunks)).id
+
+    # har bir chunk o'z connection'ida, bir vaqtda RECONCILIATION_CONCURRENCY tadan ko'p emas
+    semaphore = asyncio.Semaphore(settings.RECONCILIATION_CONCURRENCY)
+
+    async def worker(low, high):
+        async with semaphore:
+            return await reconcile_chunk(run_id, low, high)
+
+    values = {"finished_at": func.now()}
+    try:
+        results = await asyncio.gather(*(worker(low, high) for low, high in card_id_chunks(chunks)))
+        values.update(status=StatusRun.FINISHED,
+                      total_cards=sum(total for total, _ in results),
+                      invalid_cards=sum(invalid for _, invalid in results))
+    except Exception as e:
+        print(f"Reconciliation error: {str(e)}")
+        values.update(status=StatusRun.FAILED)
+
+    async with AsyncSessionLocal() as session:
+        session: AsyncSession
+        async with session.begin():
+            await session.execute(update(ReconciliationRun).where(ReconciliationRun.id == run_id).values(**values))
+
+    return run_id
@@ -0,0 +1,106 @@
+from sqlalchemy import select, or_, func
+from sqlalchemy.orm import joinedload, selectinload, contains_eager
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import User, UserRole, Card, Transaction, TransactionArchive
+from .transaction import parse_transaction_ref
+import re
+
+PHONE = re.compile(r"^\+998\d{9}$")
+CARD_NUMBER_LENGTH = 16
+
+# pg_trgm 3 belgili trigram'lar bilan ishlaydi: qisqa so'rov index'ni ishlata olmaydi
+MIN_TRGM_LENGTH = 3
+
+# ------------------
+def contains(column, q: str):
+    # '%q%' -> GIN (gin_trgm_ops) bitmap scan; autoescape: foydalanuvchi kiritgan % va _ oddiy belgi
+    return column.icontains(q, autoescape=True)
+
+# ------------------
+def starts_with(column, q: str):
+    # 'q%' -> varchar_pattern_ops B-tree range scan
+    return column.startswith(q, autoescape=True)
+
+# ------------------
+async def search_users(db: AsyncSession, q: str, limit: int) -> list[User]:
+    # fast path: to'liq telefon -> unique index, '+...' prefiks -> pattern index; qolgani trigram
+    query = select(User).options(selectinload(User.avatar)).where(User.role != UserRole.ADMIN)
+
+    if PHONE.match(q):
+        return list(await db.scalars(query.where(User.phone_number == q)))
+
+    if q.startswith("+"):
+        return list(await db.scalars(query.where(starts_with(User.phone_number, q))
+                                     .order_by(User.phone_number).limit(limit)))
+
+    if len(q) < MIN_TRGM_LENGTH:
+        return []
+
+    if q.isdigit():
+        rank = func.similarity(User.phone_number, q)
+        match = contains(User.phone_number, q)
+    else:
+        # word_similarity: "ali" -> "Aliyev Vali" yuqori, imlo xatolari ham (%> operatori) topiladi
+        rank = func.word_similarity(q, User.full_name)
+        match = or_(contains(User.full_name, q), User.full_name.op("%>")(q))
+
+    return list(await db.scalars(query.where(match).order_by(rank.desc(), User.id).limit(limit)))
+
+# ------------------
+async def search_cards(db: AsyncSession, q: str, limit: int) -> list[Card]:
+    # fast path: 16 raqam -> unique index, raqam prefiksi -> pattern index, keyin trigram
+    query = select(Card).options(joinedload(Card.user, innerjoin=True))
+
+    if q.isdigit():
+        if len(q) == CARD_NUMBER_LENGTH:
+            return list(await db.scalars(query.where(Card.card_number == q)))
+
+        cards = list(await db.scalars(query.where(starts_with(Card.card_number, q))
+                                      .order_by(Card.card_number).limit(limit)))
+        if cards or len(q) < MIN_TRGM_LENGTH:
+            return cards
+
+        rank = func.similarity(Card.card_number, q)
+        return list(await db.scalars(query.where(contains(Card.card_number, q))
+                                     .order_by(rank.desc(), Card.id).limit(limit)))
+
+    if len(q) < MIN_TRGM_LENGTH:
+        return []
+
+    # harf -> egasi ismi bo'yicha (users trigram index'i), join qilingan user response uchun ham ishlatiladi
+    rank = func.word_similarity(q, User.full_name)
+    return list(await db.scalars(select(Card).join(Card.user).options(contains_eager(Card.user))
+                                 .where(or_(contains(User.full_name, q), User.full_name.op("%>")(q)))
+                                 .order_by(rank.desc(), Card.id).limit(limit)))
+
+# ------------------
+async def search_transactions(db: AsyncSession, q: str, limit: int) -> list[Transaction]:
+    # PBC-... ref -> primary key (hot, keyin archive)
+    if parse_transaction_ref(q):
+        for T in (Transaction, TransactionArchive):
+            transaction = await db.scalar(select(T).where(T.id == q))
+            if transaction:
+                return [transaction]
+        return []
+
+    if not q.isdigit() or len(q) < MIN_TRGM_LENGTH:
+        return []
+
+    # karta raqami snapshot ustunlari bo'yicha, faqat hot jadval (eski tarix -> /all-transactions start_date bilan)
+    if len(q) == CARD_NUMBER_LENGTH:
+        match = or_(Transaction.from_card_number == q, Transaction.to_card_number == q)
+    else:
+        match = or_(contains(Transaction.from_card_number, q), contains(Transaction.to_card_number, q))
+
+    return list(await db.scalars(select(Transaction).where(match)
+                                 .order_by(Transaction.created_at.desc(), Transaction.id.desc()).limit(limit)))
+
+# ------------------
+async def admin_search(db: AsyncSession, q: str, limit: int) -> dict:
+    q = q.strip()
+    return {
+        "query": q,
+        "users": await search_users(db, q, limit),
+        "cards": await search_cards(db, q, limit),
+        "transactions": await search_transactions(db, q, limit),
+    }
@@ -0,0 +1,124 @@
+from fastapi import status
+from fastapi.responses import JSONResponse
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal
+from app.models import User, Card, StatusCard, Transaction, TypeTransaction, StatusTransaction
+from app.schemas.transaction import TransactionCreate
+from app.config import settings
+from .transaction import precheck_transfer, snapshot_columns
+from .platform import credit_platform
+from .ledger import transfer_entries, post_entries
+from .insights import record_transfers
+from .analytics import track_transfers
+from collections import defaultdict
+from decimal import Decimal
+
+# ------------------
+async def submit_transfer(db: AsyncSession, tc: TransactionCreate, current_user: User) -> JSONResponse:
+    # karta, limit va komissiya lock'siz pre-check'da tekshiriladi, balans esa settlement'da (lock ostida) qayta
+    from_card, to_card, total_to_pay, commission = await precheck_transfer(
+        db, tc.from_card_id, tc.to_card_number, current_user, tc.amount)
+
+    new_transaction = Transaction(
+        from_card_id = from_card.id,
+        to_card_id = to_card.id,
+        amount = tc.amount,
+        commission = commission,
+        type = TypeTransaction.TRANSFER,
+        status = StatusTransaction.PENDING,
+        description = tc.description,
+        **snapshot_columns(from_card, to_card)
+    )
+
+    db.add(new_transaction)
+    await db.flush()
+
+    return JSONResponse(status_code=status.HTTP_202_ACCEPTED,
+                        content={"id": new_transaction.id, "status": StatusTransaction.PENDING.value})
+
+# ------------------
+def settlement_error(from_card: Card | None, to_card: Card | None, total_to_pay: Decimal) -> str | None:
+    if not from_card or not to_card:
+        return "Karta topilmadi"
+
+    if from_card.status != StatusCard.ACTIVE or to_card.status != StatusCard.ACTIVE:
+        return "Ikki kartadan biri aktiv emas"
+
+    if total_to_pay > from_card.available_balance:
+        return "Hisobingizda mablag' mavjud emas"
+
+    return None
+
+# ------------------
+async def settle_pending_transfers(db: AsyncSession, batch: int) -> int:
+    # SKIP LOCKED: bir nechta worker bir-birini kutmasdan turli pending'larni oladi
+    result = await db.execute(select(Transaction)
+                              .where(Transaction.status == StatusTransaction.PENDING)
+                              .order_by(Transaction.created_at)
+                              .limit(batch)
+                              .with_for_update(skip_locked=True))
+    pending = result.scalars().all()
+    if not pending:
+        return 0
+
+    # batch'dagi barcha kartalar bitta so'rovda, id tartibida lock qilinadi
+    card_ids = {tx.from_card_id for tx in pending} | {tx.to_card_id for tx in pending}
+    cards = await db.execute(select(Card)
+                             .where(Card.id.in_(card_ids))
+                             .order_by(Card.id)
+                             .with_for_update(of=Card)
+                             .execution_options(populate_existing=True))
+    cards_by_id = {card.id: card for card in cards.unique().scalars().all()}
+
+    platform_credits = defaultdict(Decimal)
+    ledger_entries = []
+    stats = []
+    activity = []
+
+    for tx in pending:
+        from_card = cards_by_id.get(tx.from_card_id)
+        to_card = cards_by_id.get(tx.to_card_id)
+        total_to_pay = tx.amount + tx.commission
+
+        if settlement_error(from_card, to_card, total_to_pay):
+            tx.status = StatusTransaction.FAILED
+        else:
+            from_card.balance -= total_to_pay
+            to_card.balance += tx.amount  # karta batch uchun bir marta lock qilingan
+            if tx.commission > 0:
+                platform_credits[from_card.id] += tx.commission
+            tx.status = StatusTransaction.SUCCESS
+            ledger_entries += await transfer_entries(db, tx.id, tx.from_card_id, tx.to_card_id, tx.amount, tx.commission)
+            stats.append({"from_card_id": tx.from_card_id, "to_card_id": tx.to_card_id,
+                          "amount": tx.amount, "commission": tx.commission})
+            activity.append({"id": tx.id, "amount": tx.amount,
+                             "from_user_id": from_card.user_id, "to_user_id": to_card.user_id,
+                             "from_card_number": from_card.card_number, "to_card_number": to_card.card_number})
+
+        tx.completed_at = func.now()
+
+    for card_id, commission in platform_credits.items():
+        await credit_platform(db, card_id, commission)
+
+    await post_entries(db, ledger_entries)
+    await record_transfers(db, stats)
+    if activity:
+        track_transfers(db, activity)
+
+    return len(pending)
+
+# ------------------
+async def run_settlement(batch: int | None = None) -> int:
+    batch = batch or settings.SETTLEMENT_BATCH_SIZE
+    settled = 0
+
+    while True:
+        async with AsyncSessionLocal() as session:
+            session: AsyncSession
+            async with session.begin():
+                count = await settle_pending_transfers(session, batch)
+
+        settled += count
+        if count < batch:
+            return settled
@@ -1,60 +1,148 @@
 from fastapi import Header, HTTPException, status, Request, Depends
-from sqlalchemy import select
+from sqlalchemy import select, or_, and_
+from sqlalchemy.orm import joinedload
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import User, Card, StatusCard, UserRole
+from app.models.money import to_minor, from_minor
 from .auth import get_current_user
 from decimal import Decimal
 import uuid
+import time
+import os
 import redis.asyncio as aioredis
 from app.redis_client import get_redis
 from app.config import settings
 
 redis_client = aioredis.from_url(settings.REDIS_URL, encoding="utf-8", decode_responses=True)
 
+# ------------------
+def uuid7() -> uuid.UUID:
+    # 48 bit unix ms + random: yangi id'lar B-tree oxiriga tushadi
+    unix_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (unix_ms & 0xFFFFFFFFFFFF) << 80 | 0x7 << 76 | (rand >> 62 & 0xFFF) << 64 | 0b10 << 62 | rand & (1 << 62) - 1
+    return uuid.UUID(int=value)
+
+# ------------------
+def transaction_ref(transaction_id: uuid.UUID) -> str:
+    # eski (uuid4) id'lar avvalgidek 22 belgili ko'rinishda qoladi
+    if transaction_id.version == 7:
+        return f"PBC-{transaction_id.hex.upper()}"
+    return f"PBC-{transaction_id.hex[:22].upper()}"
+
+# ------------------
+def parse_transaction_ref(ref: str | uuid.UUID) -> uuid.UUID | None:
+    # ichki kod (ledger, settlement) tayyor UUID ham berishi mumkin
+    if isinstance(ref, uuid.UUID):
+        return ref
+
+    if not ref or not ref.upper().startswith("PBC-"):
+        return None
+
+    value = ref[4:]
+    if len(value) == 22:
+        value += "0" * 10 # migration eski id'larni shunday saqlagan
+
+    try:
+        return uuid.UUID(hex=value) if len(value) == 32 else None
+    except ValueError:
+        return None
+
 # ------------------
 def id_for_transaction():
-    return f"PBC-{uuid.uuid4().hex[:22].upper()}"
+    return transaction_ref(uuid7())
 
 # ------------------
-def validator_transaction(from_card: Card, to_card: Card, user_role: UserRole, amount: Decimal):
-    if from_card.id == to_card.id:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="O'z kartangizdan ayni shu kartaga mumkin emas")
-   
-    if from_card.status != StatusCard.ACTIVE or to_card.status != StatusCard.ACTIVE:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Ikki kartadan biri aktiv emas")
+def snapshot_columns(from_card, to_card) -> dict:
+    # Card yoki (user_id, card_number, owner_name) qatori: tarix uchun insert paytidagi snapshot
+    return {
+        "from_user_id": from_card.user_id if from_card else None,
+        "from_card_number": from_card.card_number if from_card else None,
+        "from_owner_name": from_card.owner_name if from_card else None,
+        "to_user_id": to_card.user_id,
+        "to_card_number": to_card.card_number,
+        "to_owner_name": to_card.owner_name,
+    }
 
-    if amount < 2000:
+# ------------------
+def transfer_terms(user_role: UserRole, amount: Decimal):
+    # lock'siz hisoblanadi: rol limiti va komissiya kartaga bog'liq emas.
+    # hisob butun sonli tiyin'da (bazadagi BIGINT bilan bir xil), yaxlitlash yagona joyda
+    amount_minor = to_minor(amount)
+    if amount_minor < to_minor(2000):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="O'tkazma juda kam yoki ko'p")
 
-    # for freemium user;
+    # for freemium user; 1% komissiya, yarim tiyin yuqoriga yaxlitlanadi
     if user_role == UserRole.USER: 
-        commission = amount * Decimal("0.01")
-        total_to_pay = amount + commission
+        commission_minor = (amount_minor + 50) // 100
         max_limit = 2000000
 
     # for premium users;
     elif user_role == UserRole.PREMIUM:
-        commission = Decimal("0")
-        total_to_pay = amount
+        commission_minor = 0
         max_limit = 4000000 
 
     # for admin;
     else:
-        commission = Decimal("0")
-        total_to_pay = amount
+        commission_minor = 0
         max_limit = 100000000
 
-    if amount > max_limit:
+    if amount_minor > to_minor(max_limit):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Maksimal limitdan oshdi {max_limit}")
+
+    return from_minor(amount_minor + commission_minor), from_minor(commission_minor)
+
+# ------------------
+def validator_transaction(from_card: Card, to_card: Card, user_role: UserRole, amount: Decimal):
+    if from_card.id == to_card.id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="O'z kartangizdan ayni shu kartaga mumkin emas")
+   
+    if from_card.status != StatusCard.ACTIVE or to_card.status != StatusCard.ACTIVE:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Ikki kartadan biri aktiv emas")
+
+    total_to_pay, commission = transfer_terms(user_role, amount)
     
-    if total_to_pay > from_card.balance:
+    if total_to_pay > from_card.available_balance:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Hisobingizda mablag' mavjud emas")
     
     return total_to_pay, commission
 
+# ------------------
+async def precheck_transfer(db, from_card_id, to_card_number, current_user, amount: Decimal):
+    # lock'siz tezkor tekshiruv: yaroqsiz so'rov FOR UPDATE'gacha yetib bormaydi.
+    # lock ostidagi validator_transaction baribir asosiy tekshiruv bo'lib qoladi
+    total_to_pay, commission = transfer_terms(current_user.role, amount)
+
+    result = await db.execute(select(Card.id, Card.user_id, Card.card_number, Card.status,
+                                     Card.balance, Card.reserved_balance, User.full_name.label("owner_name"))
+                              .join(User, User.id == Card.user_id)
+                              .where(or_(and_(Card.id == from_card_id, Card.user_id == current_user.id),
+                                         Card.card_number == to_card_number)))
+    rows = result.all()
+
+    sender_card = next((row for row in rows if row.id == from_card_id and row.user_id == current_user.id), None)
+    if not sender_card:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Yuboruvchi karta topilmadi yoki sizga tegishli emas")
+
+    receiver_card = next((row for row in rows if row.card_number == to_card_number), None)
+    if not receiver_card:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Qabul qiluvchi karta mavjud emas")
+
+    if sender_card.id == receiver_card.id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="O'z kartangizdan ayni shu kartaga mumkin emas")
+
+    if sender_card.status != StatusCard.ACTIVE or receiver_card.status != StatusCard.ACTIVE:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Ikki kartadan biri aktiv emas")
+
+    if total_to_pay > sender_card.balance - sender_card.reserved_balance:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Hisobingizda mablag' mavjud emas")
+
+    return sender_card, receiver_card, total_to_pay, commission
+
 # ------------------
 async def get_sender_card_with_lock(db, from_card_id, current_user) -> Card:
     result = await db.execute(select(Card)
+                     .options(joinedload(Card.user, innerjoin=True))
                      .where(Card.id == from_card_id,
                      Card.user_id == current_user.id).with_for_update(of=Card))
     
@@ -67,6 +155,7 @@ async def get_sender_card_with_lock(db, from_card_id, current_user) -> Card:
 # ------------------
 async def get_receiver_card_with_lock(db, to_card_number) -> Card:
     result = await db.execute(select(Card)
+                     .options(joinedload(Card.user, innerjoin=True))
                      .where(Card.card_number == to_card_number).with_for_update(of=Card))
     receiver_card = result.unique().scalar_one_or_none()
     if not receiver_card:
@@ -74,6 +163,49 @@ async def get_receiver_card_with_lock(db, to_card_number) -> Card:
 
     return receiver_card
 
+# ------------------
+async def lock_batch_cards(db, from_card_id, to_card_numbers, current_user,
+                           skip_hot: bool = False) -> tuple[Card, dict[str, Card]]:
+    receiver_filter = Card.card_number.in_(to_card_numbers)
+    if skip_hot:
+        # hot kartalar lock qilinmaydi, ularga credit navbat orqali tushadi
+        receiver_filter = and_(receiver_filter, Card.is_hot.is_(False))
+
+    # barcha kartalar bitta so'rovda, id bo'yicha tartibda lock qilinadi -> qarama-qarshi o'tkazmalar deadlock bermaydi.
+    # egasi (tarix snapshot'i uchun) shu so'rovda JOIN bilan keladi, FOR UPDATE faqat cards'ga
+    result = await db.execute(select(Card)
+                     .options(joinedload(Card.user, innerjoin=True))
+                     .where(or_(and_(Card.id == from_card_id, Card.user_id == current_user.id),
+                                receiver_filter))
+                     .order_by(Card.id).with_for_update(of=Card))
+    cards = result.unique().scalars().all()
+
+    sender_card = next((card for card in cards if card.id == from_card_id and card.user_id == current_user.id), None)
+    if not sender_card:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Yuboruvchi karta topilmadi yoki sizga tegishli emas")
+
+    cards_by_number = {card.card_number: card for card in cards}
+
+    missing = [number for number in to_card_numbers if number not in cards_by_number]
+    if skip_hot and missing:
+        hot_cards = await db.execute(select(Card)
+                                     .options(joinedload(Card.user, innerjoin=True))
+                                     .where(Card.card_number.in_(missing), Card.is_hot.is_(True)))
+        cards_by_number.update({card.card_number: card for card in hot_cards.unique().scalars().all()})
+
+    return sender_card, cards_by_number
+
+# ------------------
+async def lock_transfer_cards(db, from_card_id, to_card_number, current_user,
+                              skip_hot: bool = False) -> tuple[Card, Card]:
+    sender_card, cards = await lock_batch_cards(db, from_card_id, [to_card_number], current_user, skip_hot)
+
+    receiver_card = cards.get(to_card_number)
+    if not receiver_card:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Qabul qiluvchi karta mavjud emas")
+
+    return sender_card, receiver_card
+
 # ------------------
 async def rate_limiter(request: Request, 
                        current_user: User = Depends(get_current_user)) -> bool:
@@ -0,0 +1,126 @@
+from fastapi import HTTPException, status
+from sqlalchemy import text, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import User, StatusTransaction
+from app.models.money import Money
+from app.models.transaction_ref import TransactionRef
+from app.schemas.transaction import TransactionCreate
+from .transaction import transfer_terms, id_for_transaction
+from .platform import shard_for, get_platform_card_id
+from .insights import record_transfer
+from .analytics import track_transfers
+from .counts import touch_counts, transaction_scopes
+
+# debit, credit, platform shard, transactions va ledger insert bitta statement'da:
+# row lock'lar faqat shu statement davomida olinadi, Python tomonda hech narsa kutilmaydi.
+# pul parametrlari Money orqali tiyin (BIGINT) bo'lib yuboriladi
+TRANSFER_SQL = text("""
+WITH locked AS (
+    -- ikkala karta avval id tartibida lock qilinadi: debit/credit o'tkazma yo'nalishida lock olsa
+    -- A->B va B->A bir vaqtda deadlock beradi
+    SELECT id FROM cards
+    WHERE id = :from_card_id OR card_number = :to_card_number
+    ORDER BY id
+    FOR UPDATE
+),
+debit AS (
+    UPDATE cards SET balance = balance - CAST(:total AS BIGINT)
+    WHERE id = :from_card_id
+      AND (SELECT count(*) FROM locked) > 0  -- InitPlan: barcha lock'lar debit'dan oldin olinadi
+      AND user_id = :user_id
+      AND status = 'ACTIVE'
+      AND balance - reserved_balance >= CAST(:total AS BIGINT)
+      AND EXISTS (SELECT 1 FROM cards r
+                  WHERE r.card_number = :to_card_number AND r.status = 'ACTIVE' AND r.id <> :from_card_id)
+    RETURNING id, card_number, user_id
+),
+credit AS (
+    UPDATE cards SET balance = balance + CAST(:amount AS BIGINT)
+    WHERE card_number = :to_card_number
+      AND status = 'ACTIVE'
+      AND id <> :from_card_id
+      AND EXISTS (SELECT 1 FROM debit)
+    RETURNING id, card_number, user_id
+),
+fee AS (
+    INSERT INTO platform_shards (id, balance)
+    SELECT CAST(:shard_id AS INTEGER), CAST(:commission AS BIGINT) FROM credit
+    WHERE CAST(:commission AS BIGINT) > 0
+    ON CONFLICT (id) DO UPDATE SET balance = platform_shards.balance + excluded.balance, updated_at = now()
+    RETURNING id
+),
+ins AS (
+    INSERT INTO transactions (id, from_card_id, to_card_id, amount, commission, type, status,
+                              description, created_at, completed_at,
+                              from_user_id, to_user_id, from_card_number, to_card_number,
+                              from_owner_name, to_owner_name)
+    SELECT CAST(:transaction_id AS UUID), debit.id, credit.id, CAST(:amount AS BIGINT),
+           CAST(:commission AS BIGINT), 'TRANSFER'::typetransaction, 'SUCCESS'::statustransaction,
+           CAST(:description AS TEXT), now(), now(),
+           debit.user_id, credit.user_id, debit.card_number, credit.card_number, fu.full_name, tu.full_name
+    FROM debit JOIN users fu ON fu.id = debit.user_id,
+         credit JOIN users tu ON tu.id = credit.user_id
+    RETURNING id, from_card_id, to_card_id, amount, commission, description, created_at, completed_at,
+              to_user_id, from_card_number, to_card_number, from_owner_name, to_owner_name
+),
+ledger AS (
+    INSERT INTO ledger_entries (card_id, transaction_id, amount, created_at)
+    SELECT e.card_id, ins.id, e.amount, now()
+    FROM ins, debit, credit,
+         LATERAL (VALUES (debit.id, -CAST(:total AS BIGINT)),
+                         (credit.id, CAST(:amount AS BIGINT)),
+                         (CAST(:platform_id AS UUID), CAST(:commission AS BIGINT))) AS e(card_id, amount)
+    WHERE e.amount <> 0
+    RETURNING id
+)
+SELECT ins.id, ins.amount, ins.commission, ins.description, ins.created_at, ins.completed_at,
+       ins.from_card_id, ins.to_card_id, ins.to_user_id,
+       ins.from_card_number, ins.from_owner_name, ins.to_card_number, ins.to_owner_name
+FROM ins
+""").bindparams(bindparam("transaction_id", type_=TransactionRef()),
+                bindparam("amount", type_=Money()),
+                bindparam("total", type_=Money()),
+                bindparam("commission", type_=Money())
+).columns(id=TransactionRef(), amount=Money(), commission=Money())
+
+# ------------------
+async def transfer_sql(db: AsyncSession, tc: TransactionCreate, current_user: User) -> dict:
+    # limit va komissiya lock'dan oldin hisoblanadi
+    total_to_pay, commission = transfer_terms(current_user.role, tc.amount)
+
+    result = await db.execute(TRANSFER_SQL, {
+        "transaction_id": id_for_transaction(),
+        "from_card_id": tc.from_card_id,
+        "user_id": current_user.id,
+        "to_card_number": tc.to_card_number,
+        "amount": tc.amount,
+        "total": total_to_pay,
+        "commission": commission,
+        "shard_id": shard_for(tc.from_card_id),
+        "platform_id": await get_platform_card_id(db),
+        "description": tc.description,
+    })
+    row = result.one_or_none()
+
+    # debit o'tib credit o'tmagan bo'lishi mumkin -> exception butun tranzaksiyani rollback qiladi
+    if not row:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="O'tkazma bajarilmadi: karta topilmadi, aktiv emas yoki mablag' yetarli emas")
+
+    await record_transfer(db, row.from_card_id, row.to_card_id, row.amount, row.commission)
+    touch_counts(db, transaction_scopes(row.from_card_id, row.to_card_id))
+    track_transfers(db, [{"id": row.id, "amount": row.amount,
+                          "from_user_id": current_user.id, "to_user_id": row.to_user_id,
+                          "from_card_number": row.from_card_number, "to_card_number": row.to_card_number}])
+
+    return {
+        "id": row.id,
+        "from_card": {"owner_name": row.from_owner_name, "card_number": row.from_card_number},
+        "to_card": {"owner_name": row.to_owner_name, "card_number": row.to_card_number},
+        "amount": row.amount,
+        "commission": row.commission,
+        "status": StatusTransaction.SUCCESS,
+        "description": row.description,
+        "created_at": row.created_at,
+        "completed_at": row.completed_at
+    }
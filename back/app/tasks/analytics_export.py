@@ -0,0 +1,20 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal
+from app.services.export import run_export
+from app.config import settings
+from pathlib import Path
+import asyncio
+
+async def export_analytics():
+    async with AsyncSessionLocal() as session:
+        session: AsyncSession
+        async with session.begin():
+            # server-side cursor tranzaksiya ichida ishlaydi; REPEATABLE READ -> barcha jadvallar bitta snapshot'dan
+            await session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+            exported = await run_export(session, Path(settings.EXPORT_DIR))
+
+    print(f"📦 Analytics export tayyor: {exported}")
+
+# buyruq: python -m app.tasks.analytics_export (cron yoki qo'lda)
+if __name__ == "__main__":
+    asyncio.run(export_analytics())
@@ -0,0 +1,6 @@
+from app.services.archive import archive_transactions
+
+async def archive_old_transactions():
+    archived = await archive_transactions()
+    if archived:
+        print(f"🗄 {archived} ta eski tranzaksiya archive'ga ko'chirildi")
@@ -0,0 +1,12 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal
+from app.services.ledger import roll_checkpoints
+
+async def roll_balance_checkpoints():
+    async with AsyncSessionLocal() as session:
+        session: AsyncSession
+        async with session.begin():
+            cards = await roll_checkpoints(session)
+
+    if cards > 0:
+        print(f"📒 {cards} ta karta checkpoint'i yangilandi")
@@ -0,0 +1,12 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal
+from app.services.balance_history import take_balance_snapshots
+
+async def snapshot_card_balances():
+    async with AsyncSessionLocal() as session:
+        session: AsyncSession
+        async with session.begin():
+            rows = await take_balance_snapshots(session)
+
+    if rows > 0:
+        print(f"📈 {rows} ta kunlik balans snapshot yozildi")
@@ -0,0 +1,12 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal
+from app.services.daily_stats import catch_up_daily_stats
+
+async def roll_daily_stats():
+    async with AsyncSessionLocal() as session:
+        session: AsyncSession
+        async with session.begin():
+            days = await catch_up_daily_stats(session)
+
+    if days > 0:
+        print(f"📊 {days} kunlik statistika yangilandi")
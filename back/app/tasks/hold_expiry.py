@@ -0,0 +1,12 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal
+from app.services.hold import expire_holds
+
+async def release_expired_holds():
+    async with AsyncSessionLocal() as session:
+        session: AsyncSession
+        async with session.begin():
+            expired = await expire_holds(session)
+
+    if expired:
+        print(f"⌛ {expired} ta hold muddati o'tdi, pul bo'shatildi")
@@ -0,0 +1,7 @@
+from app.services.hot_account import flush_hot_credits
+
+# flusher ishlamay qolgan (restart, xato) credit'lar uchun catch-up
+async def catch_up_hot_credits():
+    for _ in range(10):
+        if await flush_hot_credits() == 0:
+            break
@@ -0,0 +1,16 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal
+from app.services.insights import rebuild_insights
+import asyncio
+
+async def backfill_insights():
+    async with AsyncSessionLocal() as session:
+        session: AsyncSession
+        async with session.begin():
+            await rebuild_insights(session)
+
+    print("📊 Insights rollup'lari qayta qurildi")
+
+# bir martalik buyruq: python -m app.tasks.insights_backfill
+if __name__ == "__main__":
+    asyncio.run(backfill_insights())
@@ -0,0 +1,11 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal
+from app.services.partitions import ensure_transaction_partitions
+
+async def create_transaction_partitions():
+    async with AsyncSessionLocal() as session:
+        session: AsyncSession
+        async with session.begin():
+            months = await ensure_transaction_partitions(session)
+
+    print(f"🗂 transactions: {months} oylik partition tayyor")
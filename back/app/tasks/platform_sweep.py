@@ -0,0 +1,12 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal
+from app.services.platform import sweep_platform_shards
+
+async def sweep_platform():
+    async with AsyncSessionLocal() as session:
+        session: AsyncSession
+        async with session.begin():
+            total = await sweep_platform_shards(session)
+
+    if total > 0:
+        print(f"💰 Platform shard'lardan {total} platform kartaga o'tkazildi")
@@ -0,0 +1,5 @@
+from app.services.reconciliation import run_reconciliation
+
+async def reconcile_balances():
+    run_id = await run_reconciliation()
+    print(f"🔎 Reconciliation yakunlandi: {run_id}")
@@ -0,0 +1,26 @@
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from app.config import settings
+from app.tasks.subscription_renewal import renew_subscriptions
+from app.tasks.platform_sweep import sweep_platform
+from app.tasks.hot_credit_flush import catch_up_hot_credits
+from app.tasks.settlement import settle_transfers
+from app.tasks.hold_expiry import release_expired_holds
+from app.tasks.balance_checkpoint import roll_balance_checkpoints
+from app.tasks.reconciliation import reconcile_balances
+from app.tasks.daily_stats import roll_daily_stats
+from app.tasks.partition_maintenance import create_transaction_partitions
+from app.tasks.archive import archive_old_transactions
+from app.tasks.balance_snapshot import snapshot_card_balances
+
+scheduler = AsyncIOScheduler()
+scheduler.add_job(renew_subscriptions, "cron", hour=3, minute=0)
+scheduler.add_job(sweep_platform, "interval", seconds=settings.PLATFORM_SWEEP_SECONDS, max_instances=1)
+scheduler.add_job(catch_up_hot_credits, "interval", seconds=5, max_instances=1)
+scheduler.add_job(settle_transfers, "interval", seconds=settings.SETTLEMENT_INTERVAL_SECONDS, max_instances=1)
+scheduler.add_job(release_expired_holds, "interval", seconds=30, max_instances=1)
+scheduler.add_job(roll_balance_checkpoints, "interval", seconds=settings.CHECKPOINT_INTERVAL_SECONDS, max_instances=1)
+scheduler.add_job(reconcile_balances, "interval", minutes=settings.RECONCILIATION_INTERVAL_MINUTES, max_instances=1)
+scheduler.add_job(roll_daily_stats, "interval", minutes=30, max_instances=1)
+scheduler.add_job(create_transaction_partitions, "cron", hour=2, minute=0)
+scheduler.add_job(archive_old_transactions, "cron", hour=4, minute=0, max_instances=1)
+scheduler.add_job(snapshot_card_balances, "cron", hour=0, minute=30, max_instances=1)
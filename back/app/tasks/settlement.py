@@ -0,0 +1,20 @@
+from app.services.settlement import run_settlement
+from app.config import settings
+import asyncio
+
+async def settle_transfers():
+    settled = await run_settlement()
+    if settled:
+        print(f"🧾 {settled} ta pending o'tkazma yakunlandi")
+
+# alohida worker sifatida: python -m app.tasks.settlement (API worker'lardan mustaqil scale qilinadi)
+async def settlement_worker():
+    while True:
+        try:
+            await settle_transfers()
+        except Exception as e:
+            print(f"Settlement error: {str(e)}")
+        await asyncio.sleep(settings.SETTLEMENT_INTERVAL_SECONDS)
+
+if __name__ == "__main__":
+    asyncio.run(settlement_worker())
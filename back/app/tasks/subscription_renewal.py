@@ -1,13 +1,16 @@
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.orm import joinedload
 from sqlalchemy.sql import func
 from decimal import Decimal
 from datetime import date, timedelta
 from app.database import AsyncSessionLocal
-from app.models import (User, Subscription, Card, Transaction, 
+from app.models import (User, Subscription, Card, Transaction,
                         TypeTransaction, StatusTransaction, UserRole)
-from app.config import settings
+from app.services.platform import get_platform_card_id, credit_platform
+from app.services.transaction import id_for_transaction, snapshot_columns
+from app.services.ledger import post_transfer
+from app.services.insights import record_transfer
 
 async def renew_subscriptions():
     async with AsyncSessionLocal() as session:
@@ -18,12 +21,17 @@ async def renew_subscriptions():
             ))
             expired_subs = result.scalars().all()
 
+            # platform card id (lock'siz, pul shard orqali tushadi)
+            platform_id = await get_platform_card_id(session)
+            platform_card = await session.get(Card, platform_id, options=[joinedload(Card.user, innerjoin=True)])
+
             for sub in expired_subs:
                 sub: Subscription
                 # Card object
                 card: Card
-                resultt = await session.execute(select(Card).where(
-                    Card.id == sub.card_id).with_for_update(of=Card)
+                resultt = await session.execute(select(Card)
+                    .options(joinedload(Card.user, innerjoin=True))  # tarix snapshot'i uchun
+                    .where(Card.id == sub.card_id).with_for_update(of=Card)
                     )
                 card = resultt.scalar_one_or_none()
 
@@ -31,31 +39,27 @@ async def renew_subscriptions():
                 user = await session.execute(select(User).where(User.id == sub.user_id))
                 user = user.scalar_one()
 
-                # is platform card 
-                platform = await session.execute(
-                    select(Card).where(
-                        Card.card_number == settings.PLATFORM_CARD).with_for_update(of=Card))
-                platform = platform.scalar_one()
-
-                if not card or card.balance < sub.price:
+                if not card or card.available_balance < sub.price:
                     sub.is_active = False
                     user.role = UserRole.USER
                     continue
 
                 card.balance -= sub.price
-                platform.balance += sub.price
+                await credit_platform(session, card.id, sub.price)
                 sub.next_payment_at = date.today() + timedelta(days=31)
 
+                transaction_id = id_for_transaction()
                 session.add(Transaction(
+                    id = transaction_id,
                     from_card_id = card.id,
-                    to_card_id = platform.id,
+                    to_card_id = platform_id,
                     amount = sub.price,
                     commission = Decimal("0"),
                     type = TypeTransaction.TRANSFER,
                     status = StatusTransaction.SUCCESS,
                     description = "Premium obuna yangilandi",
-                    completed_at = func.now()
+                    completed_at = func.now(),
+                    **snapshot_columns(card, platform_card)
                 ))
-
-scheduler = AsyncIOScheduler()
-scheduler.add_job(renew_subscriptions, "cron", hour=3, minute=0)
+                await post_transfer(session, transaction_id, card.id, platform_id, sub.price)
+                await record_transfer(session, card.id, platform_id, sub.price)
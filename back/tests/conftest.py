@@ -0,0 +1,108 @@
+from contextlib import contextmanager
+from datetime import date
+from decimal import Decimal
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from app.main import app
+from app.config import settings
+from app.database import get_db
+from app.models import (User, UserRole, Card, StatusCard, Transaction, TypeTransaction, StatusTransaction)
+from app.services.auth import create_access_token
+from app.services.partitions import ensure_transaction_partitions
+import pytest
+
+# migration qilingan Postgres kerak (DATABASE_URL); har test bitta tranzaksiyada, oxirida rollback.
+# N+1 ko'rinishi uchun har bir ro'yxatda bittadan ko'p qator bo'ladi
+ROWS = 3
+
+# ------------------
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+# ------------------
+@pytest.fixture
+async def connection():
+    engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    try:
+        conn = await engine.connect()
+    except (OSError, DBAPIError) as e:
+        await engine.dispose()
+        pytest.skip(f"Postgres mavjud emas: {e}")
+
+    transaction = await conn.begin()
+    try:
+        yield conn
+    finally:
+        await transaction.rollback()
+        await conn.close()
+        await engine.dispose()
+
+# ------------------
+@pytest.fixture
+async def seed(connection) -> dict:
+    async with AsyncSession(bind=connection, expire_on_commit=False) as db:
+        await ensure_transaction_partitions(db, 0)
+
+        admin = User(full_name="Test Admin", phone_number="+998000000000", hashed_password="-", role=UserRole.ADMIN)
+        users = [User(full_name=f"Test User {i}", phone_number=f"+99800000000{i + 1}", hashed_password="-")
+                 for i in range(ROWS)]
+        db.add_all([admin, *users])
+        await db.flush()
+
+        owner = users[0]
+        cards = [Card(user_id=owner.id, card_number=f"99990000000000{i:02d}", balance=Decimal("100000"),
+                      status=StatusCard.ACTIVE, expiry_date=date(2030, 1, 1)) for i in range(ROWS)]
+        db.add_all(cards)
+        await db.flush()
+
+        db.add_all([Transaction(from_card_id=cards[0].id, to_card_id=card.id, amount=Decimal("5000"),
+                                commission=Decimal("0"), type=TypeTransaction.TRANSFER,
+                                status=StatusTransaction.SUCCESS,
+                                from_user_id=owner.id, from_card_number=cards[0].card_number,
+                                from_owner_name=owner.full_name, to_user_id=owner.id,
+                                to_card_number=card.card_number, to_owner_name=owner.full_name)
+                    for card in cards[1:]])
+        await db.flush()
+
+    return {
+        "admin_token": create_access_token({"sub": str(admin.id)}),
+        "user_token": create_access_token({"sub": str(owner.id)}),
+    }
+
+# ------------------
+@pytest.fixture
+async def client(connection):
+    # endpoint'lar har so'rovda yangi session oladi (bo'sh identity map), lekin test connection'ida
+    async def get_test_db():
+        async with AsyncSession(bind=connection, expire_on_commit=False) as db:
+            yield db
+
+    app.dependency_overrides[get_db] = get_test_db
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            yield client
+    finally:
+        app.dependency_overrides.clear()
+
+# ------------------
+@pytest.fixture
+def count_queries(connection):
+    # blok ichida bazaga yuborilgan SQL'lar ro'yxati
+    @contextmanager
+    def counter():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(connection.sync_engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(connection.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+    return counter
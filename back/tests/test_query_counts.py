@@ -0,0 +1,52 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.services.auth import get_current_user
+import pytest
+
+# so'rovlar soni qatorlar soniga bog'liq emas: relationship'lar lazy="raise", kerakligi options bilan yuklanadi.
+# count=none: total hisoblash (estimate/exact) bu testlarning mavzusi emas
+pytestmark = pytest.mark.anyio
+
+# ------------------
+def auth(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+# ------------------
+async def test_get_current_user(connection, seed, count_queries):
+    async with AsyncSession(bind=connection, expire_on_commit=False) as db:
+        with count_queries() as statements:
+            user = await get_current_user(seed["user_token"], db)
+
+    assert user.full_name == "Test User 0"
+    assert len(statements) == 1, statements
+
+# ------------------
+async def test_me(client, seed, count_queries):
+    with count_queries() as statements:
+        response = await client.get("/api/auth/me", headers=auth(seed["user_token"]))
+
+    assert response.status_code == 200, response.text
+    # current_user + avatar
+    assert len(statements) <= 2, statements
+
+# ------------------
+async def test_get_cards(client, seed, count_queries):
+    with count_queries() as statements:
+        response = await client.get("/api/card/", headers=auth(seed["user_token"]))
+
+    assert response.status_code == 200, response.text
+    assert len(response.json()) == 3
+    # current_user + cards (owner_name identity map'dan)
+    assert len(statements) <= 2, statements
+
+# ------------------
+@pytest.mark.parametrize("path, budget", [
+    ("/api/admin/all-users", 3),        # current_user + sahifa + avatar'lar (selectinload)
+    ("/api/admin/all-cards", 3),        # current_user + sahifa + egalari (selectinload)
+    ("/api/admin/all-transactions", 2), # current_user + sahifa (snapshot ustunlar, join yo'q)
+])
+async def test_admin_lists(client, seed, count_queries, path, budget):
+    with count_queries() as statements:
+        response = await client.get(path, params={"count": "none"}, headers=auth(seed["admin_token"]))
+
+    assert response.status_code == 200, response.text
+    assert len(statements) <= budget, statements